@@ -1,57 +1,61 @@
+from Instrumentation import instrument
+import DemandKernels
+import DemandPrecision
+
+
+@instrument()
 def calculate_co2demand(inputs_dataframe, htc, heat_demand, light_demand):
     from joblib import load
     import pandas as pd
     import matplotlib.pyplot as plt
     import numpy as np
 
-    gm_d = inputs_dataframe["gm_d"]
-    gm_r = inputs_dataframe["gm_r"]
-    gm_south = inputs_dataframe["gm_south"]
-    gm_side = inputs_dataframe["gm_side"]
-    gm_north = inputs_dataframe["gm_north"]
+    gm_d = inputs_dataframe.gm_d
+    gm_r = inputs_dataframe.gm_r
+    gm_south = inputs_dataframe.gm_south
+    gm_side = inputs_dataframe.gm_side
+    gm_north = inputs_dataframe.gm_north
 
-    climate = inputs_dataframe["climate"]
+    climate = inputs_dataframe.climate
 
-    crop_data = inputs_dataframe["crop_data"]
-    crop = inputs_dataframe["crop"]
+    crop_data = inputs_dataframe.crop_data
+    crop = inputs_dataframe.crop
 
-    op_enviro = inputs_dataframe["op_enviro"]
-    op_temp = inputs_dataframe["op_temp"]
-    op_temp_sp = inputs_dataframe["op_temp_sp"]
-    op_light = inputs_dataframe["op_light"]
-    op_co2 = inputs_dataframe["op_co2"]
+    op_enviro = inputs_dataframe.op_enviro
+    op_temp = inputs_dataframe.op_temp
+    op_temp_sp = inputs_dataframe.op_temp_sp
+    op_light = inputs_dataframe.op_light
+    op_co2 = inputs_dataframe.op_co2
 
-    global_assump = inputs_dataframe["global_assump"]
+    global_assump = inputs_dataframe.global_assump
 
-    climate.index = pd.to_datetime(climate.index, dayfirst=True)
-    op_temp_sp.index = pd.to_datetime(op_temp_sp.index, dayfirst=True)
-    crop.index = pd.to_datetime(crop.index, dayfirst=True)
-    htc.index = pd.to_datetime(htc.index, dayfirst=True)
-    heat_demand.index = pd.to_datetime(heat_demand.index, dayfirst=True)
-    light_demand.index = pd.to_datetime(light_demand.index, dayfirst=True)
+    if DemandKernels.use_numba():
+        CO2_demand = DemandPrecision.store(DemandKernels.co2_demand(inputs_dataframe))
+        CO2_demand.to_json("co2_demand.json")
+        return CO2_demand
 
-    CO2_demand = pd.DataFrame(index=climate.index)
+    CO2_demand = pd.DataFrame(index=inputs_dataframe.index)
 
     # Desired CO2 Level
     CO2_demand["Desired CO2 Level"] = np.where(
-        (CO2_demand.index.hour > op_co2.loc["Daytime CO2 Level On", "Value"]) &
-        (CO2_demand.index.hour <= op_co2.loc["Daytime CO2 Level Off", "Value"]),
-        op_co2.loc["Daytime CO2 Level", "Value"],
-        op_co2.loc["Nighttime CO2 Level", "Value"]
+        (inputs_dataframe.hour > op_co2["Daytime CO2 Level On"]) &
+        (inputs_dataframe.hour <= op_co2["Daytime CO2 Level Off"]),
+        op_co2["Daytime CO2 Level"],
+        op_co2["Nighttime CO2 Level"]
     )
 
     # CO2 Change
     # First row calculation
     first_change = (
-                           global_assump.loc["CO2 Density", "Value"]
-                           * gm_d.loc["Greenhouse Volume", "Value"]
-                           * (CO2_demand["Desired CO2 Level"].iloc[0] - op_co2.loc["Ambient Levels", "Value"])
+                           global_assump["CO2 Density"]
+                           * gm_d["Greenhouse Volume"]
+                           * (CO2_demand["Desired CO2 Level"].iloc[0] - op_co2["Ambient Levels"])
                    ) / 1e6
 
     # Rest of the rows calculation
     rest_change = (
-                          global_assump.loc["CO2 Density", "Value"]
-                          * gm_d.loc["Greenhouse Volume", "Value"]
+                          global_assump["CO2 Density"]
+                          * gm_d["Greenhouse Volume"]
                           * (CO2_demand["Desired CO2 Level"].iloc[1:] - CO2_demand["Desired CO2 Level"].iloc[
                                                                         :-1].values)
                   ) / 1e6
@@ -67,18 +71,17 @@ def calculate_co2demand(inputs_dataframe, htc, heat_demand, light_demand):
     CO2_demand["CO2 Change"] = CO2_demand["CO2 Change"].fillna(0)
 
     # CO2 Loss Rate (Kg/h)
-    CO2_demand["CO2 Loss Rate"] = global_assump.loc["CO2 Density", "Value"] * gm_d.loc["Greenhouse Volume", "Value"] * (
-            CO2_demand["Desired CO2 Level"] - op_co2.loc["Ambient Levels", "Value"]) / 1e6
+    CO2_demand["CO2 Loss Rate"] = global_assump["CO2 Density"] * gm_d["Greenhouse Volume"] * (
+            CO2_demand["Desired CO2 Level"] - op_co2["Ambient Levels"]) / 1e6
 
     # Lighting Photosynthetically Active Radiation (PAR) (W/m2)
     CO2_demand["Lighting PAR"] = np.where(
-        crop["Solar Radiation in Greenhouse"] > op_light.loc["Switch off if solar radiation is greater than:", "Value"],
+        crop["Solar Radiation in Greenhouse"] > op_light["Switch off if solar radiation is greater than:"],
         0,
         np.where(
-            (CO2_demand.index.hour > op_light.loc["Time lighting is switched on", "Value"]) &
-            (CO2_demand.index.hour <= op_light.loc["Time lighting is switched off", "Value"]),
-            op_light.loc["Installed Power of lamp", "Value"] * op_light.loc[
-                "Fraction of Lighting Input Converted to PAR", "Value"],
+            (inputs_dataframe.hour > op_light["Time lighting is switched on"]) &
+            (inputs_dataframe.hour <= op_light["Time lighting is switched off"]),
+            op_light["Installed Power of lamp"] * op_light["Fraction of Lighting Input Converted to PAR"],
             0
         )
     )
@@ -87,26 +90,25 @@ def calculate_co2demand(inputs_dataframe, htc, heat_demand, light_demand):
     CO2_demand["Total PAR"] = crop["Photosynthetically Active Solar Radiation"] + CO2_demand["Lighting PAR"]
 
     # PAR Use Efficiency
-    CO2_demand["PAR Efficiency"] = crop_data.loc["Leaf PAR use efficiency", "Value"] * (1 - (
+    CO2_demand["PAR Efficiency"] = crop_data["Leaf PAR use efficiency"] * (1 - (
             (np.exp(
-                -1 * crop_data.loc["Extinction Coefficient", "Value"] * crop_data.loc["Leaf Area Index", "Value"])) / (
-                    1 - crop_data.loc["Leaf Transmission Coefficient", "Value"])))
+                -1 * crop_data["Extinction Coefficient"] * crop_data["Leaf Area Index"])) / (
+                    1 - crop_data["Leaf Transmission Coefficient"])))
 
     # Stomatal Conductance
     CO2_demand["Stomatal Conductance"] = (
-            (crop_data.loc["a", "Value"] /
-             (crop_data.loc["b", "Value"] * crop_data.loc["Extinction Coefficient", "Value"])) *
+            (crop_data["a"] /
+             (crop_data["b"] * crop_data["Extinction Coefficient"])) *
             np.log(
                 (
-                        (crop_data.loc["b", "Value"] * crop["I StomCond"] * crop_data.loc[
-                            "Extinction Coefficient", "Value"]) +
-                        (1 - crop_data.loc["Leaf Transmission Coefficient", "Value"])
+                        (crop_data["b"] * crop["I StomCond"] * crop_data["Extinction Coefficient"]) +
+                        (1 - crop_data["Leaf Transmission Coefficient"])
                 ) /
                 (
-                        (crop_data.loc["b", "Value"] * crop["I StomCond"] *
-                         np.exp(-1 * crop_data.loc["Extinction Coefficient", "Value"] *
-                                crop_data.loc["Leaf Area Index", "Value"])) +
-                        (1 - crop_data.loc["Leaf Transmission Coefficient", "Value"])
+                        (crop_data["b"] * crop["I StomCond"] *
+                         np.exp(-1 * crop_data["Extinction Coefficient"] *
+                                crop_data["Leaf Area Index"])) +
+                        (1 - crop_data["Leaf Transmission Coefficient"])
                 )
             )
     )
@@ -116,29 +118,30 @@ def calculate_co2demand(inputs_dataframe, htc, heat_demand, light_demand):
         CO2_demand["Total PAR"] == 0,
         0,
         ((CO2_demand["Total PAR"] * CO2_demand["PAR Efficiency"] * CO2_demand["Stomatal Conductance"] *
-          global_assump.loc["CO2 Density", "Value"] * CO2_demand["Desired CO2 Level"])
+          global_assump["CO2 Density"] * CO2_demand["Desired CO2 Level"])
          / ((CO2_demand["Total PAR"] *
              CO2_demand["PAR Efficiency"]) + (CO2_demand["Stomatal Conductance"] *
-                                              global_assump.loc["CO2 Density", "Value"] *
+                                              global_assump["CO2 Density"] *
                                               CO2_demand["Desired CO2 Level"]))) * 3600
     )
 
     # Hourly Net Photosynthesis Rate (kg_CO2 / m2 h)
     CO2_demand["Net Photosynthesis Rate"] = np.where(
-        CO2_demand["Gross Photosynthesis Rate"] <= crop_data.loc["Dark Respiration Rate", "Value"] * 3600 *
-        crop_data.loc["Leaf Area Index", "Value"],
+        CO2_demand["Gross Photosynthesis Rate"] <= crop_data["Dark Respiration Rate"] * 3600 *
+        crop_data["Leaf Area Index"],
         0,
-        CO2_demand["Gross Photosynthesis Rate"] - (crop_data.loc["Dark Respiration Rate", "Value"] * 3600 *
-                                                   crop_data.loc["Leaf Area Index", "Value"])
+        CO2_demand["Gross Photosynthesis Rate"] - (crop_data["Dark Respiration Rate"] * 3600 *
+                                                   crop_data["Leaf Area Index"])
     )
 
     # Hourly Net Photosynthesis (kg_CO2 / h)
-    CO2_demand["Net Photosynthesis"] = CO2_demand["Net Photosynthesis Rate"] * gm_d.loc["Floor Area", "Value"]
+    CO2_demand["Net Photosynthesis"] = CO2_demand["Net Photosynthesis Rate"] * gm_d["Floor Area"]
 
     # Total CO2 Demand (kg)
     CO2_demand["Total CO2 Demand"] = (CO2_demand["Net Photosynthesis"] + CO2_demand["CO2 Change"] +
                                       CO2_demand["CO2 Loss Rate"])
 
+    CO2_demand = DemandPrecision.store(CO2_demand)
     CO2_demand.to_json("co2_demand.json")
 
     return CO2_demand
@@ -0,0 +1,132 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from StructuredLogging import get_logger
+
+log = get_logger(__name__)
+
+# Checks of the raw Met Eireann columns: physical range (temp and dewpt in C, wdsp in knots, rhum in %, clamt in
+# oktas with 9 for an obscured sky), largest plausible hour-to-hour step either way of a one-hour spike and the
+# number of identical consecutive hours treated as a stuck sensor. None skips a check, calm and overcast spells
+# legitimately repeat the same wind speed and cloud amount for many hours
+QA_LIMITS = {
+    "temp": {"low": -30.0, "high": 40.0, "max_step": 8.0, "flat_hours": 8},
+    "dewpt": {"low": -35.0, "high": 30.0, "max_step": 8.0, "flat_hours": 8},
+    "wdsp": {"low": 0.0, "high": 100.0, "max_step": None, "flat_hours": None},
+    "rhum": {"low": 0.0, "high": 100.0, "max_step": 40.0, "flat_hours": 24},
+    "clamt": {"low": 0.0, "high": 9.0, "max_step": None, "flat_hours": None},
+}
+
+# Dew points more than this above the air temperature are treated as outliers
+DEW_POINT_TOLERANCE = 0.5
+
+# Gaps up to this many hours are interpolated linearly, longer ones take the seasonal-diurnal profile
+MAX_INTERPOLATED_HOURS = 6
+
+REPORT_COLUMNS = ["missing", "outliers", "flat-lines", "interpolated", "profile filled", "longest gap (h)"]
+
+# Reports already logged by this process, calculate_inputs runs again in every dashboard and job worker
+_logged_reports = set()
+
+
+def _run_lengths(change):
+    # Length of the run each hour belongs to, a run starts where change is True
+    run = np.cumsum(change) - 1
+    return np.bincount(run)[run]
+
+
+def _flags(values, limits):
+    # Boolean masks of outliers and stuck values, NaNs are left to the caller
+    with np.errstate(invalid="ignore"):
+        outliers = (values < limits["low"]) | (values > limits["high"])
+        if limits["max_step"] is not None:
+            before = np.diff(values, prepend=np.nan)
+            after = np.diff(values, append=np.nan)
+            outliers |= (np.abs(before) > limits["max_step"]) & (np.abs(after) > limits["max_step"]) & (
+                np.sign(before) != np.sign(after))
+
+    flat = np.zeros(len(values), dtype=bool)
+    if limits["flat_hours"] is not None:
+        change = np.r_[True, values[1:] != values[:-1]]
+        lengths = _run_lengths(change)
+        flat = (lengths >= limits["flat_hours"]) & ~change & ~np.isnan(values)
+    return outliers, flat
+
+
+def seasonal_diurnal_profile(values, month, hour):
+    """Mean of the valid values for every month and hour of day, a (12, 24) array"""
+    valid = ~np.isnan(values)
+    key = (month[valid] - 1) * 24 + hour[valid]
+    with np.errstate(invalid="ignore"):
+        profile = (np.bincount(key, weights=values[valid], minlength=288) / np.bincount(key, minlength=288))
+        hourly = (np.bincount(hour[valid], weights=values[valid], minlength=24) /
+                  np.bincount(hour[valid], minlength=24))
+
+    # Months without any data fall back to the mean of that hour across the year, then to the overall mean
+    hourly = np.where(np.isnan(hourly), values[valid].mean(), hourly)
+    profile = profile.reshape(12, 24)
+    return np.where(np.isnan(profile), hourly, profile)
+
+
+def clean(climate_data, columns=tuple(QA_LIMITS)):
+    """
+    Checked and gap-filled copy of the hourly climate data, with a per-column report of what was changed.
+
+    Values out of range, one-hour spikes, dew points above the air temperature and stuck (flat-lined) stretches
+    are treated as missing. Gaps of up to MAX_INTERPOLATED_HOURS are interpolated linearly, longer gaps and gaps
+    at either end take the column's mean for that month and hour of day. The checked columns become float64.
+    """
+    climate_data = climate_data.copy()
+    month = climate_data.index.month.to_numpy()
+    hour = climate_data.index.hour.to_numpy()
+    position = np.arange(len(climate_data))
+
+    raw = {column: pd.to_numeric(climate_data[column], errors="coerce").to_numpy(dtype=float)
+           for column in columns}
+    report = pd.DataFrame(0, index=list(columns), columns=REPORT_COLUMNS)
+
+    for column in columns:
+        values = raw[column]
+        missing = np.isnan(values)
+        outliers, flat = _flags(values, QA_LIMITS[column])
+        if column == "dewpt" and "temp" in raw:
+            with np.errstate(invalid="ignore"):
+                outliers |= values > raw["temp"] + DEW_POINT_TOLERANCE
+
+        bad = missing | outliers | flat
+        report.loc[column, ["missing", "outliers", "flat-lines"]] = [
+            int(missing.sum()), int((outliers & ~missing).sum()), int((flat & ~outliers).sum())]
+        if not bad.any():
+            climate_data[column] = values
+            continue
+        if bad.all():
+            raise ValueError(f"The climate data has no valid {column} values")
+
+        # Gap lengths, and which gaps are bounded by valid hours on both sides
+        lengths = _run_lengths(np.r_[True, bad[1:] != bad[:-1]])
+        inside = (position > np.flatnonzero(~bad)[0]) & (position < np.flatnonzero(~bad)[-1])
+        interpolate = bad & inside & (lengths <= MAX_INTERPOLATED_HOURS)
+        from_profile = bad & ~interpolate
+
+        filled = values.copy()
+        filled[interpolate] = np.interp(position[interpolate], position[~bad], values[~bad])
+        clean_values = np.where(bad, np.nan, values)
+        filled[from_profile] = seasonal_diurnal_profile(clean_values, month, hour)[month[from_profile] - 1,
+                                                                                   hour[from_profile]]
+
+        climate_data[column] = filled
+        report.loc[column, ["interpolated", "profile filled", "longest gap (h)"]] = [
+            int(interpolate.sum()), int(from_profile.sum()), int(lengths[bad].max())]
+
+    return climate_data, report
+
+
+def log_report(report):
+    """Log a QA report at INFO the first time this process sees it and at DEBUG after that"""
+    key = report.to_json()
+    level = logging.DEBUG if key in _logged_reports else logging.INFO
+    _logged_reports.add(key)
+    log.log(level, "Climate data QA (hours):\n%s", report.to_string(),
+            extra={'fields': {'climate_qa': report.to_dict(orient="index")}})
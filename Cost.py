@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 from joblib import dump, load
 import Lib.EnergyDemand
+from Instrumentation import instrument
+
+CO2_TAX = 0.056  # €/kg of direct CO2 emissions
 
 
 class Source:
@@ -25,45 +28,39 @@ class Source:
         self.loan_rate = 0.035
         self.loan_term = loan_term
         self.co2_emissions = co2_emissions
-        self.co2_tax = 0.056  # €/kg
+        self.co2_tax = CO2_TAX  # €/kg
         self.evaluation_period = 50  # years
 
 
-    def constant_cost(self):
+    @instrument()
+    def constant_cost(self, yearly=False):
         """
         Calculate the constant costs of the energy source over its lifetime. This includes CAPEX and OPEX.
         Applicable to all energy sources.
+
+        The year-by-year table is only built with yearly=True, otherwise None is returned in its place.
         """
-        # Create a DataFrame with years as index
+        capex_eac, opex, fuel, co2_tax, eac = self.annual_costs()
+        costs_df = self.yearly_costs() if yearly else None
+        return capex_eac, opex, fuel, co2_tax, eac, costs_df, eac
+
+    def annual_costs(self):
+        """Annualised CAPEX, OPEX, fuel, CO2 tax and their total (EAC), without building a DataFrame"""
+        return annualised_costs(self.power, self.capital_cost, self.operational_cost, self.energy_output,
+                                self.fuel_cost, self.fuel_requirement, self.co2_emissions, self.lifetime,
+                                self.discount_rate, self.co2_tax)
+
+    def yearly_costs(self):
+        """Annual costs for every year of the evaluation period, as a DataFrame with years as index"""
+        capex_eac, opex, fuel, co2_tax, eac = self.annual_costs()
         years = range(0, self.evaluation_period)
-        costs_df = pd.DataFrame(index=years, columns=['CAPEX', 'OPEX', 'Fuel', 'CO2 Tax', 'Total Cost'])
-
-        # Calculate CAPEX
-        capex = self.power * self.capital_cost
-
-        # Calculate Annual Opex
-        # OPEX (Euro) = Operational cost (Euro/MWh) * Energy output (MWh)
-        opex = self.operational_cost * self.energy_output
-
-        # Calculate fuel cost per year
-        fuel = self.fuel_requirement * self.fuel_cost
-
-        # CO2 Tax
-        co2_tax = self.co2_emissions * self.co2_tax
-
-        capex_eac = capex * (self.discount_rate / (1 - (1 + self.discount_rate) ** -self.lifetime))
-
-        eac = capex * (self.discount_rate / (1 - (1 + self.discount_rate) ** -self.lifetime)) + opex + fuel + co2_tax
-
-        lifetime_cost = eac
-
-        costs_df['CAPEX'] = capex_eac
-        costs_df['OPEX'] = opex
-        costs_df['Fuel'] = fuel
-        costs_df['CO2 Tax'] = co2_tax
-        costs_df['Total Cost'] = costs_df['CAPEX'] + costs_df['OPEX'] + costs_df['Fuel'] + costs_df['CO2 Tax']
-
-        return capex_eac, opex, fuel, co2_tax, lifetime_cost, costs_df, eac
+        return pd.DataFrame({
+            'CAPEX': capex_eac,
+            'OPEX': opex,
+            'Fuel': fuel,
+            'CO2 Tax': co2_tax,
+            'Total Cost': eac,
+        }, index=years)
 
 
 class CHP(Source):
@@ -111,6 +108,103 @@ class CO2Import(Source):
     pass  # Inherits
 
 
+def capital_recovery_factor(lifetime, discount_rate=0.05):
+    """Fraction of the CAPEX paid each year when it is annualised over the lifetime (equivalent annual cost)"""
+    return discount_rate / (1 - (1 + discount_rate) ** -lifetime)
+
+
+def annualised_costs(power, capital_cost, operational_cost, energy_output, fuel_cost, fuel_requirement,
+                     co2_emissions, lifetime, discount_rate=0.05, co2_tax=CO2_TAX):
+    """
+    Equivalent annual cost of one or many designs: annualised CAPEX, OPEX, fuel, CO2 tax and their total.
+
+    Any argument may be a NumPy array, the results are broadcast so, for example, a column of capacities
+    against a row of discount rates gives the whole grid in one call.
+    """
+    capex_eac = power * capital_cost * capital_recovery_factor(lifetime, discount_rate)
+    opex = operational_cost * energy_output  # OPEX (Euro) = Operational cost (Euro/MWh) * Energy output (MWh)
+    fuel = fuel_requirement * fuel_cost
+    tax = co2_emissions * co2_tax
+    return capex_eac, opex, fuel, tax, capex_eac + opex + fuel + tax
+
+
+def source_cost(technology, power, supply, loan_term=20):
+    """
+    Cost model of one technology in TECHNOLOGY_COSTS at an installed power, given its supply table.
+
+    The energy output, fuel requirement and CO2 emissions are the yearly sums of the supply columns named in
+    TECHNOLOGY_COSTS, OPEX per MW installed is converted to the per-MWh rate used by Source.
+    """
+    params = TECHNOLOGY_COSTS[technology]
+    a, b, c = params['capital']
+    energy_output = supply[params['output']].sum()
+    return TECHNOLOGY_CLASSES[technology](
+        capital_cost=a * power ** b + c,
+        base_capex=0,
+        operational_cost=params['opex_per_mwh'] + params['opex_per_mw'] * power / (energy_output or 1.0),
+        fuel_cost=params['fuel_cost'],
+        power=power,
+        energy_output=energy_output,
+        fuel_requirement=supply[params['fuel']].sum() if params['fuel'] else 0,
+        cc_power=params['cc_power'],
+        lifetime=params['lifetime'],
+        loan_term=loan_term,
+        co2_emissions=supply["Direct CO2 Emissions"].sum()
+    )
+
+
+def technology_eac(technology, power, energy_output, fuel_requirement, co2_emissions, lifetime=None,
+                   discount_rate=0.05):
+    """
+    Batch version of the optimiser's cost model for one technology in TECHNOLOGY_COSTS.
+
+    power, energy_output (MWh/year of the output column), fuel_requirement (yearly sum of the fuel column),
+    co2_emissions (kg/year), lifetime and discount_rate may all be arrays. The lifetime defaults to the
+    technology's own. Designs with no capacity have no CAPEX. Returns the same components as annualised_costs.
+    """
+    params = TECHNOLOGY_COSTS[technology]
+    a, b, c = params['capital']
+    power = np.asarray(power, dtype=float)
+    energy_output = np.asarray(energy_output, dtype=float)
+    lifetime = params['lifetime'] if lifetime is None else np.asarray(lifetime, dtype=float)
+
+    # a * P ** b is infinite at P = 0 for the negative exponents, only evaluate it where there is capacity
+    installed = power > 0
+    safe_power = np.where(installed, power, 1.0)
+    capital_cost = np.where(installed, a * safe_power ** b + c, 0.0)
+
+    # OPEX per MW installed is converted to the per-MWh rate used by Source
+    opex_rate = params['opex_per_mwh'] + params['opex_per_mw'] * power / np.where(energy_output > 0, energy_output, 1.0)
+    return annualised_costs(power, capital_cost, opex_rate, energy_output, params['fuel_cost'], fuel_requirement,
+                            co2_emissions, lifetime, discount_rate)
+
+
+# Cost parameters of each technology as used by the optimiser and the capacity sliders.
+# Capital cost per MW installed is a * P ** b + c for capital = (a, b, c). OPEX is charged per MW installed and
+# per MWh of the "output" supply column, fuel is charged per unit of the "fuel" supply column.
+TECHNOLOGY_COSTS = {
+    'CHP': {'capital': (1.2e6, -0.4, 0), 'opex_per_mw': 0, 'opex_per_mwh': 9.3, 'fuel_cost': 90.1,
+            'lifetime': 25, 'cc_power': 0.16, 'output': "Yearly Electricity Output", 'fuel': "Fuel Requirement"},
+    'Geothermal': {'capital': (2890000, -0.45, 1.2e6), 'opex_per_mw': 11000, 'opex_per_mwh': 0, 'fuel_cost': 228.1,
+                   'lifetime': 30, 'cc_power': 0, 'output': "Yearly Heat Output", 'fuel': "Electricity for Heat"},
+    'GSHP': {'capital': (1297000, -0.21557, 0), 'opex_per_mw': 8000, 'opex_per_mwh': 0, 'fuel_cost': 228.1,
+             'lifetime': 25, 'cc_power': 0, 'output': "Yearly Heat Output", 'fuel': "Electricity for Heat"},
+    'Solar': {'capital': (1.572e6, -0.15, -1.5e5), 'opex_per_mw': 12000, 'opex_per_mwh': 0, 'fuel_cost': 0,
+              'lifetime': 30, 'cc_power': 0, 'output': "Yearly Electricity Output", 'fuel': None},
+    'WasteHeat': {'capital': (0, 0, 0), 'opex_per_mw': 0, 'opex_per_mwh': 0, 'fuel_cost': 90.1 * 0.9,
+                  'lifetime': 50, 'cc_power': 0, 'output': "Yearly Heat Output", 'fuel': "Steam Required"},
+    'Grid': {'capital': (0, 0, 0), 'opex_per_mw': 0, 'opex_per_mwh': 0, 'fuel_cost': 228.1,
+             'lifetime': 50, 'cc_power': 0, 'output': "Yearly Electricity Output", 'fuel': "Electricity for Light"},
+    'Boiler': {'capital': (103000, -0.17, 0), 'opex_per_mw': 3900, 'opex_per_mwh': 0, 'fuel_cost': 90.1,
+               'lifetime': 25, 'cc_power': 0.16, 'output': "Yearly Heat Output", 'fuel': "Fuel Requirement"},
+    'CO2': {'capital': (0, 0, 0), 'opex_per_mw': 0, 'opex_per_mwh': 0, 'fuel_cost': 0.14678,
+            'lifetime': 50, 'cc_power': 0, 'output': "CO2 Requirement", 'fuel': "CO2 Requirement"},
+}
+
+TECHNOLOGY_CLASSES = {'CHP': CHP, 'Geothermal': Geothermal, 'GSHP': GSHP, 'Solar': SolarPV, 'WasteHeat': WasteHeat,
+                      'Grid': Grid, 'Boiler': Boiler, 'CO2': CO2Import}
+
+
 # Example usage:
 if __name__ == "__main__":
 
@@ -0,0 +1,278 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# GREENHOUSE_DEMAND_BACKEND selects how the heat, light and CO2 demand are calculated: "auto" (the default) uses
+# the compiled kernels below when Numba is installed and the NumPy code of each stage otherwise, "numba" and
+# "numpy" force one of them
+BACKEND = os.environ.get("GREENHOUSE_DEMAND_BACKEND", "auto").lower()
+
+HEAT_COLUMNS = ["Q_s", "Q_sl", "Q_m", "Q_co2", "Sources", "Q_t", "Q_i", "Q_p", "Q_r,sr", "Q_r,nr", "Q_r,sw",
+                "Q_r,ew", "Q_r,ww", "Q_r,i", "Q_g", "Q_r,total", "Q_e", "Sinks", "Q_net,W", "Q_net,MJ", "QnetMWh"]
+LIGHT_COLUMNS = ["MJ", "MWh"]
+CO2_COLUMNS = ["Desired CO2 Level", "CO2 Change", "CO2 Loss Rate", "Lighting PAR", "Total PAR", "PAR Efficiency",
+               "Stomatal Conductance", "Gross Photosynthesis Rate", "Net Photosynthesis Rate", "Net Photosynthesis",
+               "Total CO2 Demand"]
+
+
+def use_numba():
+    """Whether the stages should call the compiled kernels"""
+    if BACKEND == "numpy":
+        return False
+    if numba is None:
+        if BACKEND == "numba":
+            raise ImportError("GREENHOUSE_DEMAND_BACKEND is numba but Numba is not installed")
+        return False
+    return True
+
+
+def _jit(func):
+    # Without Numba the kernels stay plain Python, the stages never call them then but they can still be checked
+    if numba is None:
+        return func
+    return numba.njit(cache=True, nogil=True)(func)
+
+
+# The kernels fuse all the elementwise steps of a stage into one loop over hours. Scalar factors are multiplied
+# together before the loop in the same order as the NumPy code, so both backends round the same way; results
+# can still differ in the last bits where libm and NumPy evaluate exp, log and powers differently.
+
+@_jit
+def _heat_kernel(hour, solar_gh, g_sr, g_nr, g_sw, g_ew, g_ww, g_nw, temp_out_c, temp_sp_c, temp_sp_k, tsky,
+                 moisture_transfer, u_roof, u_north, u_south, u_side, cover_temp,
+                 shgc_r, k_sr, k_nr, k_sw, shgc_side, k_ew, k_ww, k_nw,
+                 light_off_radiation, light_on_hour, light_off_hour, q_light, q_m,
+                 a_roof, a_nw, a_sw, a_side, k_i, k_p, k_r_sr, k_r_nr, k_r_sw, k_r_ew, k_r_ww, k_r_i, latent_heat):
+    n = hour.shape[0]
+    out = np.zeros((n, 21))
+    for i in range(n):
+        lighting_hours = hour[i] > light_on_hour and hour[i] <= light_off_hour
+
+        q_s = (shgc_r * ((k_sr * g_sr[i]) + (k_nr * g_nr[i])) + k_sw * g_sw[i]
+               + shgc_side * ((k_ew * g_ew[i]) + (k_ww * g_ww[i])) + k_nw * g_nw[i])
+        q_sl = q_light if solar_gh[i] < light_off_radiation and lighting_hours else 0.0
+        sources = q_m + q_s + q_sl + 0.0
+
+        temp_diff = temp_sp_c[i] - temp_out_c[i]
+        heating = temp_diff > 0.0
+        q_t = 0.0
+        q_i = 0.0
+        q_p = 0.0
+        if heating:
+            q_t = (u_roof[i] * a_roof + u_north[i] * a_nw + u_south[i] * a_sw + u_side[i] * a_side) * temp_diff
+            q_i = k_i * temp_diff
+            q_p = k_p * temp_diff
+
+        q_r_sr = 0.0
+        q_r_nr = 0.0
+        q_r_sw = 0.0
+        q_r_ew = 0.0
+        q_r_ww = 0.0
+        q_r_i = 0.0
+        if heating and lighting_hours:
+            cover_exchange = temp_sp_k[i] ** 4.0 - cover_temp[i] ** 4.0
+            q_r_sr = k_r_sr * cover_exchange
+            q_r_nr = k_r_nr * cover_exchange
+            q_r_sw = k_r_sw * cover_exchange
+            q_r_ew = k_r_ew * cover_exchange
+            q_r_ww = k_r_ww * cover_exchange
+            q_r_i = k_r_i * (temp_sp_k[i] ** 4.0 - tsky[i] ** 4.0)
+        q_r_total = q_r_sr + q_r_nr + q_r_sw + q_r_ew + q_r_ww + q_r_i + 0.0
+
+        q_e = moisture_transfer[i] * latent_heat
+        sinks = q_t + q_i + q_p + q_r_total + q_e
+
+        q_net_w = sinks - sources if sinks - sources > 0.0 else 0.0
+        q_net_mj = q_net_w * 3600 / 1e6
+
+        row = out[i]
+        row[0] = q_s
+        row[1] = q_sl
+        row[2] = q_m
+        row[4] = sources
+        row[5] = q_t
+        row[6] = q_i
+        row[7] = q_p
+        row[8] = q_r_sr
+        row[9] = q_r_nr
+        row[10] = q_r_sw
+        row[11] = q_r_ew
+        row[12] = q_r_ww
+        row[13] = q_r_i
+        row[15] = q_r_total
+        row[16] = q_e
+        row[17] = sinks
+        row[18] = q_net_w
+        row[19] = q_net_mj
+        row[20] = q_net_mj / 3600
+    return out
+
+
+@_jit
+def _light_kernel(hour, solar_gh, light_off_radiation, light_on_hour, light_off_hour, lighting_mj):
+    n = hour.shape[0]
+    out = np.zeros((n, 2))
+    for i in range(n):
+        if hour[i] > light_on_hour and hour[i] <= light_off_hour and solar_gh[i] < light_off_radiation:
+            out[i, 0] = lighting_mj
+            out[i, 1] = lighting_mj / 3600
+    return out
+
+
+@_jit
+def _co2_kernel(hour, solar_gh, solar_par, i_stomcond, co2_on_hour, co2_off_hour, co2_day, co2_night, ambient,
+                co2_volume, light_off_radiation, light_on_hour, light_off_hour, lighting_par, par_efficiency,
+                conductance_factor, b, extinction, leaf_light, transmission, co2_density, respiration, floor_area):
+    n = hour.shape[0]
+    out = np.zeros((n, 11))
+    previous_level = 0.0
+    for i in range(n):
+        level = co2_day if hour[i] > co2_on_hour and hour[i] <= co2_off_hour else co2_night
+
+        if i == 0:
+            change = (co2_volume * (level - ambient)) / 1e6
+        else:
+            change = (co2_volume * (level - previous_level)) / 1e6
+        if not change > 0.0:
+            change = 0.0
+        previous_level = level
+
+        loss = co2_volume * (level - ambient) / 1e6
+
+        par = 0.0
+        if not solar_gh[i] > light_off_radiation and hour[i] > light_on_hour and hour[i] <= light_off_hour:
+            par = lighting_par
+        total_par = solar_par[i] + par
+
+        conductance = conductance_factor * np.log(
+            ((b * i_stomcond[i] * extinction) + (1 - transmission)) /
+            ((b * i_stomcond[i] * leaf_light) + (1 - transmission))
+        )
+
+        gross = 0.0
+        if total_par != 0.0:
+            gross = ((total_par * par_efficiency * conductance * co2_density * level)
+                     / ((total_par * par_efficiency) + (conductance * co2_density * level))) * 3600
+
+        net_rate = 0.0 if gross <= respiration else gross - respiration
+        net = net_rate * floor_area
+
+        row = out[i]
+        row[0] = level
+        row[1] = change
+        row[2] = loss
+        row[3] = par
+        row[4] = total_par
+        row[5] = par_efficiency
+        row[6] = conductance
+        row[7] = gross
+        row[8] = net_rate
+        row[9] = net
+        row[10] = net + change + loss
+    return out
+
+
+def heat_demand(inputs, htc):
+    """Heat demand DataFrame of calculate_heatdemand, from one compiled pass over the hours"""
+    gm_d, gm_r, gm_south, gm_side, gm_north = (inputs.gm_d, inputs.gm_r, inputs.gm_south, inputs.gm_side,
+                                               inputs.gm_north)
+    climate, op_light, op_enviro = inputs.climate, inputs.op_light, inputs.op_enviro
+    global_assump = inputs.global_assump
+    sigma = global_assump["Stefan-Boltzmann Constant"]
+
+    out = _heat_kernel(
+        inputs.hour, inputs.crop["Solar Radiation in Greenhouse"],
+        climate["Solar Radiation (South Roof)"], climate["Solar Radiation (North Roof)"],
+        climate["Solar Radiation (South Wall)"], climate["Solar Radiation (East Wall)"],
+        climate["Solar Radiation (West Wall)"], climate["Solar Radiation (North Wall)"],
+        climate["Temperature C"], inputs.op_temp_sp["Temperature C"], inputs.op_temp_sp["Temperature K"],
+        climate["Tsky"], inputs.crop["Moisture Transfer Rate"],
+        htc["Roof U-Value"].to_numpy(dtype=float), htc["North Wall U-Value"].to_numpy(dtype=float),
+        htc["South Wall U-Value"].to_numpy(dtype=float), htc["Side Wall U-Value"].to_numpy(dtype=float),
+        htc["Cover Temp"].to_numpy(dtype=float),
+        gm_r["Solar Heat Gain Coefficient"],
+        gm_r["Solar Transmissivity"] * gm_d["South Roof Area"],
+        gm_r["Solar Transmissivity"] * gm_d["North Roof Area"],
+        gm_south["Solar Heat Gain Coefficient"] * gm_south["Solar Transmissivity"] * gm_d["South Wall Area"],
+        gm_side["Solar Heat Gain Coefficient"],
+        gm_side["Solar Transmissivity"] * gm_d["East Wall Area"],
+        gm_side["Solar Transmissivity"] * gm_d["West Wall Area"],
+        gm_north["Solar Heat Gain Coefficient"] * gm_north["Solar Transmissivity"] * gm_d["North Wall Area"],
+        op_light["Switch off if solar radiation is greater than:"],
+        op_light["Time lighting is switched on"],
+        op_light["Time lighting is switched off"],
+        op_light["Installed Power of lamp"] * op_light["Lighting Heat Conversion Factor"]
+        * op_light["Lighting Allowance Factor"] * gm_d["Floor Area"],
+        op_enviro["No. of Air Recirculation Fans"] * (
+                op_enviro["Motor Power Rating"] / op_enviro["Recirculation Motor Efficiency"])
+        * op_enviro["Recirculation Motor Load Factor"] * op_enviro["Recirculation Motor Use Factor"],
+        gm_d["North Roof Area"] + gm_d["South Roof Area"],
+        gm_d["North Wall Area"],
+        gm_d["South Wall Area"],
+        gm_d["East Wall Area"] + gm_d["West Wall Area"],
+        0.33 * op_enviro["Number of Air Exchanges per hour"] * gm_d["Greenhouse Volume"],
+        gm_south["Perimeter Heat Loss Factor"] * gm_d["Greenhouse Perimeter"],
+        sigma * gm_r["Emissivity"] * gm_d["South Roof Area"] * gm_r["View Factor"],
+        sigma * gm_r["Emissivity"] * gm_d["North Roof Area"] * gm_r["View Factor"],
+        sigma * gm_south["Emissivity"] * gm_d["South Wall Area"] * gm_south["View Factor"],
+        sigma * gm_side["Emissivity"] * gm_d["East Wall Area"] * gm_side["View Factor"],
+        sigma * gm_side["Emissivity"] * gm_d["West Wall Area"] * gm_side["View Factor"],
+        sigma * global_assump["Emissivity of plants"] * global_assump["Avg Transmissivity LW Radiation"]
+        * global_assump["Sky View Factor"] * gm_d["Floor Area"],
+        global_assump["Latent Heat of Water Vaporisation"],
+    )
+
+    heat_demand = pd.DataFrame(out, index=inputs.index, columns=HEAT_COLUMNS)
+    heat_demand["Q_co2"] = 0  # Assumed zero in excel
+    heat_demand["Q_g"] = 0
+    return heat_demand
+
+
+def light_demand(inputs):
+    """Light demand DataFrame of calculate_lightdemand, from one compiled pass over the hours"""
+    op_light = inputs.op_light
+    out = _light_kernel(
+        inputs.hour, inputs.crop["Solar Radiation in Greenhouse"],
+        op_light["Switch off if solar radiation is greater than:"],
+        op_light["Time lighting is switched on"],
+        op_light["Time lighting is switched off"],
+        (op_light["Installed Power of lamp"] * inputs.gm_d["Floor Area"]) * 3600 / 1e6,
+    )
+    return pd.DataFrame(out, index=inputs.index, columns=LIGHT_COLUMNS)
+
+
+def co2_demand(inputs):
+    """CO2 demand DataFrame of calculate_co2demand, from one compiled pass over the hours"""
+    crop_data, op_co2, op_light = inputs.crop_data, inputs.op_co2, inputs.op_light
+    co2_density = inputs.global_assump["CO2 Density"]
+
+    # exp() of the constant leaf terms is taken here by NumPy, as in the NumPy code
+    leaf_light = np.exp(-1 * crop_data["Extinction Coefficient"] * crop_data["Leaf Area Index"])
+
+    out = _co2_kernel(
+        inputs.hour, inputs.crop["Solar Radiation in Greenhouse"],
+        inputs.crop["Photosynthetically Active Solar Radiation"], inputs.crop["I StomCond"],
+        op_co2["Daytime CO2 Level On"], op_co2["Daytime CO2 Level Off"],
+        op_co2["Daytime CO2 Level"], op_co2["Nighttime CO2 Level"], op_co2["Ambient Levels"],
+        co2_density * inputs.gm_d["Greenhouse Volume"],
+        op_light["Switch off if solar radiation is greater than:"],
+        op_light["Time lighting is switched on"],
+        op_light["Time lighting is switched off"],
+        op_light["Installed Power of lamp"] * op_light["Fraction of Lighting Input Converted to PAR"],
+        crop_data["Leaf PAR use efficiency"] * (1 - (leaf_light / (1 - crop_data["Leaf Transmission Coefficient"]))),
+        crop_data["a"] / (crop_data["b"] * crop_data["Extinction Coefficient"]),
+        crop_data["b"],
+        crop_data["Extinction Coefficient"],
+        float(leaf_light),
+        crop_data["Leaf Transmission Coefficient"],
+        co2_density,
+        crop_data["Dark Respiration Rate"] * 3600 * crop_data["Leaf Area Index"],
+        inputs.gm_d["Floor Area"],
+    )
+    return pd.DataFrame(out, index=inputs.index, columns=CO2_COLUMNS)
@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+
+# GREENHOUSE_DEMAND_PRECISION=float32 stores the demand DataFrames, and the demand store shared by the dashboard
+# workers, in single precision to halve their memory for large scenario batches. The default is float64
+PRECISION = os.environ.get("GREENHOUSE_DEMAND_PRECISION", "float64").lower()
+if PRECISION not in ("float64", "float32"):
+    raise ValueError(f"GREENHOUSE_DEMAND_PRECISION must be float64 or float32, not {PRECISION!r}")
+
+DTYPE = np.dtype(PRECISION)
+
+
+def relative_error_bound():
+    """
+    Largest relative difference of a stored demand value to the float64 path.
+
+    The stages calculate in float64 and round each output value once when storing it, so in float32 mode every
+    value is within half a float32 ulp (2**-24, about 6e-8) of the float64 result. The demand values are far
+    inside float32's normal range (1.2e-38 to 3.4e38), so no value underflows or overflows. Totals are taken in
+    float64 (EnergySource converts the demand to float64, DemandRollups aggregates in float64), so the sum of
+    hourly values of one sign is also within 2**-24 relative, and any sum within 2**-24 times the sum of the
+    absolute values.
+    """
+    return 0.0 if DTYPE == np.float64 else float(np.finfo(DTYPE).eps) / 2
+
+
+def store(demand):
+    """Demand DataFrame with its columns in the configured precision"""
+    if DTYPE == np.float64:
+        return demand
+    return demand.astype(DTYPE)
@@ -0,0 +1,52 @@
+import pandas as pd
+
+# Rollup periods and their pandas resample rules
+PERIODS = {
+    "daily": "D",
+    "weekly": "W",
+    "monthly": "MS",
+}
+
+
+def calculate_rollups(demand, percentile=0.95):
+    """
+    Aggregate every numeric column of an hourly demand DataFrame by day, week and month.
+
+    Returns a dictionary of period name to DataFrame, indexed by period start (week end for weekly) with
+    (column, statistic) columns: hours, sum, mean, peak, min and the requested percentile, e.g. p95.
+    The average daily demand of a period is sum / (hours / 24).
+    """
+    # Aggregate in float64 whatever precision the demand is stored in
+    demand = demand.select_dtypes("number").astype("float64")
+    demand.index = pd.to_datetime(demand.index, dayfirst=True)
+    percentile_name = f"p{percentile * 100:g}"
+
+    rollups = {}
+    for period, rule in PERIODS.items():
+        resampled = demand.resample(rule)
+        stats = pd.concat({
+            # Every hour of the period, a NaN hour still counts towards the average daily demand
+            "hours": pd.DataFrame({column: resampled.size() for column in demand.columns}),
+            "sum": resampled.sum(),
+            "mean": resampled.mean(),
+            "peak": resampled.max(),
+            "min": resampled.min(),
+            percentile_name: resampled.quantile(percentile),
+        }, axis=1)
+        # Group the statistics under each demand column: rollups["monthly"]["QnetMWh"]["sum"]
+        rollups[period] = stats.swaplevel(axis=1)[demand.columns]
+
+    return rollups
+
+
+def summarise_rollups(rollup):
+    """Whole-period totals of one column's rollup (any period): hours, sum, peak, min and average daily demand"""
+    hours = rollup["hours"].sum()
+    total = rollup["sum"].sum()
+    return {
+        "hours": hours,
+        "sum": total,
+        "peak": rollup["peak"].max(),
+        "min": rollup["min"].min(),
+        "daily_mean": total / (hours / 24) if hours else 0,
+    }
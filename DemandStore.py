@@ -0,0 +1,221 @@
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+import DemandPrecision
+
+# Layout of the files in a store version, stores saved with another layout are rebuilt
+STORE_FORMAT = 2
+
+
+def save_demand(demand, directory, fingerprint="", rollups=None):
+    """
+    Save hourly demand DataFrames as .npy files that can be memory-mapped by other processes.
+
+    demand is a dictionary of name to DataFrame. Each DataFrame is stored as one array in the demand precision
+    (float64, or float32 with GREENHOUSE_DEMAND_PRECISION=float32) with its DatetimeIndex as int64 nanoseconds.
+    Every save writes a new version folder inside directory and then switches current.json to it, which is an
+    atomic file replace, so a reader always finds a complete store. fingerprint identifies the inputs the demand
+    was calculated from, see demand_is_saved. The previous version is kept for readers that are still opening
+    it, older ones are removed.
+
+    rollups is an optional dictionary of name to the calculate_rollups result of that demand, saved in float64
+    in the same version folder and read back with load_rollups.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = f"v{time.time_ns()}-{os.getpid()}"
+    temp_directory = os.path.join(directory, f"{version}.tmp")
+    os.makedirs(temp_directory)
+
+    metadata = {}
+    for name, df in demand.items():
+        np.save(os.path.join(temp_directory, f"{name}_values.npy"), df.to_numpy(dtype=DemandPrecision.DTYPE))
+        np.save(os.path.join(temp_directory, f"{name}_index.npy"), pd.to_datetime(df.index).asi8)
+        metadata[name] = list(df.columns)
+
+    with open(os.path.join(temp_directory, "columns.json"), "w") as f:
+        json.dump(metadata, f)
+
+    rollup_metadata = {}
+    for name, periods in (rollups or {}).items():
+        rollup_metadata[name] = {}
+        for period, df in periods.items():
+            np.save(os.path.join(temp_directory, f"{name}_{period}_rollup_values.npy"), df.to_numpy(dtype="float64"))
+            np.save(os.path.join(temp_directory, f"{name}_{period}_rollup_index.npy"), df.index.asi8)
+            rollup_metadata[name][period] = [list(column) for column in df.columns]
+
+    with open(os.path.join(temp_directory, "rollups.json"), "w") as f:
+        json.dump(rollup_metadata, f)
+    os.replace(temp_directory, os.path.join(directory, version))
+
+    previous = _current(directory)
+    temp_pointer = os.path.join(directory, f"current.json.{os.getpid()}.tmp")
+    with open(temp_pointer, "w") as f:
+        json.dump({"version": version, "fingerprint": fingerprint, "format": STORE_FORMAT}, f)
+    os.replace(temp_pointer, os.path.join(directory, "current.json"))
+
+    keep = {version, previous["version"] if previous else None}
+    for entry in os.listdir(directory):
+        if entry.startswith("v") and entry not in keep and os.path.isdir(os.path.join(directory, entry)):
+            # Fails harmlessly on Windows while another process still maps the files
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+def _current(directory):
+    # Version and fingerprint of the store, None when nothing has been saved
+    try:
+        with open(os.path.join(directory, "current.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load_demand(directory):
+    """
+    Load the demand saved by save_demand, memory-mapped read-only.
+
+    The operating system shares the pages between every process that maps the same files, so several server
+    workers hold one copy of the data. The DataFrames are read-only: modifying a value raises an error.
+    """
+    directory = os.path.join(directory, _current(directory)["version"])
+    with open(os.path.join(directory, "columns.json")) as f:
+        metadata = json.load(f)
+
+    demand = {}
+    for name, columns in metadata.items():
+        values = np.load(os.path.join(directory, f"{name}_values.npy"), mmap_mode="r")
+        index = pd.DatetimeIndex(np.load(os.path.join(directory, f"{name}_index.npy")))
+        demand[name] = pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+    return demand
+
+
+def load_rollups(directory):
+    """Load the rollups saved with the demand, memory-mapped read-only like load_demand"""
+    directory = os.path.join(directory, _current(directory)["version"])
+    with open(os.path.join(directory, "rollups.json")) as f:
+        metadata = json.load(f)
+
+    rollups = {}
+    for name, periods in metadata.items():
+        rollups[name] = {}
+        for period, columns in periods.items():
+            values = np.load(os.path.join(directory, f"{name}_{period}_rollup_values.npy"), mmap_mode="r")
+            index = pd.DatetimeIndex(np.load(os.path.join(directory, f"{name}_{period}_rollup_index.npy")))
+            rollups[name][period] = pd.DataFrame(values, index=index, copy=False,
+                                                 columns=pd.MultiIndex.from_tuples(map(tuple, columns)))
+
+    return rollups
+
+
+def demand_is_saved(directory, fingerprint=None):
+    """Whether the store holds demand, calculated from the inputs with this fingerprint if one is given"""
+    current = _current(directory)
+    return (current is not None and current.get("format") == STORE_FORMAT and
+            (fingerprint is None or current["fingerprint"] == fingerprint))
+
+
+@contextmanager
+def store_lock(directory, poll=0.5, stale_after=3600):
+    """
+    Hold the store's lock file, so only one process calculates and saves the demand at a time.
+
+    The lock is a file created exclusively, which works across processes on every platform. A lock older than
+    stale_after seconds is assumed to belong to a process that died and is taken over.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "store.lock")
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > stale_after:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(poll)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Shared memory blocks attached by this process, kept open for as long as the process uses their DataFrames
+_attached_blocks = []
+
+
+class SharedDemand:
+    """
+    Demand DataFrames published once in shared memory, for worker processes to use without copying them.
+
+    The publishing process creates one block per DataFrame holding its index (int64 nanoseconds) followed by its
+    values in the demand precision, and must close() the SharedDemand, or use it as a context manager, to free
+    the blocks. The object itself only pickles the block names and layouts, so passing it to a worker is cheap;
+    attach() in the worker then returns read-only DataFrames viewing the shared blocks.
+    """
+
+    def __init__(self, demand):
+        self.layouts = {}
+        self._blocks = []
+        try:
+            for name, df in demand.items():
+                values = df.to_numpy(dtype=DemandPrecision.DTYPE)
+                index = pd.to_datetime(df.index).asi8
+                block = shared_memory.SharedMemory(create=True, size=max(1, index.nbytes + values.nbytes))
+                self._blocks.append(block)
+
+                np.ndarray(index.shape, dtype=np.int64, buffer=block.buf)[:] = index
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf, offset=index.nbytes)[:] = values
+                self.layouts[name] = {'block': block.name, 'rows': len(index), 'columns': list(df.columns),
+                                      'dtype': values.dtype.str}
+        except Exception:
+            self.close()
+            raise
+
+    def __getstate__(self):
+        return {'layouts': self.layouts, '_blocks': []}
+
+    def attach(self):
+        """Read-only DataFrames viewing the shared blocks, keyed as the demand passed to the constructor"""
+        demand = {}
+        for name, layout in self.layouts.items():
+            block = shared_memory.SharedMemory(name=layout['block'])
+            _attached_blocks.append(block)
+
+            rows = layout['rows']
+            index = np.ndarray((rows,), dtype=np.int64, buffer=block.buf)
+            values = np.ndarray((rows, len(layout['columns'])), dtype=np.dtype(layout['dtype']), buffer=block.buf,
+                                offset=index.nbytes)
+            index.flags.writeable = False
+            values.flags.writeable = False
+            demand[name] = pd.DataFrame(values, index=pd.DatetimeIndex(index.view("M8[ns]"), copy=False),
+                                        columns=layout['columns'], copy=False)
+
+        return demand
+
+    def close(self):
+        """Free the shared blocks, only the publishing process should call this"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
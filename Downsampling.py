@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling, returns the indices of the points to keep.
+
+    The first and last points are always kept. The points in between are split into n_out - 2 buckets and
+    from each bucket the point forming the largest triangle with the previously kept point and the mean of
+    the next bucket is kept, which preserves the visual shape of the series.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Mean of every bucket, the next bucket's mean is the third corner of the triangle
+    sizes = np.diff(edges)
+    mean_x = np.add.reduceat(x[:edges[-1]], edges[:-1]) / sizes
+    mean_y = np.add.reduceat(y[:edges[-1]], edges[:-1]) / sizes
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    previous = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        areas = np.abs(
+            (x[previous] - mean_x[b + 1]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y[b + 1] - y[previous])
+        )
+        previous = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        indices[b + 1] = previous
+
+    return indices
+
+
+def minmax_indices(y, n_out):
+    """Min-max downsampling: the indices of the minimum and maximum of n_out / 2 equal buckets, in order"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+    # Sorting by bucket then value puts each bucket's minimum first and maximum last
+    order = np.lexsort((np.nan_to_num(y, nan=np.nanmin(y)), bucket))
+    first = edges[:-1]
+    last = edges[1:] - 1
+    return np.unique(np.concatenate((order[first], order[last])))
+
+
+def downsample(series, n_out, method="lttb"):
+    """Downsample a Series with a DatetimeIndex (or any numeric index) to at most n_out points"""
+    if len(series) <= n_out:
+        return series
+
+    if method == "minmax":
+        indices = minmax_indices(series.to_numpy(), n_out)
+    elif method == "lttb":
+        x = series.index.asi8 if hasattr(series.index, "asi8") else series.index.to_numpy()
+        indices = lttb_indices(x, series.to_numpy(), n_out)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    return series.iloc[indices]
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from joblib import dump, load
+from Instrumentation import instrument
 
 class EnergySource:
     """
@@ -9,10 +10,11 @@ class EnergySource:
     grid_emissions = 332  # kgCO₂ per MWh of electricity
 
     def __init__(self, heat_demand, light_demand, co2_demand):
-        self._heat_demand = heat_demand["QnetMWh"].astype(float)  # Heat demand in MWh
-        self._light_demand = light_demand["MWh"].astype(float)  # Light demand in MWh
-        self._co2_demand = co2_demand["Total CO2 Demand"].astype(float)   # CO2 demand in kg
-        self._co2_absorbed = co2_demand["Net Photosynthesis"].astype(float)  # CO2 absorbed by plants in kg
+        # Views of float64 demand rather than copies, so demand in shared memory is not copied into every worker
+        self._heat_demand = heat_demand["QnetMWh"].astype(float, copy=False)  # Heat demand in MWh
+        self._light_demand = light_demand["MWh"].astype(float, copy=False)  # Light demand in MWh
+        self._co2_demand = co2_demand["Total CO2 Demand"].astype(float, copy=False)   # CO2 demand in kg
+        self._co2_absorbed = co2_demand["Net Photosynthesis"].astype(float, copy=False)  # CO2 absorbed by plants in kg
 
     def calculate_max_supply(self):
         raise NotImplementedError("Subclasses must implement demand calculations")
@@ -48,6 +50,7 @@ class CHP(EnergySource):
 
         return df, chp_max_power
 
+    @instrument()
     def calculate_supply(self, x, chp_max_power, chp_df):
         df = pd.DataFrame(index=self._heat_demand.index)
         df["Fuel Requirement"] = chp_df["Max Fuel Requirement"] * x / chp_max_power
@@ -87,6 +90,7 @@ class Geothermal(EnergySource):
 
         return df, geo_max_power
 
+    @instrument()
     def calculate_supply(self, x, geo_max_power):
         df = pd.DataFrame(index=self._heat_demand.index)
         df["Electricity for Heat"] = self._heat_demand / self.cop * x / geo_max_power  # Electricity required for heat
@@ -111,6 +115,7 @@ class GSHP(EnergySource):
 
         return df, gshp_max_power
 
+    @instrument()
     def calculate_supply(self, x, gshp_max_power):
         df = pd.DataFrame(index=self._heat_demand.index)
 
@@ -135,6 +140,7 @@ class WasteHeat(EnergySource):
 
         return df, wasteheat_max_power
 
+    @instrument()
     def calculate_supply(self, x, wasteheat_max_power):
         df = pd.DataFrame(index=self._heat_demand.index)
         df["Steam Required"] = self._heat_demand / self.exchanger_efficiency * x / wasteheat_max_power  # Heat from steam required to meet demand
@@ -161,6 +167,7 @@ class SolarPV(EnergySource):
 
         return df, solar_max_power
 
+    @instrument()
     def calculate_supply(self, x, solar_max_power):
         df = pd.DataFrame(index=self._heat_demand.index)
 
@@ -182,6 +189,7 @@ class Grid(EnergySource):
 
         return df, grid_max_power
 
+    @instrument()
     def calculate_supply(self, x, grid_max_power):
         df = pd.DataFrame(index=self._heat_demand.index)
 
@@ -215,6 +223,7 @@ class Boiler(EnergySource):
 
         return df, boiler_max_power
 
+    @instrument()
     def calculate_supply(self, x, boiler_max_power, boiler_df):
         df = pd.DataFrame(index=self._heat_demand.index)
         df["Fuel Requirement"] = boiler_df["Max Fuel Requirement"] * x/boiler_max_power
@@ -248,6 +257,7 @@ class CO2Import(EnergySource):
 
         return df, co2_max_power
 
+    @instrument()
     def calculate_supply(self, x, co2_max_power):
         df = pd.DataFrame(index=self._heat_demand.index)
         df["CO2 Requirement"] = self._co2_demand * x / co2_max_power  # CO2 emissions from CO2 import
@@ -0,0 +1,173 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+# Parameter/Unit/Value tables read from the CSV inputs or derived from them, stored as ParameterSets
+PARAMETER_TABLES = ("gm_d", "gm_r", "gm_south", "gm_side", "gm_north", "crop_data",
+                    "op_enviro", "op_temp", "op_light", "op_co2", "global_assump")
+
+# Hourly tables, stored as column name -> read-only array aligned with GreenhouseInputs.index
+TIME_SERIES = ("climate", "crop", "op_temp_sp")
+
+
+# Units of the parameters calculated in calculate_inputs rather than read from a CSV
+DERIVED_UNITS = {
+    "Max Height": "m",
+    "Floor Area": "m2",
+    "South Wall Area": "m2",
+    "North Wall Area": "m2",
+    "East Wall Area": "m2",
+    "West Wall Area": "m2",
+    "South Roof Area": "m2",
+    "North Roof Area": "m2",
+    "Total Area of Glass": "m2",
+    "Greenhouse Volume": "m3",
+    "Total Roof Area": "m2",
+    "Total Wall Area": "m2",
+    "Greenhouse Perimeter": "m",
+    "Characteristic Length Surface": "m",
+    "Characteristic Length": "m",
+    "View Factor": "-",
+    "Leaf Area Index": "m2 m-2",
+    "Thermal Conductivity of Air": "W m-1 K-1",
+    "Stefan-Boltzmann Constant": "W m-2 K-4",
+    "Sky View Factor": "-",
+    "Emissivity of plants": "-",
+    "Acceleration due to gravity": "m s-2",
+    "Dynamic Viscosity of Air": "kg m-1 s-1",
+    "Specific Heat of Air": "J kg-1 K-1",
+    "Air Density": "kg m-3",
+    "Avg Transmissivity LW Radiation": "-",
+    "Atmospheric Pressure": "Pa",
+    "CO2 Density": "kg m-3",
+    "Latent Heat of Water Vaporisation": "J kg-1",
+    "Discount Factor": "-",
+}
+
+
+class ParameterSet(Mapping):
+    """
+    Resolved Parameter/Unit/Value table: parameter name -> float, with the unit of each parameter.
+
+    Looking a parameter up is a dict look-up returning a plain float, so the vectorised calculations never
+    index a DataFrame by label or get object-dtype values. Sets are immutable, derive() returns a new one.
+    """
+    __slots__ = ("_values", "_units")
+
+    def __init__(self, values=None, units=None):
+        values = values or {}
+        units = units or {}
+        self._values = {name: float(value) for name, value in values.items()}
+        self._units = {name: units.get(name) or DERIVED_UNITS.get(name) for name in self._values}
+
+    @classmethod
+    def from_table(cls, table):
+        """Labelled rows of a table read from a CSV, non-numeric values such as "-" become NaN"""
+        table = table[[isinstance(label, str) for label in table.index]]
+        if table.index.has_duplicates:
+            duplicates = sorted(set(table.index[table.index.duplicated()]))
+            raise ValueError(f"Parameters defined more than once: {', '.join(duplicates)}")
+
+        values = pd.to_numeric(table["Value"], errors="coerce")
+        units = table["Unit"] if "Unit" in table else {}
+        return cls(values.to_dict(), {name: unit.strip() for name, unit in units.items() if isinstance(unit, str)})
+
+    def __getitem__(self, name):
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"ParameterSet({self._values!r})"
+
+    def unit(self, name):
+        """Unit of a parameter, None when the CSV leaves it blank"""
+        return self._units[name]
+
+    @property
+    def units(self):
+        return MappingProxyType(self._units)
+
+    def derive(self, values, units=None):
+        """New set with calculated parameters added or replaced, units default to DERIVED_UNITS"""
+        return ParameterSet({**self._values, **values}, {**self._units, **(units or {})})
+
+    def to_record(self):
+        """The values as a NumPy structured record, one float64 field per parameter with its unit as metadata"""
+        dtype = np.dtype([(name, np.dtype(np.float64, metadata={"unit": self._units[name]}))
+                          for name in self._values])
+        return np.array(tuple(self._values.values()), dtype=dtype)[()]
+
+    def to_frame(self):
+        """The set as a Parameter/Unit/Value DataFrame, e.g. to save or display it"""
+        frame = pd.DataFrame({"Unit": self._units, "Value": self._values})
+        frame.index.name = "Parameter"
+        return frame
+
+
+def _arrays(frame, index):
+    if not frame.index.equals(index):
+        raise ValueError("All hourly inputs must share the climate data's index")
+
+    arrays = {}
+    for column in frame.columns:
+        array = frame[column].to_numpy(dtype=float, copy=True)
+        array.setflags(write=False)
+        arrays[column] = array
+    return MappingProxyType(arrays)
+
+
+@dataclass(frozen=True, slots=True)
+class GreenhouseInputs:
+    """
+    Validated model inputs, shared read-only by the HTC and demand calculations.
+
+    The hourly index is parsed once and the hour of day is kept as an array, parameters are plain floats in
+    ParameterSets (gm_d["Floor Area"]) and hourly values are read-only NumPy arrays (climate["Temperature C"]),
+    so no stage has to re-parse dates, cast values or can change the inputs seen by the next stage.
+    """
+    index: pd.DatetimeIndex
+    hour: np.ndarray
+    climate: Mapping[str, np.ndarray]
+    crop: Mapping[str, np.ndarray]
+    op_temp_sp: Mapping[str, np.ndarray]
+    gm_d: ParameterSet
+    gm_r: ParameterSet
+    gm_south: ParameterSet
+    gm_side: ParameterSet
+    gm_north: ParameterSet
+    crop_data: ParameterSet
+    op_enviro: ParameterSet
+    op_temp: ParameterSet
+    op_light: ParameterSet
+    op_co2: ParameterSet
+    global_assump: ParameterSet
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Validate the tables built by calculate_inputs, keyed by field name, parameter tables may be DataFrames"""
+        index = pd.DatetimeIndex(frames["climate"].index)
+        if index.has_duplicates or not index.is_monotonic_increasing:
+            raise ValueError("The climate data must have one row per hour in time order")
+
+        hour = index.hour.to_numpy()
+        hour.setflags(write=False)
+
+        return cls(
+            index=index,
+            hour=hour,
+            **{name: _arrays(frames[name], index) for name in TIME_SERIES},
+            **{name: frames[name] if isinstance(frames[name], ParameterSet) else ParameterSet.from_table(frames[name])
+               for name in PARAMETER_TABLES},
+        )
+
+    def frame(self, name):
+        """One of the hourly tables as a new DataFrame, e.g. to save or plot it"""
+        return pd.DataFrame(dict(getattr(self, name)), index=self.index)
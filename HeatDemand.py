@@ -1,4 +1,9 @@
+from Instrumentation import instrument
+import DemandKernels
+import DemandPrecision
 
+
+@instrument()
 def calculate_heatdemand(inputs_data, htc):
 
     from joblib import load
@@ -8,75 +13,67 @@ def calculate_heatdemand(inputs_data, htc):
     from json import dump
 
 
-    gm_d = inputs_data["gm_d"]
-    gm_r = inputs_data["gm_r"]
-    gm_south = inputs_data["gm_south"]
-    gm_side = inputs_data["gm_side"]
-    gm_north = inputs_data["gm_north"]
+    gm_d = inputs_data.gm_d
+    gm_r = inputs_data.gm_r
+    gm_south = inputs_data.gm_south
+    gm_side = inputs_data.gm_side
+    gm_north = inputs_data.gm_north
 
-    climate = inputs_data["climate"]
+    climate = inputs_data.climate
 
-    crop_data = inputs_data["crop_data"]
-    crop = inputs_data["crop"]
+    crop_data = inputs_data.crop_data
+    crop = inputs_data.crop
 
-    op_enviro = inputs_data["op_enviro"]
-    op_temp = inputs_data["op_temp"]
-    op_temp_sp = inputs_data["op_temp_sp"]
-    op_light = inputs_data["op_light"]
-    op_co2 = inputs_data["op_co2"]
+    op_enviro = inputs_data.op_enviro
+    op_temp = inputs_data.op_temp
+    op_temp_sp = inputs_data.op_temp_sp
+    op_light = inputs_data.op_light
+    op_co2 = inputs_data.op_co2
 
-    global_assump = inputs_data["global_assump"]
+    global_assump = inputs_data.global_assump
 
-    climate.index = pd.to_datetime(climate.index, dayfirst=True)
-    op_temp_sp.index = pd.to_datetime(op_temp_sp.index, dayfirst=True)
-    crop.index = pd.to_datetime(crop.index, dayfirst=True)
-    htc.index = pd.to_datetime(htc.index, dayfirst=True)
+    if DemandKernels.use_numba():
+        heat_demand = DemandPrecision.store(DemandKernels.heat_demand(inputs_data, htc))
+        heat_demand.to_json("heat_demand.json")
+        return heat_demand
 
-    heat_demand = pd.DataFrame(index=climate.index)
+    heat_demand = pd.DataFrame(index=inputs_data.index)
 
     # Solar heat gain (Q_s)
-    a = gm_r.loc["Solar Heat Gain Coefficient", "Value"] * ((gm_r.loc["Solar Transmissivity", "Value"] * gm_d.loc[
-        "South Roof Area", "Value"] * climate["Solar Radiation (South Roof)"]) + (
-                                                                        gm_r.loc["Solar Transmissivity", "Value"] *
-                                                                        gm_d.loc["North Roof Area", "Value"] * climate[
+    a = gm_r["Solar Heat Gain Coefficient"] * ((gm_r["Solar Transmissivity"] * gm_d["South Roof Area"] * climate["Solar Radiation (South Roof)"]) + (
+                                                                        gm_r["Solar Transmissivity"] *
+                                                                        gm_d["North Roof Area"] * climate[
                                                                             "Solar Radiation (North Roof)"]))
-    b = gm_south.loc["Solar Heat Gain Coefficient", "Value"] * gm_south.loc["Solar Transmissivity", "Value"] * gm_d.loc[
-        "South Wall Area", "Value"] * climate["Solar Radiation (South Wall)"]
-    c = gm_side.loc["Solar Heat Gain Coefficient", "Value"] * ((gm_side.loc["Solar Transmissivity", "Value"] * gm_d.loc[
-        "East Wall Area", "Value"] * climate["Solar Radiation (East Wall)"]) + (
-                                                                           gm_side.loc["Solar Transmissivity", "Value"] *
-                                                                           gm_d.loc["West Wall Area", "Value"] * climate[
+    b = gm_south["Solar Heat Gain Coefficient"] * gm_south["Solar Transmissivity"] * gm_d["South Wall Area"] * climate["Solar Radiation (South Wall)"]
+    c = gm_side["Solar Heat Gain Coefficient"] * ((gm_side["Solar Transmissivity"] * gm_d["East Wall Area"] * climate["Solar Radiation (East Wall)"]) + (
+                                                                           gm_side["Solar Transmissivity"] *
+                                                                           gm_d["West Wall Area"] * climate[
                                                                                "Solar Radiation (West Wall)"]))
 
-    gm_north.loc["Solar Heat Gain Coefficient", "Value"] = float(gm_north.loc["Solar Heat Gain Coefficient", "Value"])
-    gm_north.loc["Solar Transmissivity", "Value"] = float(gm_north.loc["Solar Transmissivity", "Value"])
-    d = gm_north.loc["Solar Heat Gain Coefficient", "Value"] * gm_north.loc["Solar Transmissivity", "Value"] * gm_d.loc[
-        "North Wall Area", "Value"] * climate["Solar Radiation (North Wall)"]
+    d = gm_north["Solar Heat Gain Coefficient"] * gm_north["Solar Transmissivity"] * gm_d["North Wall Area"] * climate["Solar Radiation (North Wall)"]
 
     heat_demand["Q_s"] = a + b + c + d
 
     # Lighting Heat Gain (Q_sl)
     is_lighting_on = (
-            (crop["Solar Radiation in Greenhouse"] < op_light.loc[
-                "Switch off if solar radiation is greater than:", "Value"])
-            & (climate.index.hour > op_light.loc["Time lighting is switched on", "Value"])
-            & (climate.index.hour <= op_light.loc["Time lighting is switched off", "Value"])
+            (crop["Solar Radiation in Greenhouse"] < op_light["Switch off if solar radiation is greater than:"])
+            & (inputs_data.hour > op_light["Time lighting is switched on"])
+            & (inputs_data.hour <= op_light["Time lighting is switched off"])
     )
 
     heat_demand["Q_sl"] = np.where(
         is_lighting_on,
-        op_light.loc["Installed Power of lamp", "Value"]
-        * op_light.loc["Lighting Heat Conversion Factor", "Value"]
-        * op_light.loc["Lighting Allowance Factor", "Value"]
-        * gm_d.loc["Floor Area", "Value"],
+        op_light["Installed Power of lamp"]
+        * op_light["Lighting Heat Conversion Factor"]
+        * op_light["Lighting Allowance Factor"]
+        * gm_d["Floor Area"],
         0,
     )
 
     # Motors Heat Gain (Q_m)
-    heat_demand["Q_m"] = op_enviro.loc["No. of Air Recirculation Fans", "Value"] * (
-                op_enviro.loc["Motor Power Rating", "Value"] / op_enviro.loc["Recirculation Motor Efficiency", "Value"]) * \
-                         op_enviro.loc["Recirculation Motor Load Factor", "Value"] * op_enviro.loc[
-                             "Recirculation Motor Use Factor", "Value"]
+    heat_demand["Q_m"] = op_enviro["No. of Air Recirculation Fans"] * (
+                op_enviro["Motor Power Rating"] / op_enviro["Recirculation Motor Efficiency"]) * \
+                         op_enviro["Recirculation Motor Load Factor"] * op_enviro["Recirculation Motor Use Factor"]
 
     # CO2 Heat Gain (Q_CO2)
     heat_demand["Q_co2"] = 0  # Assumed zero in excel
@@ -86,16 +83,16 @@ def calculate_heatdemand(inputs_data, htc):
 
     # Conduction/Convection Heat Loss (Q_t), Air Exchange Heat Loss (Q_i), Perimeter Heat Loss (Q_p)
     temp_diff = op_temp_sp["Temperature C"] - climate["Temperature C"]
-    temp_diff_positive = temp_diff.clip(lower=0)
+    temp_diff_positive = np.clip(temp_diff, 0, None)
 
     heat_demand["Q_t"] = np.where(
         temp_diff_positive > 0,
         (
-                htc["Roof U-Value"] * (gm_d.loc["North Roof Area", "Value"] + gm_d.loc["South Roof Area", "Value"])
-                + htc["North Wall U-Value"] * gm_d.loc["North Wall Area", "Value"]
-                + htc["South Wall U-Value"] * gm_d.loc["South Wall Area", "Value"]
+                htc["Roof U-Value"] * (gm_d["North Roof Area"] + gm_d["South Roof Area"])
+                + htc["North Wall U-Value"] * gm_d["North Wall Area"]
+                + htc["South Wall U-Value"] * gm_d["South Wall Area"]
                 + htc["Side Wall U-Value"]
-                * (gm_d.loc["East Wall Area", "Value"] + gm_d.loc["West Wall Area", "Value"])
+                * (gm_d["East Wall Area"] + gm_d["West Wall Area"])
         )
         * temp_diff_positive,
         0,
@@ -104,16 +101,16 @@ def calculate_heatdemand(inputs_data, htc):
     heat_demand["Q_i"] = np.where(
         temp_diff_positive > 0,
         0.33
-        * op_enviro.loc["Number of Air Exchanges per hour", "Value"]
-        * gm_d.loc["Greenhouse Volume", "Value"]
+        * op_enviro["Number of Air Exchanges per hour"]
+        * gm_d["Greenhouse Volume"]
         * temp_diff_positive,
         0,
     )
 
     heat_demand["Q_p"] = np.where(
         temp_diff_positive > 0,
-        gm_south.loc["Perimeter Heat Loss Factor", "Value"]
-        * gm_d.loc["Greenhouse Perimeter", "Value"]
+        gm_south["Perimeter Heat Loss Factor"]
+        * gm_d["Greenhouse Perimeter"]
         * temp_diff_positive,
         0,
     )
@@ -121,18 +118,18 @@ def calculate_heatdemand(inputs_data, htc):
     # radiative heat loss (Q_r)
 
     is_lighting_hours = (
-            (climate.index.hour > op_light.loc["Time lighting is switched on", "Value"])
-            & (climate.index.hour <= op_light.loc["Time lighting is switched off", "Value"])
+            (inputs_data.hour > op_light["Time lighting is switched on"])
+            & (inputs_data.hour <= op_light["Time lighting is switched off"])
     )
 
-    sigma = global_assump.loc["Stefan-Boltzmann Constant", "Value"]
+    sigma = global_assump["Stefan-Boltzmann Constant"]
 
     heat_demand["Q_r,sr"] = np.where(
         (temp_diff_positive > 0) & is_lighting_hours,
         sigma
-        * gm_r.loc["Emissivity", "Value"]
-        * gm_d.loc["South Roof Area", "Value"]
-        * gm_r.loc["View Factor", "Value"]
+        * gm_r["Emissivity"]
+        * gm_d["South Roof Area"]
+        * gm_r["View Factor"]
         * (
                 np.power(op_temp_sp["Temperature K"], 4)
                 - np.power(htc["Cover Temp"], 4)
@@ -143,9 +140,9 @@ def calculate_heatdemand(inputs_data, htc):
     heat_demand["Q_r,nr"] = np.where(
         (temp_diff_positive > 0) & is_lighting_hours,
         sigma
-        * gm_r.loc["Emissivity", "Value"]
-        * gm_d.loc["North Roof Area", "Value"]
-        * gm_r.loc["View Factor", "Value"]
+        * gm_r["Emissivity"]
+        * gm_d["North Roof Area"]
+        * gm_r["View Factor"]
         * (
                 np.power(op_temp_sp["Temperature K"], 4)
                 - np.power(htc["Cover Temp"], 4)
@@ -156,9 +153,9 @@ def calculate_heatdemand(inputs_data, htc):
     heat_demand["Q_r,sw"] = np.where(
         (temp_diff_positive > 0) & is_lighting_hours,
         sigma
-        * gm_south.loc["Emissivity", "Value"]
-        * gm_d.loc["South Wall Area", "Value"]
-        * gm_south.loc["View Factor", "Value"]
+        * gm_south["Emissivity"]
+        * gm_d["South Wall Area"]
+        * gm_south["View Factor"]
         * (
                 np.power(op_temp_sp["Temperature K"], 4)
                 - np.power(htc["Cover Temp"], 4)
@@ -169,9 +166,9 @@ def calculate_heatdemand(inputs_data, htc):
     heat_demand["Q_r,ew"] = np.where(
         (temp_diff_positive > 0) & is_lighting_hours,
         sigma
-        * gm_side.loc["Emissivity", "Value"]
-        * gm_d.loc["East Wall Area", "Value"]
-        * gm_side.loc["View Factor", "Value"]
+        * gm_side["Emissivity"]
+        * gm_d["East Wall Area"]
+        * gm_side["View Factor"]
         * (
                 np.power(op_temp_sp["Temperature K"], 4)
                 - np.power(htc["Cover Temp"], 4)
@@ -182,9 +179,9 @@ def calculate_heatdemand(inputs_data, htc):
     heat_demand["Q_r,ww"] = np.where(
         (temp_diff_positive > 0) & is_lighting_hours,
         sigma
-        * gm_side.loc["Emissivity", "Value"]
-        * gm_d.loc["West Wall Area", "Value"]
-        * gm_side.loc["View Factor", "Value"]
+        * gm_side["Emissivity"]
+        * gm_d["West Wall Area"]
+        * gm_side["View Factor"]
         * (
                 np.power(op_temp_sp["Temperature K"], 4)
                 - np.power(htc["Cover Temp"], 4)
@@ -195,10 +192,10 @@ def calculate_heatdemand(inputs_data, htc):
     heat_demand["Q_r,i"] = np.where(
         (temp_diff_positive > 0) & is_lighting_hours,
         sigma
-        * global_assump.loc["Emissivity of plants", "Value"]
-        * global_assump.loc["Avg Transmissivity LW Radiation", "Value"]
-        * global_assump.loc["Sky View Factor", "Value"]
-        * gm_d.loc["Floor Area", "Value"]
+        * global_assump["Emissivity of plants"]
+        * global_assump["Avg Transmissivity LW Radiation"]
+        * global_assump["Sky View Factor"]
+        * gm_d["Floor Area"]
         * (
                 np.power(op_temp_sp["Temperature K"], 4)
                 - np.power(climate["Tsky"], 4)
@@ -214,7 +211,7 @@ def calculate_heatdemand(inputs_data, htc):
         "Q_r,ew"] + heat_demand["Q_r,ww"] + heat_demand["Q_r,i"] + heat_demand["Q_g"]
 
     # Evaporative Heat Loss (Q_e)
-    heat_demand["Q_e"] = crop["Moisture Transfer Rate"] * global_assump.loc["Latent Heat of Water Vaporisation", "Value"]
+    heat_demand["Q_e"] = crop["Moisture Transfer Rate"] * global_assump["Latent Heat of Water Vaporisation"]
 
     # Total Heat "Sinks
     heat_demand["Sinks"] = heat_demand["Q_t"] + heat_demand["Q_i"] + heat_demand["Q_p"] + heat_demand["Q_r,total"] + \
@@ -230,15 +227,10 @@ def calculate_heatdemand(inputs_data, htc):
     # Net Heat Requirement (Q_net) MJ
     heat_demand["Q_net,MJ"] = heat_demand["Q_net,W"] * 3600 / 1e6
 
-    # Net Heat Requirement (Q_net) kWh
-    heat_demand["QnetMWh"] = heat_demand["Q_net,MJ"] / 3600
-
-    heat_demand["Q_net,MJ"] = heat_demand["Q_net,W"] * 3600 / 1e6
-
     # Net Heat Requirement (Q_net) MWh
-    column_name = "QnetMWh"  # Define the exact column name we want
-    heat_demand[column_name] = heat_demand["Q_net,MJ"] / 3600
+    heat_demand["QnetMWh"] = heat_demand["Q_net,MJ"] / 3600
 
+    heat_demand = DemandPrecision.store(heat_demand)
     heat_demand.to_json("heat_demand.json")
 
     return heat_demand
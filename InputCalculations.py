@@ -1,3 +1,32 @@
+import hashlib
+import os
+
+from Instrumentation import instrument
+from GreenhouseInputs import GreenhouseInputs, ParameterSet
+import SolarTransposition
+import TypicalYear
+import ClimateQA
+
+# Folder of the CSV inputs, as found by the readers in calculate_inputs
+INPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), r"Lib\\CSV Inputs")
+
+# Environment settings that change the calculated inputs or demand
+DEMAND_SETTINGS = {"GREENHOUSE_CLIMATE_YEAR": "calendar", "GREENHOUSE_DEMAND_PRECISION": "float64"}
+
+
+def inputs_fingerprint():
+    """Hash of the CSV inputs (name, size and modification time of each file) and of DEMAND_SETTINGS"""
+    digest = hashlib.sha256()
+    names = os.listdir(INPUTS_DIR) if os.path.isdir(INPUTS_DIR) else []
+    for name in sorted(name for name in names if name.lower().endswith(".csv")):
+        stat = os.stat(os.path.join(INPUTS_DIR, name))
+        digest.update(f"{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    for setting, default in DEMAND_SETTINGS.items():
+        digest.update(f"{setting}={os.environ.get(setting, default).lower()}\n".encode())
+    return digest.hexdigest()
+
+
+@instrument()
 def calculate_inputs():
 
     import pandas as pd
@@ -5,52 +34,178 @@ def calculate_inputs():
     import numpy as np
     from joblib import dump
     import os
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+
+    # The climate file starts on this hour, and the years of it used
+    climate_start = pd.Timestamp('1945-01-01 00:00:00')
+    climate_first_year, climate_last_year = 2023, 2023
+
+    # GREENHOUSE_CLIMATE_YEAR=tmy sizes the design against a Typical Meteorological Year built from every year of
+    # the climate file (laid out on the calendar of climate_first_year, the year of the PVGIS radiation files)
+    climate_year = os.environ.get("GREENHOUSE_CLIMATE_YEAR", "calendar").lower()
+    if climate_year not in ("calendar", "tmy"):
+        raise ValueError(f"GREENHOUSE_CLIMATE_YEAR must be calendar or tmy, not {climate_year!r}")
+
+    # Columns materialised from the climate and PVGIS radiation files, everything else is skipped while parsing.
+    # Met Eireann marks a missing reading with a single blank, which becomes NaN for the climate QA to fill
+    climate_columns = {"date": "str", "temp": "float64", "dewpt": "float64", "wdsp": "float64", "rhum": "float64", "clamt": "str"}
+    radiation_columns = {"Gb(i)": "float64", "Gd(i)": "float64", "Gr(i)": "float64"}
+
+    # Optional PVGIS download for a horizontal plane (Slope 0), when present it is transposed onto every glazed
+    # surface instead of reading one download per surface
+    horizontal_radiation_file = "CSV Inputs/SolarRadiationHorizontal.csv"
 
     def read_csv(file_name):
         # Get the base directory (Lib folder)
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         full_path = os.path.join(base_dir, r"Lib\\CSV Inputs", os.path.basename(file_name))
 
-        x = pd.read_csv(full_path, index_col=0, skip_blank_lines=True)
+        # Parameter, Unit and Value only, values stay text until ParameterSet converts them ("-" becomes NaN)
+        x = pd.read_csv(full_path, index_col=0, usecols=[0, 1, 2], dtype=str, skip_blank_lines=True)
         return x.dropna(how="all")
 
-    def read_csv_climate(file_name):
+    def read_parameters(file_name):
+        # Resolve a Parameter/Unit/Value table once, so the calculations only ever see plain floats
+        return ParameterSet.from_table(read_csv(file_name))
+
+    def read_csv_climate(file_name, first_year=None, last_year=None, chunksize=100_000):
         # Get the base directory (Lib folder)
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         full_path = os.path.join(base_dir, r"Lib\\CSV Inputs", os.path.basename(file_name))
 
-        x = pd.read_csv(full_path, index_col=False, skip_blank_lines=True, skiprows=23, engine='python')
-        return x.dropna(how="all")
+        # The rows are consecutive hours from the start of the station's record, so the timestamps of a chunk
+        # follow from its row offset. Chunks before the requested years are dropped once parsed and reading
+        # stops after them, so only the requested window is ever kept in memory. Without years all of it is read
+        window_start = climate_start if first_year is None else pd.Timestamp(year=first_year, month=1, day=1)
+        window_end = pd.Timestamp.max if last_year is None else pd.Timestamp(year=last_year + 1, month=1, day=1)
+
+        chunks = []
+        offset = 0
+        with pd.read_csv(full_path, index_col=False, skip_blank_lines=True, skiprows=23,
+                         usecols=list(climate_columns), dtype=climate_columns, na_values=[" "],
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk = chunk.dropna(how="all")
+                chunk_start = climate_start + pd.Timedelta(hours=offset)
+                offset += len(chunk)
+                if chunk_start >= window_end:
+                    break
+                if climate_start + pd.Timedelta(hours=offset) <= window_start:
+                    continue
+
+                chunk.index = pd.date_range(start=chunk_start, periods=len(chunk), freq='h')
+                chunks.append(chunk[(chunk.index >= window_start) & (chunk.index < window_end)])
+
+        if not chunks:
+            raise ValueError(f"{file_name} has no hours in {first_year}-{last_year}")
+        return pd.concat(chunks)
+
+    def read_typical_year(file_name):
+        # Get the base directory (Lib folder)
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        full_path = os.path.join(base_dir, r"Lib\\CSV Inputs", os.path.basename(file_name))
+
+        # Building it reads the whole history, so it is cached until the climate file changes
+        climate_data, months = TypicalYear.load_or_build(full_path, lambda: read_csv_climate(file_name),
+                                                          year=climate_first_year)
+        print("Typical Meteorological Year months: " +
+              ", ".join(f"{pd.Timestamp(year=2000, month=month, day=1):%b} {year}" for month, year in months.items()))
+        return climate_data
 
     def read_csv_sr(file_name):
         # Get the base directory (Lib folder)
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         full_path = os.path.join(base_dir, r"Lib\\CSV Inputs", os.path.basename(file_name))
 
-        x = pd.read_csv(full_path, index_col=False, skipfooter=12, skiprows=8, engine='python')
+        # The hourly rows end at the blank line before the PVGIS legend, hand only them to the C parser
+        with open(full_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()[8:]
+        rows = lines[:lines.index("")] if "" in lines else lines
+
+        x = pd.read_csv(io.StringIO("\n".join(rows)), index_col=False, usecols=list(radiation_columns),
+                        dtype=radiation_columns)
         return x.dropna(how="all")
 
+    def read_csv_sr_horizontal(file_name):
+        # Get the base directory (Lib folder)
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        full_path = os.path.join(base_dir, r"Lib\\CSV Inputs", os.path.basename(file_name))
+
+        # Same layout as read_csv_sr, the site comes from the header and the UTC sample times are kept for the
+        # sun position
+        with open(full_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        header = dict(line.split(":", 1) for line in lines[:8] if ":" in line)
+        latitude = float(header["Latitude (decimal degrees)"])
+        longitude = float(header["Longitude (decimal degrees)"])
+        rows = lines[8:]
+        rows = rows[:rows.index("")] if "" in rows else rows
+
+        x = pd.read_csv(io.StringIO("\n".join(rows)), index_col=False, usecols=["time", "Gb(i)", "Gd(i)"],
+                        dtype={"time": "str", "Gb(i)": "float64", "Gd(i)": "float64"})
+        x = x.dropna(how="all")
+        x.index = pd.to_datetime(x.pop("time"), format="%Y%m%d:%H%M")
+        return latitude, longitude, x
+
 
     def rad(x):
         z = math.radians(x)
         return z
 
 
-    # Reading in all CSV files
-    gm_d = read_csv("CSV Inputs/GreenhouseModel_Dimensions.csv")
-    gm_r = read_csv("CSV Inputs/GreenhouseModel_Roof.csv")
-    gm_south = read_csv("CSV Inputs/GreenhouseModel_SouthWall.csv")
-    gm_side = read_csv("CSV Inputs/GreenhouseModel_SideWall.csv")
-    gm_north = read_csv("CSV Inputs/GreenhouseModel_NorthWall.csv")
+    # Reading in all CSV files at once on a thread pool, pandas' C parser releases the GIL while parsing
+    parameter_files = {
+        "gm_d": "CSV Inputs/GreenhouseModel_Dimensions.csv",
+        "gm_r": "CSV Inputs/GreenhouseModel_Roof.csv",
+        "gm_south": "CSV Inputs/GreenhouseModel_SouthWall.csv",
+        "gm_side": "CSV Inputs/GreenhouseModel_SideWall.csv",
+        "gm_north": "CSV Inputs/GreenhouseModel_NorthWall.csv",
+        "crop_data": "CSV Inputs/Crop_Data.csv",
+        "op_enviro": "CSV Inputs/Operation_Enviromental.csv",
+        "op_temp": "CSV Inputs/Operation_Temperature.csv",
+        "op_light": "CSV Inputs/Operation_Lighting.csv",
+        "op_co2": "CSV Inputs/Operation_CO2.csv",
+    }
+    radiation_files = {
+        "nr": "CSV Inputs/SolarRadiationNR.csv",
+        "sr": "CSV Inputs/SolarRadiationSR.csv",
+        "nw": "CSV Inputs/SolarRadiationNW.csv",
+        "ew": "CSV Inputs/SolarRadiationEW.csv",
+        "sw": "CSV Inputs/SolarRadiationSW.csv",
+        "ww": "CSV Inputs/SolarRadiationWW.csv",
+    }
 
-    # Climate Calculations
-    climate_data = read_csv_climate("CSV Inputs/ClimateData.csv")
+    with ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 4)) as executor:
+        if climate_year == "tmy":
+            climate_future = executor.submit(read_typical_year, "CSV Inputs/ClimateData.csv")
+        else:
+            climate_future = executor.submit(read_csv_climate, "CSV Inputs/ClimateData.csv", climate_first_year,
+                                             climate_last_year)
+        parameter_futures = {name: executor.submit(read_parameters, file_name)
+                             for name, file_name in parameter_files.items()}
+        if os.path.exists(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       r"Lib\\CSV Inputs", os.path.basename(horizontal_radiation_file))):
+            radiation_futures = {"horizontal": executor.submit(read_csv_sr_horizontal, horizontal_radiation_file)}
+        else:
+            radiation_futures = {name: executor.submit(read_csv_sr, file_name)
+                                 for name, file_name in radiation_files.items()}
+
+        parameters = {name: future.result() for name, future in parameter_futures.items()}
+        solar_radiation = {name: future.result() for name, future in radiation_futures.items()}
+        climate_data = climate_future.result()
 
-    #
-    start_date = pd.Timestamp('1945-01-01 00:00:00')
-    climate_data.index = pd.date_range(start=start_date, periods=len(climate_data), freq='h')
-    climate_data = climate_data[(climate_data.index.year >= 2023) & (climate_data.index.year <= 2023)]
+    # Outliers, stuck sensors and gaps in every climate column are filled before anything is derived from them
+    climate_data, climate_qa = ClimateQA.clean(climate_data)
+    ClimateQA.log_report(climate_qa)
 
+    gm_d = parameters["gm_d"]
+    gm_r = parameters["gm_r"]
+    gm_south = parameters["gm_south"]
+    gm_side = parameters["gm_side"]
+    gm_north = parameters["gm_north"]
+
+    # Climate Calculations
     climate = pd.DataFrame(index=climate_data.index)
     climate["Temperature C"] = climate_data["temp"]
     climate["Temperature K"] = climate["Temperature C"] + 273.15
@@ -63,36 +218,61 @@ def calculate_inputs():
 
     climate.to_csv("climateTEST.csv")
 
-    solar_radiation_nr = read_csv_sr("CSV Inputs/SolarRadiationNR.csv")
-    solar_radiation_sr = read_csv_sr("CSV Inputs/SolarRadiationSR.csv")
-    solar_radiation_nw = read_csv_sr("CSV Inputs/SolarRadiationNW.csv")
-    solar_radiation_ew = read_csv_sr("CSV Inputs/SolarRadiationEW.csv")
-    solar_radiation_sw = read_csv_sr("CSV Inputs/SolarRadiationSW.csv")
-    solar_radiation_ww = read_csv_sr("CSV Inputs/SolarRadiationWW.csv")
-
-
-
-    # Make sure the solar radiation DataFrames have the same length as climate_data
-    if len(solar_radiation_nr) == len(climate_data):
-        # Copy the datetime index from climate_data to the solar radiation DataFrames
-        solar_radiation_nr.index = climate_data.index.copy()
-        solar_radiation_sr.index = climate_data.index.copy()
-        solar_radiation_nw.index = climate_data.index.copy()
-        solar_radiation_ew.index = climate_data.index.copy()
-        solar_radiation_sw.index = climate_data.index.copy()
-        solar_radiation_ww.index = climate_data.index.copy()
+    if "horizontal" in solar_radiation:
+        latitude, longitude, horizontal = solar_radiation["horizontal"]
+
+        # Tilt and azimuth (degrees clockwise from north) of each glazed surface, all transposed in one array pass
+        roof_tilt = gm_d["Roof angle"]
+        surfaces = {
+            "Solar Radiation (North Roof)": (roof_tilt, 0),
+            "Solar Radiation (South Roof)": (roof_tilt, 180),
+            "Solar Radiation (North Wall)": (90, 0),
+            "Solar Radiation (South Wall)": (90, 180),
+            "Solar Radiation (East Wall)": (90, 90),
+            "Solar Radiation (West Wall)": (90, 270),
+        }
+        zenith, azimuth = SolarTransposition.solar_position(horizontal.index, latitude, longitude)
+        ghi = horizontal["Gb(i)"] + horizontal["Gd(i)"]
+        dni = SolarTransposition.direct_normal(horizontal["Gb(i)"], zenith)
+        tilts, azimuths = zip(*surfaces.values())
+        irradiance = SolarTransposition.plane_of_array(ghi, dni, horizontal["Gd(i)"], zenith, azimuth, tilts, azimuths,
+                                                       times=horizontal.index)
+
+        if len(horizontal) == len(climate_data):
+            for column, values in zip(surfaces, irradiance):
+                climate[column] = values
+        else:
+            print(
+                f"Warning: Index length mismatch. Climate data has {len(climate_data)} entries, but solar radiation has {len(horizontal)} entries.")
     else:
-        print(
-            f"Warning: Index length mismatch. Climate data has {len(climate_data)} entries, but solar radiation has {len(solar_radiation_nr)} entries.")
+        solar_radiation_nr = solar_radiation["nr"]
+        solar_radiation_sr = solar_radiation["sr"]
+        solar_radiation_nw = solar_radiation["nw"]
+        solar_radiation_ew = solar_radiation["ew"]
+        solar_radiation_sw = solar_radiation["sw"]
+        solar_radiation_ww = solar_radiation["ww"]
+
+        # Make sure the solar radiation DataFrames have the same length as climate_data
+        if len(solar_radiation_nr) == len(climate_data):
+            # Copy the datetime index from climate_data to the solar radiation DataFrames
+            solar_radiation_nr.index = climate_data.index.copy()
+            solar_radiation_sr.index = climate_data.index.copy()
+            solar_radiation_nw.index = climate_data.index.copy()
+            solar_radiation_ew.index = climate_data.index.copy()
+            solar_radiation_sw.index = climate_data.index.copy()
+            solar_radiation_ww.index = climate_data.index.copy()
+        else:
+            print(
+                f"Warning: Index length mismatch. Climate data has {len(climate_data)} entries, but solar radiation has {len(solar_radiation_nr)} entries.")
 
-    solar_radiation_sw.to_csv("climateSR_test.csv")
+        solar_radiation_sw.to_csv("climateSR_test.csv")
 
-    climate["Solar Radiation (North Roof)"] = solar_radiation_nr["Gb(i)"] + solar_radiation_nr["Gd(i)"] + solar_radiation_nr["Gr(i)"]
-    climate["Solar Radiation (South Roof)"] = solar_radiation_sr["Gb(i)"] + solar_radiation_sr["Gd(i)"] + solar_radiation_sr["Gr(i)"]
-    climate["Solar Radiation (North Wall)"] = solar_radiation_nw["Gb(i)"] + solar_radiation_nw["Gd(i)"] + solar_radiation_nw["Gr(i)"]
-    climate["Solar Radiation (South Wall)"] = solar_radiation_sw["Gb(i)"] + solar_radiation_sw["Gd(i)"] + solar_radiation_sw["Gr(i)"]
-    climate["Solar Radiation (East Wall)"] = solar_radiation_ew["Gb(i)"] + solar_radiation_ew["Gd(i)"] + solar_radiation_ew["Gr(i)"]
-    climate["Solar Radiation (West Wall)"] = solar_radiation_ww["Gb(i)"] + solar_radiation_ww["Gd(i)"] + solar_radiation_ww["Gr(i)"]
+        climate["Solar Radiation (North Roof)"] = solar_radiation_nr["Gb(i)"] + solar_radiation_nr["Gd(i)"] + solar_radiation_nr["Gr(i)"]
+        climate["Solar Radiation (South Roof)"] = solar_radiation_sr["Gb(i)"] + solar_radiation_sr["Gd(i)"] + solar_radiation_sr["Gr(i)"]
+        climate["Solar Radiation (North Wall)"] = solar_radiation_nw["Gb(i)"] + solar_radiation_nw["Gd(i)"] + solar_radiation_nw["Gr(i)"]
+        climate["Solar Radiation (South Wall)"] = solar_radiation_sw["Gb(i)"] + solar_radiation_sw["Gd(i)"] + solar_radiation_sw["Gr(i)"]
+        climate["Solar Radiation (East Wall)"] = solar_radiation_ew["Gb(i)"] + solar_radiation_ew["Gd(i)"] + solar_radiation_ew["Gr(i)"]
+        climate["Solar Radiation (West Wall)"] = solar_radiation_ww["Gb(i)"] + solar_radiation_ww["Gd(i)"] + solar_radiation_ww["Gr(i)"]
 
     climate["Clear Sky Emissivity"] = 0.787+0.7641*np.log((climate["TDP"]+273.15)/273)
     climate["Cloud Sky Emissivity"] = (1 + (0.0224**climate["CF"]) - (0.0035 * (climate["CF"]**2)) +
@@ -103,128 +283,116 @@ def calculate_inputs():
     climate.to_csv("climateDF.csv")
     climate.to_json("climateDF.json")
 
-    crop_data = read_csv("CSV Inputs/Crop_Data.csv")
-    # crop_data.loc["Extinction Coefficient", "Value"] = 0.7
-    # crop_data.loc["Leaf Transmission Coefficient", "Value"] = 0.1
-    # crop_data.loc["a", "Value"] = 8.95e-5
-    # crop_data.loc["b", "Value"] = 0.021
-    # crop_data.loc["Leaf PAR use efficiency", "Value"] = 2.11e-5
-    # crop_data.loc["CO2 Density stp", "Value"] = 1.87
-    # crop_data.loc["Dark Respiration Rate", "Value"] = 4e-8
-    # crop_data.loc["Stem Density", "Value"] = 2.5
-    crop_data.loc["Leaf Area Index", "Value"] = crop_data.loc["Stem Density", "Value"] * 0.91
-
-    op_enviro = read_csv("CSV Inputs/Operation_Enviromental.csv")
-    op_temp = read_csv("CSV Inputs/Operation_Temperature.csv")
-    op_light = read_csv("CSV Inputs/Operation_Lighting.csv")
-    op_co2 = read_csv("CSV Inputs/Operation_CO2.csv")
+    crop_data = parameters["crop_data"]
+    # crop_data = crop_data.derive({
+    #     "Extinction Coefficient": 0.7,
+    #     "Leaf Transmission Coefficient": 0.1,
+    #     "a": 8.95e-5,
+    #     "b": 0.021,
+    #     "Leaf PAR use efficiency": 2.11e-5,
+    #     "CO2 Density stp": 1.87,
+    #     "Dark Respiration Rate": 4e-8,
+    #     "Stem Density": 2.5,
+    # })
+    crop_data = crop_data.derive({"Leaf Area Index": crop_data["Stem Density"] * 0.91})
+
+    op_enviro = parameters["op_enviro"]
+    op_temp = parameters["op_temp"]
+    op_light = parameters["op_light"]
+    op_co2 = parameters["op_co2"]
 
     #global_assump = read_csv("CSV Inputs/GlobalAssumptions.csv")
 
     # Greenhouse Model inter dependant calcs
-    gm_d.loc["Max Height", "Value"] = (gm_d.loc["Wall height", "Value"] + (gm_d.loc["Width", "Value"] / 2) *
-                                       math.tan(rad(gm_d.loc["Roof angle", "Value"])))
-
-    gm_d.loc["Floor Area", "Value"] = gm_d.loc["Length", "Value"] * gm_d.loc["Width", "Value"]
-
-    gm_d.loc["South Wall Area", "Value"] = gm_d.loc["Length", "Value"] * gm_d.loc["Wall height", "Value"]
-    gm_d.loc["North Wall Area", "Value"] = gm_d.loc["Length", "Value"] * gm_d.loc["Wall height", "Value"]
-
-    gm_d.loc["East Wall Area", "Value"] = (gm_d.loc["Width", "Value"] * gm_d.loc["Wall height", "Value"] +
-                                           ((gm_d.loc["Width", "Value"] / 2) * (gm_d.loc["Max Height", "Value"] -
-                                                                                gm_d.loc["Wall height", "Value"])))
-
-    gm_d.loc["West Wall Area", "Value"] = (gm_d.loc["Width", "Value"] * gm_d.loc["Wall height", "Value"] +
-                                             ((gm_d.loc["Width", "Value"] / 2) * (gm_d.loc["Max Height", "Value"] -
-                                              gm_d.loc["Wall height", "Value"])))
-
-    gm_d.loc["South Roof Area", "Value"] = gm_d.loc["Length", "Value"] * ((gm_d.loc["Width", "Value"] / 2) /
-                                                                          math.cos(rad(gm_d.loc["Roof angle", "Value"])))
-
-    gm_d.loc["North Roof Area", "Value"] = gm_d.loc["Length", "Value"] * ((gm_d.loc["Width", "Value"] / 2) /
-                                                                          math.cos(rad(gm_d.loc["Roof angle", "Value"])))
-
-    gm_d.loc["Total Area of Glass", "Value"] = (gm_d.loc["South Roof Area", "Value"] +
-                                                gm_d.loc["North Roof Area", "Value"] +
-                                                gm_d.loc["South Wall Area", "Value"] +
-                                                gm_d.loc["North Wall Area", "Value"] +
-                                                gm_d.loc["East Wall Area", "Value"] +
-                                                gm_d.loc["West Wall Area", "Value"])
-
-    gm_d.loc["Greenhouse Volume", "Value"] = (gm_d.loc["Floor Area", "Value"] * gm_d.loc["Max Height", "Value"] -
-                                              (gm_d.loc["Width", "Value"] / 4) *
-                                              (gm_d.loc["Max Height", "Value"] - gm_d.loc["Wall height", "Value"]) *
-                                              gm_d.loc["Length", "Value"])
-
-    gm_d.loc["Total Roof Area", "Value"] = gm_d.loc["South Roof Area", "Value"] + gm_d.loc["North Roof Area", "Value"]
-
-    gm_d.loc["Total Wall Area", "Value"] = (gm_d.loc["South Wall Area", "Value"] + gm_d.loc["North Wall Area", "Value"]
-                                            + gm_d.loc["East Wall Area", "Value"] + gm_d.loc["West Wall Area", "Value"])
-
-    gm_d.loc["Greenhouse Perimeter", "Value"] = 2 * gm_d.loc["Width", "Value"] + 2 * gm_d.loc["Length", "Value"]
-
-    gm_r.loc["Characteristic Length Surface", "Value"] = gm_d.loc["South Roof Area", "Value"] / (
-                2 * ((gm_d.loc["Width", "Value"] / 2) / math.cos(rad(gm_d.loc["Roof angle", "Value"]))) + 2 * gm_d.loc[
-            "Length", "Value"])
-
-    gm_r.loc["Characteristic Length", "Value"] = gm_r.loc["Material Thickness", "Value"]
-
-    gm_r.loc["View Factor", "Value"] = (1 + math.cos(rad(gm_d.loc["Roof angle", "Value"]))) / 2
-
-    gm_south.loc["View Factor", "Value"] = (1 + math.cos(rad(90))) / 2
-
-    gm_side.loc["View Factor", "Value"] = (1 + math.cos(rad(90))) / 2
-
-    gm_south.loc["Characteristic Length Surface", "Value"] = gm_d.loc["South Wall Area", "Value"] / (
-                2 * gm_d.loc["Length", "Value"] + 2 * gm_d.loc["Wall height", "Value"])
-
-    gm_south.loc["Characteristic Length", "Value"] = gm_south.loc["Material Thickness", "Value"]
-
-    gm_side.loc["Characteristic Length Surface", "Value"] = gm_d.loc["East Wall Area", "Value"] / (
-                2 * ((gm_d.loc["Width", "Value"] / 2) / math.cos(rad(gm_d.loc["Roof angle", "Value"]))) + (
-                    2 * gm_d.loc["Wall height", "Value"]) + gm_d.loc["Width", "Value"])
-
-    gm_side.loc["Characteristic Length", "Value"] = gm_side.loc["Material Thickness", "Value"]
-
-    gm_north.loc["Characteristic Length Surface", "Value"] = gm_d.loc["South Wall Area", "Value"] / (
-                2 * gm_d.loc["Length", "Value"] + 2 * gm_d.loc["Wall height", "Value"])
-
-    gm_north.loc["Characteristic Length", "Value"] = gm_north.loc["Total Material Thickness", "Value"]
+    length = gm_d["Length"]
+    width = gm_d["Width"]
+    wall_height = gm_d["Wall height"]
+    roof_angle = rad(gm_d["Roof angle"])
+
+    max_height = wall_height + (width / 2) * math.tan(roof_angle)
+    floor_area = length * width
+
+    south_wall_area = length * wall_height
+    north_wall_area = length * wall_height
+    east_wall_area = width * wall_height + ((width / 2) * (max_height - wall_height))
+    west_wall_area = width * wall_height + ((width / 2) * (max_height - wall_height))
+
+    south_roof_area = length * ((width / 2) / math.cos(roof_angle))
+    north_roof_area = length * ((width / 2) / math.cos(roof_angle))
+
+    gm_d = gm_d.derive({
+        "Max Height": max_height,
+        "Floor Area": floor_area,
+        "South Wall Area": south_wall_area,
+        "North Wall Area": north_wall_area,
+        "East Wall Area": east_wall_area,
+        "West Wall Area": west_wall_area,
+        "South Roof Area": south_roof_area,
+        "North Roof Area": north_roof_area,
+        "Total Area of Glass": (south_roof_area + north_roof_area + south_wall_area + north_wall_area +
+                                east_wall_area + west_wall_area),
+        "Greenhouse Volume": floor_area * max_height - (width / 4) * (max_height - wall_height) * length,
+        "Total Roof Area": south_roof_area + north_roof_area,
+        "Total Wall Area": south_wall_area + north_wall_area + east_wall_area + west_wall_area,
+        "Greenhouse Perimeter": 2 * width + 2 * length,
+    })
+
+    gm_r = gm_r.derive({
+        "Characteristic Length Surface": south_roof_area / (
+                2 * ((width / 2) / math.cos(roof_angle)) + 2 * length),
+        "Characteristic Length": gm_r["Material Thickness"],
+        "View Factor": (1 + math.cos(roof_angle)) / 2,
+    })
+
+    gm_south = gm_south.derive({
+        "View Factor": (1 + math.cos(rad(90))) / 2,
+        "Characteristic Length Surface": south_wall_area / (2 * length + 2 * wall_height),
+        "Characteristic Length": gm_south["Material Thickness"],
+    })
+
+    gm_side = gm_side.derive({
+        "View Factor": (1 + math.cos(rad(90))) / 2,
+        "Characteristic Length Surface": east_wall_area / (
+                2 * ((width / 2) / math.cos(roof_angle)) + (2 * wall_height) + width),
+        "Characteristic Length": gm_side["Material Thickness"],
+    })
+
+    gm_north = gm_north.derive({
+        "Characteristic Length Surface": south_wall_area / (2 * length + 2 * wall_height),
+        "Characteristic Length": gm_north["Total Material Thickness"],
+    })
 
     #Operational Temperature inter dependant calcs
     op_temp_sp= pd.DataFrame(index=climate.index)
     op_temp_sp["Temperature C"] = np.where(
-        (op_temp_sp.index.hour >= op_temp.loc["Daytime Start Hour", "Value"]) &
-        (op_temp_sp.index.hour < op_temp.loc["Nighttime Start Hour", "Value"]),
-        op_temp.loc["Set-point Daytime Temperature", "Value"],
-        op_temp.loc["Set-point Nighttime Temperature", "Value"]
+        (op_temp_sp.index.hour >= op_temp["Daytime Start Hour"]) &
+        (op_temp_sp.index.hour < op_temp["Nighttime Start Hour"]),
+        op_temp["Set-point Daytime Temperature"],
+        op_temp["Set-point Nighttime Temperature"]
     )
     op_temp_sp["Temperature K"] = op_temp_sp["Temperature C"] + 273.15
 
     # Global Assumptions inter dependant calcs
-    global_assump = pd.DataFrame(index=range(1))
-    global_assump.loc["Thermal Conductivity of Air", "Value"] = 0.0255
-    global_assump.loc["Stefan-Boltzmann Constant", "Value"] = 5.67e-8
-    global_assump.loc["Sky View Factor", "Value"] = 1
-    global_assump.loc["Emissivity of plants", "Value"] = 0.9
-    global_assump.loc["Acceleration due to gravity", "Value"] = 9.81
-    global_assump.loc["Dynamic Viscosity of Air", "Value"] = 1.825e-5
-    global_assump.loc["Specific Heat of Air", "Value"] = 1005
-    global_assump.loc["Air Density", "Value"] = 1.225
-
-    x = (gm_d.loc["South Roof Area", "Value"] + gm_d.loc["North Roof Area", "Value"]) * gm_r.loc[
-        "Long-wave Transmissivity", "Value"]
-    y = gm_d.loc["South Wall Area", "Value"] * gm_south.loc["Long-wave Transmissivity", "Value"]
-    z = (gm_d.loc["East Wall Area", "Value"] + gm_d.loc["West Wall Area", "Value"]) * gm_side.loc[
-        "Long-wave Transmissivity", "Value"]
-    a = gm_d.loc["South Wall Area", "Value"] + gm_d.loc["East Wall Area", "Value"] + gm_d.loc[
-        "West Wall Area", "Value"] + gm_d.loc["South Roof Area", "Value"] + gm_d.loc["North Roof Area", "Value"]
-    global_assump.loc["Avg Transmissivity LW Radiation", "Value"] = (x + y + z) / a
-
-    global_assump.loc["Atmospheric Pressure", "Value"] = 101325
-    global_assump.loc["CO2 Density", "Value"] = 1.87
-    global_assump.loc["Latent Heat of Water Vaporisation", "Value"] = 2.26e6
-    global_assump.loc["Discount Factor", "Value"] = 0.05
+    x = (south_roof_area + north_roof_area) * gm_r["Long-wave Transmissivity"]
+    y = south_wall_area * gm_south["Long-wave Transmissivity"]
+    z = (east_wall_area + west_wall_area) * gm_side["Long-wave Transmissivity"]
+    a = south_wall_area + east_wall_area + west_wall_area + south_roof_area + north_roof_area
+
+    global_assump = ParameterSet({
+        "Thermal Conductivity of Air": 0.0255,
+        "Stefan-Boltzmann Constant": 5.67e-8,
+        "Sky View Factor": 1,
+        "Emissivity of plants": 0.9,
+        "Acceleration due to gravity": 9.81,
+        "Dynamic Viscosity of Air": 1.825e-5,
+        "Specific Heat of Air": 1005,
+        "Air Density": 1.225,
+        "Avg Transmissivity LW Radiation": (x + y + z) / a,
+        "Atmospheric Pressure": 101325,
+        "CO2 Density": 1.87,
+        "Latent Heat of Water Vaporisation": 2.26e6,
+        "Discount Factor": 0.05,
+    })
 
     # Crop inter dependant calcs
     crop = pd.DataFrame(index=climate.index)
@@ -243,23 +411,23 @@ def calculate_inputs():
     crop["I StomCond"] = avg_list
     crop["Saturation Temperature of Water Vapour"] = 0.61078*(np.exp((17.27*op_temp_sp["Temperature C"])/(op_temp_sp["Temperature C"]+237.3)))*1000
     crop["Partial Pressure of Water Vapour"] = crop["Saturation Temperature of Water Vapour"]*(climate["Relative Humidity"]/100)
-    crop["Plant Surface Area"] = crop_data.loc["Leaf Area Index", "Value"]*gm_d.loc["Floor Area", "Value"]
-    crop["Saturated Humidity Ratio"] = 0.6219*(crop["Saturation Temperature of Water Vapour"]/(global_assump.loc["Atmospheric Pressure", "Value"]-crop["Saturation Temperature of Water Vapour"]))
-    crop["Humidity Ratio"] = 0.6219*(crop["Partial Pressure of Water Vapour"]/(global_assump.loc["Atmospheric Pressure", "Value"]-crop["Partial Pressure of Water Vapour"]))
-    crop["Aerodynamic Resistance"] = 220*((crop_data.loc["Characteristic Length of Leaf", "Value"]**0.2)/(op_enviro.loc["Indoor air Velocity", "Value"]**0.8))
+    crop["Plant Surface Area"] = crop_data["Leaf Area Index"]*gm_d["Floor Area"]
+    crop["Saturated Humidity Ratio"] = 0.6219*(crop["Saturation Temperature of Water Vapour"]/(global_assump["Atmospheric Pressure"]-crop["Saturation Temperature of Water Vapour"]))
+    crop["Humidity Ratio"] = 0.6219*(crop["Partial Pressure of Water Vapour"]/(global_assump["Atmospheric Pressure"]-crop["Partial Pressure of Water Vapour"]))
+    crop["Aerodynamic Resistance"] = 220*((crop_data["Characteristic Length of Leaf"]**0.2)/(op_enviro["Indoor air Velocity"]**0.8))
 
-    t = gm_r.loc["Solar Transmissivity", "Value"]
+    t = gm_r["Solar Transmissivity"]
     i = (climate["Solar Radiation (South Roof)"] + climate["Solar Radiation (North Roof)"])/2
     crop["Stomatal Resistance"] = 200*(1+(1/np.exp(0.05*(t*i-50))))
-    crop["Moisture Transfer Rate"] = crop["Plant Surface Area"]*global_assump.loc["Air Density", "Value"]*((crop["Saturated Humidity Ratio"]-crop["Humidity Ratio"])/(crop["Aerodynamic Resistance"]+crop["Stomatal Resistance"]))
+    crop["Moisture Transfer Rate"] = crop["Plant Surface Area"]*global_assump["Air Density"]*((crop["Saturated Humidity Ratio"]-crop["Humidity Ratio"])/(crop["Aerodynamic Resistance"]+crop["Stomatal Resistance"]))
 
     crop.to_json("cropDF.json")
 
     # Operational Controls inter dependant
-    start_hour = op_temp.loc["Daytime Start Hour", "Value"]
-    end_hour = op_temp.loc["Nighttime Start Hour", "Value"]
-    value_if_true = op_temp.loc["Set-point Daytime Temperature", "Value"]
-    value_if_false = op_temp.loc["Set-point Nighttime Temperature", "Value"]
+    start_hour = op_temp["Daytime Start Hour"]
+    end_hour = op_temp["Nighttime Start Hour"]
+    value_if_true = op_temp["Set-point Daytime Temperature"]
+    value_if_false = op_temp["Set-point Nighttime Temperature"]
 
     op_temp_sp.index = pd.to_datetime(op_temp_sp.index, dayfirst =True)
     op_temp_sp["Temperature C"] = np.where(
@@ -287,7 +455,7 @@ def calculate_inputs():
         "global_assump": global_assump,
     }
 
-    return inputs_dataframe
+    return GreenhouseInputs.from_frames(inputs_dataframe)
 
 if __name__ == "__main__":
     inputs_data = calculate_inputs()
@@ -0,0 +1,137 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# The model modules import this as Instrumentation and the dashboard as Lib.Instrumentation. Register the
+# module under both names so there is only ever one registry per process
+sys.modules.setdefault("Instrumentation", sys.modules[__name__])
+sys.modules.setdefault("Lib.Instrumentation", sys.modules[__name__])
+
+# Set GREENHOUSE_INSTRUMENTATION=0 to leave functions undecorated, and GREENHOUSE_TRACEMALLOC=1 to also
+# record peak memory (tracemalloc slows every allocation down, so it is off by default)
+ENABLED = os.environ.get("GREENHOUSE_INSTRUMENTATION", "1") != "0"
+if os.environ.get("GREENHOUSE_TRACEMALLOC", "0") == "1":
+    tracemalloc.start()
+
+
+class Registry:
+    """
+    Call counts, wall time and peak memory of each instrumented stage, kept in memory for this process.
+
+    Peak memory is the largest traced allocation above the memory in use when the stage started, in bytes.
+    It is only recorded while tracemalloc is tracing, and tracemalloc is process wide so the values of
+    callbacks running at the same time in different threads include each other's allocations.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, peak_memory=None):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                                           'last_seconds': 0.0, 'peak_memory_bytes': None}
+            stat['calls'] += 1
+            stat['total_seconds'] += seconds
+            stat['max_seconds'] = max(stat['max_seconds'], seconds)
+            stat['last_seconds'] = seconds
+            if peak_memory is not None:
+                stat['peak_memory_bytes'] = max(stat['peak_memory_bytes'] or 0, peak_memory)
+
+    def snapshot(self):
+        """Copy of the statistics with the mean time per call added, slowest stage first"""
+        with self._lock:
+            stats = {name: dict(stat) for name, stat in self.stats.items()}
+        for stat in stats.values():
+            stat['mean_seconds'] = stat['total_seconds'] / stat['calls']
+        return dict(sorted(stats.items(), key=lambda item: item[1]['total_seconds'], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def to_json(self, indent=2):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix="greenhouse"):
+        """Statistics in the Prometheus text exposition format, one series per stage"""
+        stats = self.snapshot()
+        metrics = [
+            ('calls_total', 'counter', 'Number of calls', 'calls'),
+            ('seconds_total', 'counter', 'Total wall time in seconds', 'total_seconds'),
+            ('seconds_max', 'gauge', 'Longest call in seconds', 'max_seconds'),
+            ('peak_memory_bytes', 'gauge', 'Largest traced allocation during a call', 'peak_memory_bytes'),
+        ]
+
+        lines = []
+        for metric, kind, description, key in metrics:
+            lines.append(f"# HELP {prefix}_stage_{metric} {description}")
+            lines.append(f"# TYPE {prefix}_stage_{metric} {kind}")
+            for name, stat in stats.items():
+                if stat[key] is not None:
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{prefix}_stage_{metric}{{stage="{label}"}} {stat[key]}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Memory in use and peak so far of the stages open in each thread, so nested stages can share tracemalloc's
+# single peak counter
+_open_stages = threading.local()
+
+
+@contextmanager
+def timed(name, registry=REGISTRY):
+    """Record the wall time (and peak memory while tracemalloc is tracing) of a block under the given name"""
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        stack = _open_stages.__dict__.setdefault('stack', [])
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        frame = {'start': current, 'peak': current}
+        stack.append(frame)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_memory = None
+        if tracing:
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            peak_memory = peak - frame['start']
+        registry.record(name, seconds, peak_memory)
+
+
+def instrument(name=None):
+    """
+    Decorator recording every call of a function in the registry.
+
+    The default name is the module and qualified name, e.g. EnergyDemand.CHP.calculate_supply, or the module
+    and function name for functions defined inside another function such as the Dash callbacks.
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+        qualname = func.__name__ if '<locals>' in func.__qualname__ else func.__qualname__
+        stage = name or f"{func.__module__.rsplit('.', 1)[-1]}.{qualname}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,218 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+from functools import partial
+from multiprocessing import Process
+
+# Seconds between the heartbeats of a running job, and without one after which the job's worker is presumed dead
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_TIMEOUT = 3 * HEARTBEAT_INTERVAL
+
+
+class JobQueue:
+    """
+    Optimisation jobs queued in a SQLite file, so the dashboard and the workers need no external broker.
+
+    Every process opens its own connection to the same file. A job goes from 'queued' to 'running' when a
+    worker claims it, then to 'finished' or 'failed'. Workers record each new local minimum as progress and
+    a heartbeat while the job runs, a running job whose heartbeat stops is failed by fail_orphaned.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                submitted REAL NOT NULL,
+                started REAL,
+                finished REAL,
+                result TEXT,
+                error TEXT,
+                worker_pid INTEGER,
+                heartbeat REAL
+            );
+            CREATE TABLE IF NOT EXISTS minima (
+                job_id INTEGER NOT NULL,
+                iteration INTEGER NOT NULL,
+                cost REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS minima_job ON minima (job_id);
+        """)
+        # Queues created before the heartbeat was recorded
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("worker_pid", "INTEGER"), ("heartbeat", "REAL")):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self.connection.commit()
+
+    def submit(self, kind, params):
+        """Queue a job and return its id"""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO jobs (kind, params, status, submitted) VALUES (?, ?, 'queued', ?)",
+                (kind, json.dumps(params), time.time()))
+        return cursor.lastrowid
+
+    def claim(self):
+        """Mark the oldest queued job as running and return it, or None if the queue is empty"""
+        with self.connection:
+            # BEGIN IMMEDIATE takes the write lock first, so two workers cannot claim the same job
+            self.connection.execute("BEGIN IMMEDIATE")
+            row = self.connection.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self.connection.execute(
+                "UPDATE jobs SET status = 'running', started = ?, worker_pid = ?, heartbeat = ? WHERE id = ?",
+                (now, os.getpid(), now, row["id"]))
+        return self.get(row["id"])
+
+    def beat(self, job_id):
+        """Record that the job's worker is still alive"""
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = 'running'", (time.time(), job_id))
+
+    def fail_orphaned(self, timeout=HEARTBEAT_TIMEOUT):
+        """
+        Fail the running jobs without a heartbeat for timeout seconds, left behind by a worker that was killed
+        or a server that restarted mid-job. Returns the ids of the failed jobs.
+        """
+        now = time.time()
+        with self.connection:
+            rows = self.connection.execute(
+                "SELECT id, worker_pid FROM jobs WHERE status = 'running' AND COALESCE(heartbeat, started) < ?",
+                (now - timeout,)).fetchall()
+            for row in rows:
+                self.connection.execute(
+                    "UPDATE jobs SET status = 'failed', finished = ?, error = ? "
+                    "WHERE id = ? AND status = 'running'",
+                    (now, f"Worker {row['worker_pid']} stopped without finishing the job", row["id"]))
+        return [row["id"] for row in rows]
+
+    def add_minimum(self, job_id, iteration, cost):
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO minima (job_id, iteration, cost) VALUES (?, ?, ?)", (job_id, iteration, cost))
+
+    def finish(self, job_id, result):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'finished', finished = ?, result = ? WHERE id = ?",
+                (time.time(), json.dumps(result), job_id))
+
+    def fail(self, job_id, error):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, error = ? WHERE id = ?",
+                (time.time(), error, job_id))
+
+    def get(self, job_id):
+        """Job as a dictionary with its params and result decoded, or None"""
+        row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def minima(self, job_id):
+        """(iteration, cost) of every local minimum the job has found so far, in order"""
+        return [tuple(row) for row in self.connection.execute(
+            "SELECT iteration, cost FROM minima WHERE job_id = ? ORDER BY rowid", (job_id,))]
+
+    def close(self):
+        self.connection.close()
+
+
+# Queue connection of each worker process, keyed by process id so a forked pool worker opens its own
+_process_queues = {}
+
+
+def _process_queue(queue_path):
+    """This process's connection to the queue at queue_path, opened on first use and then reused"""
+    key = (os.getpid(), queue_path)
+    if key not in _process_queues:
+        _process_queues[key] = JobQueue(queue_path)
+    return _process_queues[key]
+
+
+def _record_minimum(queue_path, job_id, minimum):
+    """Progress hook given to the optimizer, a module-level partial so it can be sent to worker processes"""
+    _process_queue(queue_path).add_minimum(job_id, minimum['iteration'], minimum['cost'])
+
+
+def run_optimisation_job(queue, job):
+    """
+    Run one 'optimise' job: the dual annealing optimisation of MainScript with the job's enabled sources, then
+    write the results JSON the dashboard reads.
+    """
+    from DemandStore import load_demand
+    from MainScript import run_optimization, build_optimization_data, save_optimization_data
+
+    params = job["params"]
+    demand = load_demand(params["demand_store"])
+    result, optimizer, original_max_powers = run_optimization(
+        demand["heat"], demand["light"], demand["co2"], params["source_config"],
+        on_new_minimum=partial(_record_minimum, queue.path, job["id"]))
+
+    optimization_data = build_optimization_data(result, optimizer, original_max_powers, params["source_config"])
+    save_optimization_data(optimization_data, params["results_path"])
+    return {"total_cost": float(result.fun), "capacities": optimization_data["capacities"]}
+
+
+def _heartbeat(queue_path, job_id, stop):
+    # Runs on a thread of the worker while the job runs, with its own connection
+    queue = JobQueue(queue_path)
+    try:
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            queue.beat(job_id)
+    finally:
+        queue.close()
+
+
+def run_worker(queue_path, poll_interval=1.0):
+    """Worker process loop: claim the next job, run it and record the outcome, forever"""
+    queue = _process_queue(queue_path)  # Also records the minima of runs in this process
+    while True:
+        job = queue.claim()
+        if job is None:
+            queue.fail_orphaned()
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Worker {os.getpid()} running job {job['id']}")
+        stop = threading.Event()
+        threading.Thread(target=_heartbeat, args=(queue_path, job["id"], stop), daemon=True).start()
+        try:
+            if job["kind"] != "optimise":
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            queue.finish(job["id"], run_optimisation_job(queue, job))
+        except Exception:
+            queue.fail(job["id"], traceback.format_exc())
+        finally:
+            stop.set()
+
+
+def start_workers(queue_path, n_workers=1):
+    """
+    Start background worker processes, they exit with the process that started them. Jobs left running by
+    workers that died before are failed first.
+    """
+    JobQueue(queue_path).fail_orphaned()
+    workers = [Process(target=run_worker, args=(queue_path,), name=f"optimisation-worker-{i}", daemon=True)
+               for i in range(n_workers)]
+    for worker in workers:
+        worker.start()
+    return workers
@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import pandas as pd
 from joblib import dump, load
 import json
+import os
 
 from InputCalculations import calculate_inputs
 from HTCoefficients import calculate_htc
@@ -10,6 +11,7 @@ from LightDemand import calculate_lightdemand
 from CO2Demand import calculate_co2demand
 import EnergyDemand
 from Optimise_dual_anealling import OptimizeEnergySources
+from Optimise_milp import OptimizeEnergySourcesMILP
 import Cost
 
 
@@ -66,7 +68,9 @@ def configure_energy_sources():
           "\n 7. Save the files as: \n    'SolarDataNR.csv' for North Roof\n    'SolarDataSR.csv' for South Roof"
           "\n    'SolarDataNW.csv' for North Wall\n    'SolarDataEW.csv' for East Wall\n    'SolarDataSW.csv' for "
           "South Wall"
-          "\n    'SolarDataWW.csv' for West Wall\n    Save each file in the CSV inputs folder")
+          "\n    'SolarDataWW.csv' for West Wall\n    Save each file in the CSV inputs folder"
+          "\n\n Alternatively download a single file with Slope: 0 and save it as 'SolarRadiationHorizontal.csv',"
+          "\n the radiation on every face is then calculated from it using the roof angle of the greenhouse")
 
     input("\nPress Enter when you have downloaded and saved the files...")
 
@@ -95,12 +99,19 @@ def configure_energy_sources():
     return sources
 
 
-def run_optimization(heat_demand, light_demand, co2_demand, source_config):
-    """Run optimization with configured energy sources"""
+def run_optimization(heat_demand, light_demand, co2_demand, source_config, solver="annealing", on_new_minimum=None):
+    """
+    Run optimization with configured energy sources, using dual annealing or the exact MILP solver.
+    on_new_minimum is called with each new best solution found, for progress reporting.
+    """
     print("\nRunning optimization with selected energy sources...")
 
     # Create optimizer instance
-    optimizer = OptimizeEnergySources(heat_demand, light_demand, co2_demand)
+    if solver == "milp":
+        optimizer = OptimizeEnergySourcesMILP(heat_demand, light_demand, co2_demand)
+    else:
+        optimizer = OptimizeEnergySources(heat_demand, light_demand, co2_demand)
+    optimizer.on_new_minimum = on_new_minimum
 
     # Store original max powers
     original_max_powers = {
@@ -138,16 +149,11 @@ def run_optimization(heat_demand, light_demand, co2_demand, source_config):
     return result, optimizer, original_max_powers
 
 
-def main():
-    # Step 1: Run demand calculations and show plots
-    heat_demand, light_demand, co2_demand = run_demand_calculations()
-
-    # Step 2: Configure energy sources
-    source_config = configure_energy_sources()
-
-    # Step 3: Run optimization
-    print("\nRunning optimization with selected energy sources...")
-    result, optimizer, original_max_powers = run_optimization(heat_demand, light_demand, co2_demand, source_config)
+def build_optimization_data(result, optimizer, original_max_powers, source_config):
+    """Cost breakdown of the optimal solution in the format of optimization_results.json, read by the dashboard"""
+    # Evaluate the optimal solution again so the supplies stored on the optimizer are those of this design
+    # rather than of the last design evaluated
+    optimizer.calculate_total_cost(result.x)
 
     # Get the best solution's breakdown
     best_capacities = {
@@ -175,157 +181,13 @@ def main():
     for source in best_capacities.keys():
         optimized_cost_components[source] = {'capex': 0, 'opex': 0, 'fuel': 0, 'total': 0}
 
-    # Calculate actual costs for enabled sources
-    if best_capacities['CHP'] > 0:
-        chp_cost = Cost.CHP(
-            capital_cost=1.2e6 * best_capacities['CHP'] ** -0.4,
-            base_capex=0,
-            operational_cost=9.3,
-            fuel_cost=90.1,
-            power=best_capacities['CHP'],
-            energy_output=optimizer.chp_supply["Yearly Electricity Output"].sum(),
-            fuel_requirement=optimizer.chp_supply["Fuel Requirement"].sum(),
-            cc_power=0.16,
-            lifetime=25,
-            loan_term=20,
-            co2_emissions=optimizer.chp_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = chp_cost.constant_cost()
-        optimized_cost_components['CHP'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                            'total': total}
-
-    if best_capacities['Geothermal'] > 0:
-        geo_cost = Cost.Geothermal(
-            capital_cost=2890000 * best_capacities["Geothermal"] ** -0.45 + 1.2e6,
-            base_capex=0,
-            operational_cost=11000 * best_capacities["Geothermal"] /
-                             optimizer.geo_supply["Yearly Heat Output"].sum(),
-            fuel_cost=228.1,
-            power=best_capacities['Geothermal'],
-            energy_output=optimizer.geo_supply["Yearly Heat Output"].sum(),
-            fuel_requirement=optimizer.geo_supply["Electricity for Heat"].sum(),
-            cc_power=0,
-            lifetime=30,
-            loan_term=20,
-            co2_emissions=optimizer.geo_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = geo_cost.constant_cost()
-        optimized_cost_components['Geothermal'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                                   'total': total}
-
-    # Continue with similar blocks for other technologies
-    # GSHP, Solar, WasteHeat, Grid, Boiler, CO2
-
-    if best_capacities['GSHP'] > 0:
-        gshp_cost = Cost.GSHP(
-            capital_cost=1297000 * best_capacities["GSHP"] ** -0.21557,
-            base_capex=0,
-            operational_cost=8000 * best_capacities["GSHP"] /
-                             optimizer.gshp_supply["Yearly Heat Output"].sum(),
-            fuel_cost=228.1,
-            power=best_capacities['GSHP'],
-            energy_output=optimizer.gshp_supply["Yearly Heat Output"].sum(),
-            fuel_requirement=optimizer.gshp_supply["Electricity for Heat"].sum(),
-            cc_power=0,
-            lifetime=25,
-            loan_term=20,
-            co2_emissions=optimizer.gshp_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = gshp_cost.constant_cost()
-        optimized_cost_components['GSHP'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                             'total': total}
-
-    if best_capacities['Solar'] > 0:
-        solar_cost = Cost.SolarPV(
-            capital_cost=1.572e6 * best_capacities["Solar"] ** -0.15 - 1.5e6,
-            base_capex=0,
-            operational_cost=12000 * best_capacities["Solar"] /
-                             optimizer.solar_supply["Yearly Electricity Output"].sum(),
-            fuel_cost=0,
-            power=best_capacities['Solar'],
-            energy_output=optimizer.solar_supply["Yearly Electricity Output"].sum(),
-            fuel_requirement=0,
-            cc_power=0,
-            lifetime=30,
-            loan_term=20,
-            co2_emissions=optimizer.solar_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = solar_cost.constant_cost()
-        optimized_cost_components['Solar'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                              'total': total}
-
-    if best_capacities['WasteHeat'] > 0:
-        waste_cost = Cost.WasteHeat(
-            capital_cost=0,
-            base_capex=0,
-            operational_cost=0,
-            fuel_cost=90.1*0.9,
-            power=best_capacities['WasteHeat'],
-            energy_output=optimizer.wasteheat_supply["Yearly Heat Output"].sum(),
-            fuel_requirement=optimizer.wasteheat_supply["Steam Required"].sum(),
-            cc_power=0,
-            lifetime=50,
-            loan_term=20,
-            co2_emissions=optimizer.wasteheat_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = waste_cost.constant_cost()
-        optimized_cost_components['WasteHeat'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                                  'total': total}
-
-    if best_capacities['Grid'] > 0:
-        grid_cost = Cost.Grid(
-            capital_cost=0,
-            base_capex=0,
-            operational_cost=0,
-            fuel_cost=228.1,
-            power=best_capacities['Grid'],
-            energy_output=optimizer.grid_supply["Yearly Electricity Output"].sum(),
-            fuel_requirement=optimizer.grid_supply["Electricity for Light"].sum(),
-            cc_power=0,
-            lifetime=50,
-            loan_term=20,
-            co2_emissions=optimizer.grid_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = grid_cost.constant_cost()
-        optimized_cost_components['Grid'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                             'total': total}
-
-    if best_capacities['Boiler'] > 0:
-        boiler_cost = Cost.Boiler(
-            capital_cost=1.03e5 * best_capacities["Boiler"] ** -0.17,
-            base_capex=0,
-            operational_cost=3900 * best_capacities["Boiler"] /
-                             optimizer.boiler_supply["Yearly Heat Output"].sum(),
-            fuel_cost=90.1,
-            power=best_capacities['Boiler'],
-            energy_output=optimizer.boiler_supply["Yearly Heat Output"].sum(),
-            fuel_requirement=optimizer.boiler_supply["Fuel Requirement"].sum(),
-            cc_power=0,
-            lifetime=25,
-            loan_term=20,
-            co2_emissions=optimizer.boiler_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = boiler_cost.constant_cost()
-        optimized_cost_components['Boiler'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                               'total': total}
-
-    if best_capacities['CO2'] > 0:
-        co2_cost = Cost.CO2Import(
-            capital_cost=0,
-            base_capex=0,
-            operational_cost=0,
-            fuel_cost=0.14678,
-            power=best_capacities['CO2'],
-            energy_output=optimizer.co2_supply["CO2 Requirement"].sum(),
-            fuel_requirement=optimizer.co2_supply["CO2 Requirement"].sum(),
-            cc_power=0,
-            lifetime=50,
-            loan_term=20,
-            co2_emissions=optimizer.co2_supply["Direct CO2 Emissions"].sum()
-        )
-        capex, opex, fuel, co2_tax, total, _, _ = co2_cost.constant_cost()
-        optimized_cost_components['CO2'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
-                                            'total': total}
+    # Calculate actual costs for enabled sources, with the cost parameters the optimiser used
+    for source, supply_attribute in optimizer.SUPPLY_ATTRIBUTES.items():
+        if best_capacities[source] > 0:
+            source_cost = Cost.source_cost(source, best_capacities[source], getattr(optimizer, supply_attribute))
+            capex, opex, fuel, co2_tax, total, _, _ = source_cost.constant_cost()
+            optimized_cost_components[source] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax,
+                                                 'total': total}
 
     print("co2 require", optimizer.co2_supply["CO2 Requirement"].sum())
     # Save optimization results
@@ -347,8 +209,30 @@ def main():
         'optimised_cost_components': optimized_cost_components,
     }
 
-    with open('optimization_results.json', 'w') as f:
+    return optimization_data
+
+
+def save_optimization_data(optimization_data, path='optimization_results.json'):
+    """Write the results JSON, replacing the old file in one step so the dashboard never reads half a file"""
+    temp_path = f"{path}.{os.getpid()}.tmp"  # one per process, jobs in several workers may finish together
+    with open(temp_path, 'w') as f:
         json.dump(optimization_data, f, indent=4)
+    os.replace(temp_path, path)
+
+
+def main():
+    # Step 1: Run demand calculations and show plots
+    heat_demand, light_demand, co2_demand = run_demand_calculations()
+
+    # Step 2: Configure energy sources
+    source_config = configure_energy_sources()
+
+    # Step 3: Run optimization
+    print("\nRunning optimization with selected energy sources...")
+    result, optimizer, original_max_powers = run_optimization(heat_demand, light_demand, co2_demand, source_config)
+
+    optimization_data = build_optimization_data(result, optimizer, original_max_powers, source_config)
+    save_optimization_data(optimization_data)
 
     print(f"\nOptimal annual cost: £{result.fun:,.2f}")
 
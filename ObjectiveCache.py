@@ -0,0 +1,135 @@
+import numpy as np
+import sqlite3
+from collections import OrderedDict
+
+
+class ObjectiveCache:
+    """
+    LRU cache of objective values keyed by capacity vectors snapped to a grid.
+
+    Capacities are rounded to the nearest multiple of resolution (MW, or kg/h for CO2), so 1e-3 is 1 kW.
+    The objective must be evaluated at the snapped point, then every vector in the same grid cell gets
+    exactly the value of that point. With a path, values are also written to a SQLite file so that
+    parallel runs and later optimisations can reuse each other's evaluations. They are committed every
+    commit_every new values and by flush().
+
+    Values are only valid for one problem (demand, bounds and cost model). The optimizer sets problem to a
+    fingerprint of it, values stored under another fingerprint are never returned.
+    """
+
+    def __init__(self, resolution=1e-3, maxsize=100000, path=None, commit_every=500):
+        self.resolution = resolution
+        self.maxsize = maxsize
+        self.path = path
+        self.commit_every = commit_every
+        self.values = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._problem = None
+        self._connection = None
+        self._uncommitted = 0
+
+    def __getstate__(self):
+        # SQLite connections cannot be sent to worker processes, each process opens its own
+        self.flush()
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
+
+    @property
+    def problem(self):
+        return self._problem
+
+    @problem.setter
+    def problem(self, fingerprint):
+        # Values in memory belong to the previous problem
+        if fingerprint != self._problem:
+            self.values.clear()
+        self._problem = fingerprint
+
+    @property
+    def connection(self):
+        if self.path is not None and self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS objective_values (problem TEXT, resolution REAL, key BLOB, value REAL, "
+                "PRIMARY KEY (problem, resolution, key))")
+            self._connection.commit()
+        return self._connection
+
+    def key(self, x):
+        """Grid indices of a capacity vector, as a hashable tuple"""
+        return tuple(np.rint(np.asarray(x, dtype=float) / self.resolution).astype(np.int64).tolist())
+
+    def snap(self, x, bounds=None):
+        """Point of the grid cell containing x, clipped to the bounds so it is still a valid design"""
+        snapped = np.rint(np.asarray(x, dtype=float) / self.resolution) * self.resolution
+        if bounds is not None:
+            bounds = np.asarray(bounds, dtype=float)
+            snapped = np.clip(snapped, bounds[:, 0], bounds[:, 1])
+        return snapped
+
+    def get(self, key):
+        """Cached value for a key, or None"""
+        if key in self.values:
+            self.values.move_to_end(key)
+            self.hits += 1
+            return self.values[key]
+
+        if self.connection is not None:
+            row = self.connection.execute(
+                "SELECT value FROM objective_values WHERE problem = ? AND resolution = ? AND key = ?",
+                (self.problem or "", self.resolution, np.array(key, dtype=np.int64).tobytes())).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                self._remember(key, row[0])
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.connection is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO objective_values VALUES (?, ?, ?, ?)",
+                (self.problem or "", self.resolution, np.array(key, dtype=np.int64).tobytes(), float(value)))
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self.flush()
+
+    def flush(self):
+        """Commit the values written since the last commit, so other processes can read them"""
+        if self._connection is not None and self._uncommitted:
+            self._connection.commit()
+        self._uncommitted = 0
+
+    def _remember(self, key, value):
+        self.values[key] = value
+        self.values.move_to_end(key)
+        if len(self.values) > self.maxsize:
+            self.values.popitem(last=False)
+
+    def merge_stats(self, stats):
+        """Add the hit counts reported by another process"""
+        self.hits += stats['hits']
+        self.disk_hits += stats['disk_hits']
+        self.misses += stats['misses']
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'size': len(self.values),
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"Objective cache: {stats['hit_rate']:.1%} hit rate "
+                f"({stats['hits']:,} memory hits, {stats['disk_hits']:,} disk hits, {stats['misses']:,} misses, "
+                f"{stats['size']:,} entries at {self.resolution * 1000:g} kW resolution)")
@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+
+class ObjectiveProfiler:
+    """
+    Sampling profiler for the objective function of one optimisation run.
+
+    A background thread looks at the optimising thread's call stack every interval seconds. Samples are only
+    kept when the stack passes through the profiled function, and only the frames from that function down are
+    recorded, so the annealing itself and the rest of the program are left out. The samples are written as
+    folded stacks (flamegraph.pl, speedscope or inferno can draw them) and as a summary of the hotspots.
+    """
+
+    def __init__(self, func, interval=0.005):
+        self.code = func.__code__
+        self.interval = interval
+        self.stacks = Counter()
+        self.total_samples = 0  # Including the samples taken outside the objective
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        """Start sampling the calling thread"""
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="objective-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            self.total_samples += 1
+
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                if frame.f_code is self.code:
+                    self.stacks[";".join(reversed(stack))] += 1
+                    break
+                frame = frame.f_back
+
+    @staticmethod
+    def _label(code):
+        # Semicolons separate the frames of a folded stack
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+    def hotspots(self, top=20):
+        """Self and inclusive sample counts of the most expensive functions"""
+        self_samples = Counter()
+        inclusive_samples = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            for frame in set(frames):
+                inclusive_samples[frame] += count
+        return self_samples.most_common(top), inclusive_samples.most_common(top)
+
+    def summary(self, top=20):
+        objective_samples = sum(self.stacks.values())
+        if not objective_samples:
+            return "No samples were taken inside the objective function\n"
+
+        self_hotspots, inclusive_hotspots = self.hotspots(top)
+        lines = [
+            f"Objective profile: {objective_samples:,} samples every {self.interval * 1000:g} ms "
+            f"(about {objective_samples * self.interval:,.1f} s), "
+            f"{objective_samples / self.total_samples:.1%} of the sampled run time",
+            "",
+            f"Top {top} functions by self time:",
+        ]
+        lines += [f"{count / objective_samples:7.1%}  {count:>8,}  {frame}" for frame, count in self_hotspots]
+        lines += ["", f"Top {top} functions by inclusive time:"]
+        lines += [f"{count / objective_samples:7.1%}  {count:>8,}  {frame}" for frame, count in inclusive_hotspots]
+        return "\n".join(lines) + "\n"
+
+    def save(self, prefix):
+        """Write <prefix>.folded and <prefix>_hotspots.txt, returns both file names"""
+        folded_filename = f"{prefix}.folded"
+        with open(folded_filename, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        hotspots_filename = f"{prefix}_hotspots.txt"
+        with open(hotspots_filename, "w") as f:
+            f.write(self.summary())
+
+        return folded_filename, hotspots_filename
@@ -1,14 +1,36 @@
 import numpy as np
 import pandas as pd
 from scipy.optimize import dual_annealing
-from joblib import load
+from scipy.optimize import OptimizeResult
+from joblib import load, dump
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import Manager
+import os
+import pickle
+import hashlib
+import inspect
 import EnergyDemand
 import Cost
+from DemandStore import SharedDemand
+from ObjectiveCache import ObjectiveCache
+from ObjectiveProfiler import ObjectiveProfiler
+from StructuredLogging import get_logger
+import logging
 import time
 from datetime import timedelta, datetime
 
+log = get_logger(__name__)
+
+# Display names of the technologies, in the order used by x
+TECHNOLOGY_NAMES = ['CHP', 'Geothermal', 'GSHP', 'Solar', 'Waste Heat', 'Grid', 'Boiler', 'CO2']
+
 
 class OptimizeEnergySources:
+    # Supply table attribute of each technology in the order of the decision vector x
+    SUPPLY_ATTRIBUTES = {'CHP': 'chp_supply', 'Geothermal': 'geo_supply', 'GSHP': 'gshp_supply',
+                         'Solar': 'solar_supply', 'WasteHeat': 'wasteheat_supply', 'Grid': 'grid_supply',
+                         'Boiler': 'boiler_supply', 'CO2': 'co2_supply'}
+
     def __init__(self, heat_demand, light_demand, co2_demand):
         self.heat_demand = heat_demand
         self.light_demand = light_demand
@@ -52,23 +74,20 @@ class OptimizeEnergySources:
         self.max_heat = heat_demand["QnetMWh"].max()
         self.max_light = light_demand["MWh"].max()
         self.max_co2 = co2_demand["Total CO2 Demand"].max()
+
+        # Everything set so far is rebuilt from the demand by each process pool worker instead of being pickled
+        self._demand_attributes = set(self.__dict__) | {'_demand_attributes'}
+
         self.best_solution = None
         self.best_cost = float('inf')
 
-        print(f"\nMaximum demands:")
-        print(f"Heat: {self.max_heat:.4f} MW")
-        print(f"Light: {self.max_light:.4f} MW")
-        print(f"CO2: {self.max_co2:.4f} kg/h")
-
-        print(f"\nMaximum technology powers:")
-        print(f"CHP: {self.chp_max_power:.4f} MW")
-        print(f"Geothermal: {self.geo_max_power:.4f} MW")
-        print(f"GSHP: {self.gshp_max_power:.4f} MW")
-        print(f"Solar: {self.solar_max_power:.4f} MW")
-        print(f"Waste Heat: {self.wasteheat_max_power:.4f} MW")
-        print(f"Grid: {self.grid_max_power:.4f} MW")
-        print(f"Boiler: {self.boiler_max_power:.4f} MW")
-        print(f"CO2: {self.co2_max_power:.4f} kg/h")
+        log.info("Maximum demands: heat %.4f MW, light %.4f MW, CO2 %.4f kg/h",
+                 self.max_heat, self.max_light, self.max_co2,
+                 extra={'fields': {'max_heat': self.max_heat, 'max_light': self.max_light, 'max_co2': self.max_co2}})
+
+        max_powers = dict(zip(TECHNOLOGY_NAMES, (b[1] for b in self.get_bounds())))
+        log.info("Maximum technology powers:\n%s", format_capacities(max_powers, minimum=None),
+                 extra={'fields': {'max_powers': max_powers}})
 
         self.iteration_data = []
         self.current_minimum = float('inf')
@@ -79,6 +98,20 @@ class OptimizeEnergySources:
         self.converged = False
         self.current_cost_breakdown = {}
 
+        # Early stopping of individual dual annealing runs
+        self.maxiter = 50  # Global iterations per run
+        self.shortened_maxiter = 10  # Global iterations per run once converged, with early_stopping='shorten'
+        self.early_stopping = 'skip'  # What to do with the remaining runs after convergence: 'skip', 'shorten' or None
+        self.prune_tolerance = None  # e.g. 0.25 stops a run whose best is 25% worse than the overall best
+        self.prune_grace = 200  # Evaluations a run is allowed before it can be pruned
+        self.run_converged = False
+        self.current_run = None
+        self.checkpoint_path = None
+        self.saved_evaluations = 0  # Records of iteration_data already appended to the checkpoint's evaluations file
+        self.shared = None  # Best cost and convergence flag shared between parallel runs
+        self.cache = None  # ObjectiveCache to memoise objective evaluations on a capacity grid
+        self.on_new_minimum = None  # Called with each new local minimum, must be picklable for n_jobs > 1
+
         self.best_cost_components = {
             'CHP': {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0},
             'BOILER': {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0}
@@ -95,6 +128,19 @@ class OptimizeEnergySources:
             'CO2': {'capex': 0, 'opex': 0, 'fuel': 0}
         }
 
+    def get_bounds(self):
+        """Search space limits for each technology, in the order used by x"""
+        return [
+            (0, self.chp_max_power),
+            (0, self.geo_max_power),
+            (0, self.gshp_max_power),
+            (0, self.solar_max_power),
+            (0, self.wasteheat_max_power),
+            (0, self.grid_max_power),
+            (0, self.boiler_max_power),
+            (0, self.co2_max_power)
+        ]
+
     def calculate_supplies(self, x):
         """Calculate supply of heat, light, and CO2 from given capacities"""
         chp, geo, gshp, solar, waste, grid, boiler, co2 = x
@@ -138,19 +184,7 @@ class OptimizeEnergySources:
             if chp > min_size:
                 chp_instance = EnergyDemand.CHP(self.heat_demand, self.light_demand, self.co2_demand)
                 self.chp_supply = chp_instance.calculate_supply(chp, self.chp_max_power, self.chp_demand)
-                chp_cost = Cost.CHP(
-                    capital_cost=1.2e6 * chp ** -0.4,
-                    base_capex=0,
-                    operational_cost=9.3,
-                    fuel_cost=90.1,
-                    power=chp,
-                    energy_output=self.chp_supply["Yearly Electricity Output"].sum(),
-                    fuel_requirement=self.chp_supply["Fuel Requirement"].sum(),
-                    cc_power=0.16,
-                    lifetime=25,
-                    loan_term=20,
-                    co2_emissions=self.chp_supply["Direct CO2 Emissions"].sum()
-                )
+                chp_cost = Cost.source_cost('CHP', chp, self.chp_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = chp_cost.constant_cost()
                 current_cost_components['CHP'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -159,20 +193,7 @@ class OptimizeEnergySources:
             if geo > min_size:
                 geo_instance = EnergyDemand.Geothermal(self.heat_demand, self.light_demand, self.co2_demand)
                 self.geo_supply = geo_instance.calculate_supply(geo, self.geo_max_power)
-                geo_cost = Cost.Geothermal(
-                    capital_cost=2890000 * geo ** -0.45 + 1.2e6,
-                    base_capex=0,
-                    operational_cost=11000 * geo /
-                                     self.geo_supply["Yearly Heat Output"].sum(),
-                    fuel_cost=228.1,
-                    power=geo,
-                    energy_output=self.geo_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=self.geo_supply["Electricity for Heat"].sum(),
-                    cc_power=0,
-                    lifetime=30,
-                    loan_term=20,
-                    co2_emissions=self.geo_supply["Direct CO2 Emissions"].sum()
-                )
+                geo_cost = Cost.source_cost('Geothermal', geo, self.geo_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = geo_cost.constant_cost()
                 current_cost_components['Geothermal'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -181,19 +202,7 @@ class OptimizeEnergySources:
             if gshp > min_size:
                 gshp_instance = EnergyDemand.GSHP(self.heat_demand, self.light_demand, self.co2_demand)
                 self.gshp_supply = gshp_instance.calculate_supply(gshp, self.gshp_max_power)
-                gshp_cost = Cost.GSHP(
-                    capital_cost=1297000 * gshp ** -0.21557,
-                    base_capex=0,
-                    operational_cost=8000 * gshp / self.gshp_supply["Yearly Heat Output"].sum(),
-                    fuel_cost=228.1,
-                    power=gshp,
-                    energy_output=self.gshp_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=self.gshp_supply["Electricity for Heat"].sum(),
-                    cc_power=0,
-                    lifetime=25,
-                    loan_term=20,
-                    co2_emissions=self.gshp_supply["Direct CO2 Emissions"].sum()
-                )
+                gshp_cost = Cost.source_cost('GSHP', gshp, self.gshp_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = gshp_cost.constant_cost()
                 current_cost_components['GSHP'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -202,19 +211,7 @@ class OptimizeEnergySources:
             if solar > min_size:
                 solar_instance = EnergyDemand.SolarPV(self.heat_demand, self.light_demand, self.co2_demand)
                 self.solar_supply = solar_instance.calculate_supply(solar, self.solar_max_power)
-                solar_cost = Cost.SolarPV(
-                    capital_cost=1.572e6 * solar ** -0.15 - 1.5e5,
-                    base_capex=0,
-                    operational_cost=12000 * solar / self.solar_supply["Yearly Electricity Output"].sum(),
-                    fuel_cost=0,
-                    power=solar,
-                    energy_output=self.solar_supply["Yearly Electricity Output"].sum(),
-                    fuel_requirement=0,
-                    cc_power=0,
-                    lifetime=30,
-                    loan_term=20,
-                    co2_emissions=self.solar_supply["Direct CO2 Emissions"].sum()
-                )
+                solar_cost = Cost.source_cost('Solar', solar, self.solar_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = solar_cost.constant_cost()
                 current_cost_components['Solar'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -223,19 +220,7 @@ class OptimizeEnergySources:
             if waste > min_size:
                 waste_instance = EnergyDemand.WasteHeat(self.heat_demand, self.light_demand, self.co2_demand)
                 self.wasteheat_supply = waste_instance.calculate_supply(waste, self.wasteheat_max_power)
-                waste_cost = Cost.WasteHeat(
-                    capital_cost=0,
-                    base_capex=0,
-                    operational_cost=0,
-                    fuel_cost=90.1*0.9,
-                    power=waste,
-                    energy_output=self.wasteheat_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=self.wasteheat_supply["Steam Required"].sum(),
-                    cc_power=0,
-                    lifetime=50,
-                    loan_term=20,
-                    co2_emissions=self.wasteheat_supply["Direct CO2 Emissions"].sum()
-                )
+                waste_cost = Cost.source_cost('WasteHeat', waste, self.wasteheat_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = waste_cost.constant_cost()
                 current_cost_components['WasteHeat'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -244,19 +229,7 @@ class OptimizeEnergySources:
             if grid > min_size:
                 grid_instance = EnergyDemand.Grid(self.heat_demand, self.light_demand, self.co2_demand)
                 self.grid_supply = grid_instance.calculate_supply(grid, self.grid_max_power)
-                grid_cost = Cost.Grid(
-                    capital_cost=0,
-                    base_capex=0,
-                    operational_cost=0,
-                    fuel_cost=228.1,
-                    power=grid,
-                    energy_output=self.grid_supply["Yearly Electricity Output"].sum(),
-                    fuel_requirement=self.grid_supply["Electricity for Light"].sum(),
-                    cc_power=0,
-                    lifetime=50,
-                    loan_term=20,
-                    co2_emissions=self.grid_supply["Direct CO2 Emissions"].sum()
-                )
+                grid_cost = Cost.source_cost('Grid', grid, self.grid_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = grid_cost.constant_cost()
                 current_cost_components['Grid'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -264,19 +237,7 @@ class OptimizeEnergySources:
             if boiler > min_size:
                 boiler_instance = EnergyDemand.Boiler(self.heat_demand, self.light_demand, self.co2_demand)
                 self.boiler_supply = boiler_instance.calculate_supply(boiler, self.boiler_max_power, self.boiler_demand)
-                boiler_cost = Cost.Boiler(
-                    capital_cost=103000 * boiler ** -0.17,
-                    base_capex=0,
-                    operational_cost=3900 * boiler / self.boiler_supply["Yearly Heat Output"].sum(),
-                    fuel_cost=90.1,
-                    power=boiler,
-                    energy_output=self.boiler_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=self.boiler_supply["Fuel Requirement"].sum(),
-                    cc_power=0,
-                    lifetime=25,
-                    loan_term=20,
-                    co2_emissions=self.boiler_supply["Direct CO2 Emissions"].sum()
-                )
+                boiler_cost = Cost.source_cost('Boiler', boiler, self.boiler_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = boiler_cost.constant_cost()
                 current_cost_components['Boiler'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -284,19 +245,7 @@ class OptimizeEnergySources:
             if co2 > min_size:
                 co2_instance = EnergyDemand.CO2Import(self.heat_demand, self.light_demand, self.co2_demand)
                 self.co2_supply = co2_instance.calculate_supply(co2, self.co2_max_power)
-                co2_cost = Cost.CO2Import(
-                    capital_cost=0,
-                    base_capex=0,
-                    operational_cost=0,
-                    fuel_cost=0.14678,
-                    power=co2,
-                    energy_output=self.co2_supply["CO2 Requirement"].sum(),
-                    fuel_requirement=self.co2_supply["CO2 Requirement"].sum(),
-                    cc_power=0,
-                    lifetime=50,
-                    loan_term=20,
-                    co2_emissions=self.co2_supply["Direct CO2 Emissions"].sum()
-                )
+                co2_cost = Cost.source_cost('CO2', co2, self.co2_supply)
                 capex, opex, fuel, co2_tax, lifetime_cost, _, _ = co2_cost.constant_cost()
                 current_cost_components['CO2'] = {'capex': capex, 'opex': opex, 'fuel': fuel, 'co2_tax': co2_tax}
                 total_cost += lifetime_cost
@@ -308,9 +257,33 @@ class OptimizeEnergySources:
             boiler_costs = current_cost_components['Boiler']
             return total_cost, chp_costs, boiler_costs
         except Exception as e:
-            print(f"Error in calculate_total_cost: {e}")
+            log.error("Error in calculate_total_cost: %s", e)
             return 1e10  # Return high cost instead of None
 
+    def calculate_total_emissions(self, x):
+        """Calculate total annual net CO2 emissions (kg) for all technologies"""
+        chp, geo, gshp, solar, waste, grid, boiler, co2 = x
+        total_emissions = 0
+
+        if chp > 0:
+            total_emissions += self.chp.calculate_supply(chp, self.chp_max_power, self.chp_demand)["Net CO2 Emissions"].sum()
+        if geo > 0:
+            total_emissions += self.geo.calculate_supply(geo, self.geo_max_power)["Net CO2 Emissions"].sum()
+        if gshp > 0:
+            total_emissions += self.gshp.calculate_supply(gshp, self.gshp_max_power)["Net CO2 Emissions"].sum()
+        if solar > 0:
+            total_emissions += self.solar.calculate_supply(solar, self.solar_max_power)["Net CO2 Emissions"].sum()
+        if waste > 0:
+            total_emissions += self.wasteheat.calculate_supply(waste, self.wasteheat_max_power)["Net CO2 Emissions"].sum()
+        if grid > 0:
+            total_emissions += self.grid.calculate_supply(grid, self.grid_max_power)["Net CO2 Emissions"].sum()
+        if boiler > 0:
+            total_emissions += self.boiler.calculate_supply(boiler, self.boiler_max_power, self.boiler_demand)["Net CO2 Emissions"].sum()
+        if co2 > 0:
+            total_emissions += self.co2.calculate_supply(co2, self.co2_max_power)["Net CO2 Emissions"].sum()
+
+        return float(total_emissions)
+
     def check_convergence(self):
         """Check if optimization has converged based on improvements between discovered minima"""
         if len(self.local_minima) < self.convergence_window:
@@ -327,13 +300,19 @@ class OptimizeEnergySources:
         relative_improvement = (best_cost_start - best_cost_now) / best_cost_start
 
         if relative_improvement < self.improvement_threshold:
-            print(f"\nConvergence detected:")
-            print(
-                f"Best solution improved by only {relative_improvement:.4%} over last {self.convergence_window} discovered minima")
-            print(f"Below threshold of {self.improvement_threshold:.1%}")
+            if self.converged:
+                return True  # Already reported, later runs are left to early_stopping
+
+            log.info("Convergence detected: best solution improved by only %.4f%% over last %d discovered minima, "
+                     "below threshold of %.1f%%", relative_improvement * 100, self.convergence_window,
+                     self.improvement_threshold * 100,
+                     extra={'fields': {'relative_improvement': relative_improvement, 'best_cost': self.best_cost}})
             self.converged = True
+            self.run_converged = True  # Stops the current dual annealing run from the callback
             # Set the current minimum to the best cost when convergence is detected
             self.current_minimum = self.best_cost
+            if self.shared is not None:
+                self.shared['converged'].set()
             return True
 
         return False
@@ -342,30 +321,59 @@ class OptimizeEnergySources:
         """Modified objective function that tracks local minima"""
         chp, geo, gshp, solar, waste, grid, boiler, co2 = x
 
-        if self.converged:
-            return self.current_minimum
-
-        cost = self._calculate_objective(x)  # This contains the original objective function logic
+        if self.current_run is not None:
+            self._check_pruning()
+
+        if self.cache is not None:
+            # Evaluate at the grid point so every vector in the same cell shares one exact value
+            x = self.cache.snap(x, self.get_bounds())
+            key = self.cache.key(x)
+            cost = self.cache.get(key)
+            if cost is None:
+                cost = self._calculate_objective(x)
+                self.cache.put(key, cost)
+            else:
+                # A hit skips _calculate_objective, record it so the evaluations CSV still has every call.
+                # Only the capacities and the total are known, the breakdown columns are left empty
+                self.iteration_data.append({
+                    **dict(zip(TECHNOLOGY_NAMES, x)),
+                    'total_cost': cost,
+                    'cached': True
+                })
+        else:
+            cost = self._calculate_objective(x)  # This contains the original objective function logic
+
+        if self.current_run is not None:
+            self.current_run['nfev'] += 1
+            if cost < self.current_run['cost']:
+                self.current_run['x'] = np.copy(x)
+                self.current_run['cost'] = cost
 
         # Update best solution if this is better
         if cost < self.best_cost:
             self.best_cost = cost
             self.best_solution = x.copy()  # Store a copy of the best solution
 
-            # Print only significant improvements (e.g., more than 1% better)
-            if len(self.local_minima) == 0 or cost < self.local_minima[-1]['cost'] * 0.99:
-                print(f"\nNew better solution found: £{cost:,.2f}")
-                techs = ['CHP', 'Geothermal', 'GSHP', 'Solar', 'Waste Heat', 'Grid', 'Boiler', 'CO2']
-                for tech, cap in zip(techs, x):
-                    if cap > 0.0001:
-                        unit = "kg/h" if tech == "CO2" else "MW"
-                        print(f"{tech}: {cap:.4f} {unit}")
+            if self.shared is not None:
+                with self.shared['lock']:
+                    if cost < self.shared['best_cost'].value:
+                        self.shared['best_cost'].value = cost
+
+            # Log only significant improvements (e.g., more than 1% better)
+            if ((len(self.local_minima) == 0 or cost < self.local_minima[-1]['cost'] * 0.99)
+                    and log.isEnabledFor(logging.INFO)):
+                capacities = dict(zip(TECHNOLOGY_NAMES, map(float, x)))
+                log.info("New better solution found: £%s\n%s", f"{cost:,.2f}", format_capacities(capacities),
+                         extra={'fields': {'cost': cost, 'capacities': capacities, 'evaluation': self.iteration_count}})
 
             self.local_minima.append({
+                'run': self.current_run['run'] if self.current_run is not None else None,
                 'iteration': self.iteration_count,
                 'cost': cost,
                 'capacities': list(x)
             })
+            if self.on_new_minimum is not None:
+                self.on_new_minimum(self.local_minima[-1])
 
             # Add this line to check for convergence after updating local_minima
             self.check_convergence()
@@ -373,6 +381,20 @@ class OptimizeEnergySources:
         self.iteration_count += 1
         return cost
 
+    def _check_pruning(self):
+        """Cancel the current run if another run has converged or this run is clearly worse than the best"""
+        run = self.current_run
+
+        if self.shared is not None and self.early_stopping == 'skip' and self.shared['converged'].is_set():
+            raise RunStopped("Stopped early: another run converged")
+
+        if self.prune_tolerance is None or run['nfev'] < self.prune_grace:
+            return
+
+        best_cost = self.shared['best_cost'].value if self.shared is not None else self.best_cost
+        if run['cost'] > best_cost * (1 + self.prune_tolerance):
+            raise RunStopped(f"Stopped early: run best £{run['cost']:,.2f} is dominated by £{best_cost:,.2f}")
+
     def _calculate_objective(self, x):
         """Objective function with cost breakdown tracking"""
         chp, geo, gshp, solar, waste, grid, boiler, co2 = x
@@ -387,7 +409,7 @@ class OptimizeEnergySources:
                     chp_costs = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0}
                     boiler_costs = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0}
             except Exception as e:
-                print(f"Error processing cost results: {e}")
+                log.error("Error processing cost results: %s", e)
                 base_cost = 1e10  # Use high cost value for errors
                 chp_costs = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0}
                 boiler_costs = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0}
@@ -439,7 +461,8 @@ class OptimizeEnergySources:
                 },
                 'CHP_costs': chp_costs,
                 'Boiler_costs': boiler_costs,
-                'total_cost': total_cost
+                'total_cost': total_cost,
+                'cached': False
             })
 
             # Store cost breakdown for this iteration
@@ -461,48 +484,56 @@ class OptimizeEnergySources:
                 },
             }
 
-            # Detailed debugging output
-            if undersupply_penalty > 0:
-                print(f"\nCost Breakdown at CHP = {x[0]:.4f} MW:"
-                      f"\nGeothermal = {x[1]:.4f} MW "
-                      f"\nGSHP = {x[2]:.4f} MW "
-                      f"\nSolar = {x[3]:.4f} MW"
-                      f"\nWaste Heat = {x[4]:.4f} MW"
-                      f"\nGrid = {x[5]:.4f} MW"
-                      f"\nBoiler = {x[6]:.4f} MW"
-                      f"\nCO2 = {x[7]:.4f} kg/h")
-                print(f"Base Cost: £{base_cost:,.2f}")
-                print(f"Undersupply Penalty: £{undersupply_penalty:,.2f}")
-                print(f"  Heat: £{heat_undersupply_penalty:,.2f}")
-                print(f"  Light: £{light_undersupply_penalty:,.2f}")
-                print(f"  CO2: £{co2_undersupply_penalty:,.2f}")
-                print(f"Total Cost: £{total_cost:,.2f}")
+            # Detailed debugging output, the check keeps this free on the hot path unless DEBUG is enabled
+            if undersupply_penalty > 0 and log.isEnabledFor(logging.DEBUG):
+                capacities = dict(zip(TECHNOLOGY_NAMES, map(float, x)))
+                log.debug("Cost breakdown at\n%s\nBase Cost: £%s\nUndersupply Penalty: £%s"
+                          "\n  Heat: £%s\n  Light: £%s\n  CO2: £%s\nTotal Cost: £%s",
+                          format_capacities(capacities, minimum=None), f"{base_cost:,.2f}",
+                          f"{undersupply_penalty:,.2f}", f"{heat_undersupply_penalty:,.2f}",
+                          f"{light_undersupply_penalty:,.2f}", f"{co2_undersupply_penalty:,.2f}", f"{total_cost:,.2f}",
+                          extra={'fields': {'capacities': capacities, 'base_cost': base_cost,
+                                            'undersupply_penalty': {'heat': heat_undersupply_penalty,
+                                                                    'light': light_undersupply_penalty,
+                                                                    'co2': co2_undersupply_penalty},
+                                            'total_cost': total_cost}})
 
             return float(total_cost)
 
         except Exception as e:
-            print(f"Error in objective function: {e}")
+            log.error("Error in objective function: %s", e)
             return 1e10
 
-    def optimize(self):
-        """Run optimization using dual annealing with convergence tracking"""
-        print("\nStarting dual annealing optimization...")
+    def optimize(self, checkpoint_path=None, resume=False, checkpoint_interval=60, early_stopping='skip', n_jobs=1,
+                 profile=False):
+        """
+        Run optimization using dual annealing with convergence tracking.
+
+        If checkpoint_path is given, the state of the search is saved after every completed run and at
+        most every checkpoint_interval seconds during a run, with n_jobs > 1 as well. With resume=True,
+        completed runs are loaded from the checkpoint and skipped. A run that was interrupted is not continued
+        where it stopped, it is started again (with its usual seed) from the best point it had reached. The
+        evaluation history is appended to checkpoint_path + '.evaluations' rather than rewritten every time.
+
+        Once convergence is detected the current run is stopped and early_stopping decides what happens to
+        the remaining runs: 'skip' them, 'shorten' them to shortened_maxiter, or None to run them in full.
+        If prune_tolerance is set, runs whose best is more than that fraction worse than the overall best after
+        prune_grace evaluations are cancelled. With n_jobs > 1 the runs are spread over a process pool and share
+        the overall best and convergence flag.
+
+        With profile=True, or the environment variable GREENHOUSE_PROFILE_OBJECTIVE=1, the objective is
+        sampling-profiled for this run and the folded stacks and hotspot summary are saved next to the minima.
+        """
+        log.info("Starting dual annealing optimization...")
 
         self.best_solution = None
         self.best_cost = float('inf')
         self.local_minima = []
         self.iteration_count = 0
 
-        bounds = [
-            (0, self.chp_max_power),
-            (0, self.geo_max_power),
-            (0, self.gshp_max_power),
-            (0, self.solar_max_power),
-            (0, self.wasteheat_max_power),
-            (0, self.grid_max_power),
-            (0, self.boiler_max_power),
-            (0, self.co2_max_power)
-        ]
+        bounds = self.get_bounds()
+        if self.cache is not None:
+            self.cache.problem = self.problem_fingerprint()
 
         # Calculate minimum CHP capacity needed for constraints
         min_chp_heat = self.max_heat / self.chp.heat_to_electric_ratio
@@ -511,13 +542,25 @@ class OptimizeEnergySources:
 
         min_chp = self.chp_max_power
 
-        print(f"\nMinimum CHP requirements:")
-        print(f"For heat: {min_chp_heat:.4f} MW")
-        print(f"For light: {min_chp_light:.4f} MW")
-        print(f"For CO2: {min_chp_co2:.4f} MW")
-        print(f"Overall minimum: {min_chp:.4f} MW")
+        log.info("Minimum CHP requirements: heat %.4f MW, light %.4f MW, CO2 %.4f MW, overall %.4f MW",
+                 min_chp_heat, min_chp_light, min_chp_co2, min_chp)
+
+        completed_runs = {}
+        interrupted_runs = {}
 
-        results = []
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.completed_runs = completed_runs
+        self.last_checkpoint = time.time()
+        self.current_run = None
+        self.early_stopping = early_stopping
+
+        self.saved_evaluations = 0
+        if resume and checkpoint_path and os.path.exists(checkpoint_path):
+            completed_runs, interrupted_runs = self._load_checkpoint(checkpoint_path, bounds)
+            self.completed_runs = completed_runs
+        elif checkpoint_path and os.path.exists(f"{checkpoint_path}.evaluations"):
+            os.remove(f"{checkpoint_path}.evaluations")  # Left by an earlier optimisation
 
         initial_points = [
             [self.chp_co2_power, self.geo_max_power, 0, 0, self.grid_max_power, 0, 0, 0],
@@ -539,132 +582,425 @@ class OptimizeEnergySources:
 
         ]
 
+        # Restart interrupted runs from the best point they had reached
+        for interrupted_run in interrupted_runs.values():
+            if interrupted_run['x'] is not None:
+                initial_points[interrupted_run['run']] = interrupted_run['x']
+                log.info("Restarting interrupted optimization run %d from its best point, £%s",
+                         interrupted_run['run'] + 1, f"{interrupted_run['cost']:,.2f}")
+
+        pending = []
         for i, x0 in enumerate(initial_points):
-            print(f"\nStarting optimization run {i + 1} with initial CHP power: {x0[0]:.2f} MW")
+            if i in completed_runs:
+                log.info("Skipping optimization run %d, already completed in checkpoint", i + 1)
+            else:
+                pending.append((i, x0))
+
+        profiler = None
+        if profile or os.environ.get("GREENHOUSE_PROFILE_OBJECTIVE") == "1":
+            if n_jobs > 1:
+                log.warning("Objective profiling only covers runs in this process, use n_jobs=1 to profile")
+            else:
+                profiler = ObjectiveProfiler(OptimizeEnergySources.objective)
+                profiler.start()
+
+        try:
+            if n_jobs > 1:
+                self._optimize_parallel(pending, bounds, n_jobs)
+            else:
+                for i, x0 in pending:
+                    maxiter = self.maxiter
+                    if self.converged and early_stopping == 'skip':
+                        log.info("Skipping optimization run %d after convergence", i + 1)
+                        continue
+                    if self.converged and early_stopping == 'shorten':
+                        maxiter = self.shortened_maxiter
+
+                    log.info("Starting optimization run %d with initial CHP power: %.2f MW", i + 1, x0[0])
+                    completed_runs[i] = self._run_start(i, x0, bounds, maxiter)
+                    self._save_checkpoint()
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            if self.cache is not None:
+                self.cache.flush()
+
+        results = [completed_runs[i] for i in sorted(completed_runs)]
+        best_result = min(results, key=lambda r: r.fun)
+
+        # Override the result with our best found solution, which with a cache is the grid point actually evaluated
+        if self.best_solution is not None and self.best_cost <= best_result.fun:
+            best_result.x = self.best_solution
+            best_result.fun = self.best_cost
+
+        minima_df = pd.DataFrame(self.local_minima)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"optimization_minima_{timestamp}.csv"
+        minima_df.to_csv(filename, index=False)
+
+        iterations_df = pd.DataFrame(self.iteration_data)
+        evaluations_filename = f"optimization_evaluations_{timestamp}.csv"
+        iterations_df.to_csv(evaluations_filename, index=False)
+
+        if self.converged:
+            log.info("Optimization stopped early due to convergence")
+        log.info("Local minima history saved to %s", filename)
+        log.info("Best solution found: £%s", f"{self.best_cost:,.2f}",
+                 extra={'fields': {'best_cost': self.best_cost, 'evaluations': self.iteration_count}})
+        if self.cache is not None:
+            log.info("%s", self.cache.summary(), extra={'fields': self.cache.stats()})
+        if profiler is not None:
+            folded_filename, hotspots_filename = profiler.save(f"optimization_profile_{timestamp}")
+            log.info("Objective profile saved to %s and %s", folded_filename, hotspots_filename)
+
+        return best_result
 
+    def _run_start(self, i, x0, bounds, maxiter):
+        """Run dual annealing from one starting point, returns its result even if it was stopped early"""
+        self.current_run = {'run': i, 'x': None, 'cost': float('inf'), 'nfev': 0}
+        self.run_converged = False
+
+        try:
             result = dual_annealing(
                 self.objective,
                 bounds=bounds,  # Search space limit for each variable
                 x0=x0,  # Starting point in the search space
                 initial_temp=500,  # High initial temperature for exploration, 5230 is the default, 1310.121
-                maxiter=50,  # Max number of global iterations, 1000 is the default, 132
+                maxiter=maxiter,  # Max number of global iterations, 1000 is the default, 132
                 visit=1.01,
                 # Controls the relative weighting of the global (Cauchy) and local (Gaussian) search components, range is 1 to 3, 2.62 is the default
                 accept=-5,
                 # Negative with larger absolute values means less likely to accept solutions tending away from the objective, -5.0 is the default
                 no_local_search=True,  # No local search is traditional generalised simulated annealing
                 seed=42 + i,  # Random seed for reproducibility
+                callback=self._annealing_callback,
+            )
+        except RunStopped as stop:
+            # Each global iteration of the strategy chain evaluates two points per dimension
+            run = self.current_run
+            log.info("Optimization run %d: %s", i + 1, stop)
+            result = OptimizeResult(
+                x=run['x'] if run['x'] is not None else np.asarray(x0, dtype=float),
+                fun=run['cost'],
+                nfev=run['nfev'],
+                nit=max(1, run['nfev'] // (2 * len(bounds))),
+                success=True,
+                message=[str(stop)],
             )
 
-            results.append(result)
+        self.current_run = None
+        return result
+
+    def problem_fingerprint(self):
+        """Hash of everything an objective value depends on besides x: demand, bounds, cost parameters and code"""
+        digest = hashlib.sha256()
+        for demand in (self.heat_demand, self.light_demand, self.co2_demand):
+            digest.update(pd.util.hash_pandas_object(demand).to_numpy().tobytes())
+            digest.update(repr(list(demand.columns)).encode())
+        digest.update(np.asarray(self.get_bounds(), dtype=float).tobytes())
+        digest.update(repr(sorted(Cost.TECHNOLOGY_COSTS.items())).encode())
+        for method in (OptimizeEnergySources.calculate_supplies, OptimizeEnergySources.calculate_total_cost,
+                       OptimizeEnergySources._calculate_objective):
+            digest.update(inspect.getsource(method).encode())
+        return digest.hexdigest()
+
+    def _search_state(self):
+        """
+        The attributes not derived from the demand, sent to the process pool workers with each run. The histories
+        are left out, every worker starts its own.
+        """
+        return {name: value for name, value in self.__dict__.items()
+                if name not in self._demand_attributes and name not in ('local_minima', 'iteration_data')}
+
+    def _optimize_parallel(self, pending, bounds, n_jobs):
+        """
+        Run the pending starts on a process pool, merging their histories back into this optimizer.
+
+        The demand is published once in shared memory and every worker builds its own optimizer from read-only
+        views of it, so each run only pickles the search state rather than the demand and supply DataFrames.
+        """
+        demand = {'heat': self.heat_demand, 'light': self.light_demand, 'co2': self.co2_demand}
+        with SharedDemand(demand) as shared_demand, Manager() as manager:
+            shared = {
+                'best_cost': manager.Value('d', self.best_cost),
+                'converged': manager.Event(),
+                'lock': manager.Lock(),
+                'runs': manager.dict(),  # Best point of each run in progress, for the checkpoints
+            }
+            if self.converged:
+                shared['converged'].set()
+
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                     initargs=(type(self), shared_demand)) as executor:
+                search_state = self._search_state()
+                running = {executor.submit(_run_start_in_worker, search_state, i, x0, bounds, shared)
+                           for i, x0 in pending}
+
+                while running:
+                    done, running = wait(running, timeout=self.checkpoint_interval if self.checkpoint_path else None,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i, result, worker_state = future.result()
+                        shared['runs'].pop(i, None)
+                        self._merge_worker_run(i, result, worker_state)
+                    self._save_checkpoint(dict(shared['runs']))
+
+        self.local_minima.sort(key=lambda m: m['cost'], reverse=True)
+        if self.converged:
+            self.current_minimum = self.best_cost
 
-        best_result = min(results, key=lambda r: r.fun)
+    def _merge_worker_run(self, i, result, worker_state):
+        """Merge the history of one run from a process pool worker, a run skipped after convergence has no result"""
+        if result is not None:
+            self.completed_runs[i] = result
+        # Workers count their own evaluations, number them after the runs merged so far
+        for minimum in worker_state['local_minima']:
+            minimum['iteration'] += self.iteration_count
+        self.local_minima.extend(worker_state['local_minima'])
+        self.iteration_data.extend(worker_state['iteration_data'])
+        self.iteration_count += worker_state['iteration_count']
+        if worker_state['best_cost'] < self.best_cost:
+            self.best_cost = worker_state['best_cost']
+            self.best_solution = worker_state['best_solution']
+            self.best_cost_components = worker_state['best_cost_components']
+        self.converged = self.converged or worker_state['converged']
+        if self.cache is not None:
+            self.cache.merge_stats(worker_state['cache_stats'])
+
+    def _annealing_callback(self, x, f, context):
+        """Called by dual_annealing whenever a run finds a new best point, returning True stops the run"""
+        if self.checkpoint_path and time.time() - self.last_checkpoint >= self.checkpoint_interval:
+            self._save_checkpoint()
+        if self.shared is not None and self.current_run is not None and self.current_run['x'] is not None:
+            # In a process pool worker: report the run's best point to the parent, which writes the checkpoints
+            self.shared['runs'][self.current_run['run']] = dict(self.current_run)
+
+        return self.run_converged and self.early_stopping is not None
+
+    def _save_checkpoint(self, interrupted_runs=None):
+        """
+        Write the search state to disk, replacing the previous checkpoint atomically.
+
+        interrupted_runs maps the index of each run in progress to its best point so far, by default the
+        current run of this process. iteration_data only grows, so the records added since the last checkpoint
+        are appended to the evaluations file and the checkpoint keeps the file's length.
+        """
+        if not self.checkpoint_path:
+            return
+
+        if interrupted_runs is None:
+            interrupted_runs = {self.current_run['run']: self.current_run} if self.current_run is not None else {}
+
+        evaluations_path = f"{self.checkpoint_path}.evaluations"
+        with open(evaluations_path, 'ab') as f:
+            if self.saved_evaluations < len(self.iteration_data):
+                pickle.dump(self.iteration_data[self.saved_evaluations:], f)
+            evaluations_size = f.tell()
+        self.saved_evaluations = len(self.iteration_data)
+
+        state = {
+            'bounds': self.get_bounds(),
+            'completed_runs': self.completed_runs,
+            'interrupted_runs': interrupted_runs,
+            'best_solution': self.best_solution,
+            'best_cost': self.best_cost,
+            'best_cost_components': self.best_cost_components,
+            'local_minima': self.local_minima,
+            'evaluations': (self.saved_evaluations, evaluations_size),
+            'iteration_count': self.iteration_count,
+            'current_minimum': self.current_minimum,
+            'converged': self.converged,
+        }
 
-        # Override the result with our best found solution
-        if self.best_solution is not None and self.best_cost < best_result.fun:
-            best_result.x = self.best_solution
-            best_result.fun = self.best_cost
+        temp_path = f"{self.checkpoint_path}.tmp"
+        dump(state, temp_path)
+        os.replace(temp_path, self.checkpoint_path)
+        self.last_checkpoint = time.time()
 
-        minima_df = pd.DataFrame(self.local_minima)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"optimization_minima_{timestamp}.csv"
-        minima_df.to_csv(filename, index=False)
+    def _load_checkpoint(self, checkpoint_path, bounds):
+        """Restore the search state saved by _save_checkpoint, returns the completed and interrupted runs"""
+        state = load(checkpoint_path)
 
-        iterations_df = pd.DataFrame(self.iteration_data)
-        evaluations_filename = f"optimization_evaluations_{timestamp}.csv"
-        iterations_df.to_csv(evaluations_filename, index=False)
+        if not np.allclose(np.asarray(state['bounds'], dtype=float), np.asarray(bounds, dtype=float)):
+            log.warning("Checkpoint %s was created with different bounds, starting from scratch", checkpoint_path)
+            return {}, None
 
-        if self.converged:
-            print("\nOptimization stopped early due to convergence")
-        print(f"\nLocal minima history saved to {filename}")
-        print(f"Best solution found: £{self.best_cost:,.2f}")
+        self.best_solution = state['best_solution']
+        self.best_cost = state['best_cost']
+        self.best_cost_components = state['best_cost_components']
+        self.local_minima = state['local_minima']
+        self.iteration_count = state['iteration_count']
 
-        return best_result
+        # Records appended after this checkpoint was written belong to a later, unfinished one: cut them off
+        count, size = state['evaluations']
+        self.iteration_data = []
+        if size:
+            with open(f"{checkpoint_path}.evaluations", 'r+b') as f:
+                f.truncate(size)
+                while f.tell() < size:
+                    self.iteration_data.extend(pickle.load(f))
+        self.saved_evaluations = count
+        self.current_minimum = state['current_minimum']
+        self.converged = state['converged']
+
+        log.info("Loaded checkpoint %s: %d runs completed, best solution £%s", checkpoint_path,
+                 len(state['completed_runs']), f"{self.best_cost:,.2f}")
+
+        return state['completed_runs'], state['interrupted_runs']
+
+
+def format_capacities(capacities, minimum=0.0001):
+    """One line per technology above minimum, CO2 in kg/h and the rest in MW"""
+    return "\n".join(f"{tech}: {cap:.4f} {'kg/h' if tech == 'CO2' else 'MW'}"
+                     for tech, cap in capacities.items() if minimum is None or cap > minimum)
+
+
+class RunStopped(Exception):
+    """Raised from the objective to cancel the current dual annealing run"""
+
+
+# The optimizer of a process pool worker, built from the shared demand by _init_worker
+_worker_optimizer = None
+
+
+def _init_worker(optimizer_class, shared_demand):
+    """Process pool initializer: build this worker's optimizer once from the demand in shared memory"""
+    global _worker_optimizer
+    demand = shared_demand.attach()
+    _worker_optimizer = optimizer_class(demand['heat'], demand['light'], demand['co2'])
+
+
+def _run_start_in_worker(search_state, i, x0, bounds, shared):
+    """Process pool task: one dual annealing run on the worker's optimizer, given the parent's search state"""
+    optimizer = _worker_optimizer
+    optimizer.__dict__.update(search_state)
+    optimizer.shared = shared
+    optimizer.checkpoint_path = None  # Only the parent process writes checkpoints
+    optimizer.local_minima = []
+    optimizer.iteration_data = []
+    optimizer.iteration_count = 0
+    if optimizer.cache is not None:
+        # Start from the parent's cached values but only report this worker's lookups
+        optimizer.cache.hits = optimizer.cache.disk_hits = optimizer.cache.misses = 0
+    cache_stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    maxiter = optimizer.maxiter
+    if shared['converged'].is_set():
+        if optimizer.early_stopping == 'skip':
+            # As in a serial optimisation the skipped run has no result, so it is not recorded as completed
+            log.info("Skipping optimization run %d after convergence", i + 1)
+            return i, None, {
+                'local_minima': [], 'iteration_data': [], 'iteration_count': 0, 'best_cost': float('inf'),
+                'best_solution': None, 'best_cost_components': None, 'converged': True, 'cache_stats': cache_stats}
+        if optimizer.early_stopping == 'shorten':
+            maxiter = optimizer.shortened_maxiter
+
+    optimizer.best_cost = shared['best_cost'].value
+    optimizer.best_solution = None
+    log.info("Starting optimization run %d with initial CHP power: %.2f MW", i + 1, x0[0])
+    result = optimizer._run_start(i, x0, bounds, maxiter)
+    if optimizer.cache is not None:
+        optimizer.cache.flush()
+
+    return i, result, {
+        'local_minima': optimizer.local_minima,
+        'iteration_data': optimizer.iteration_data,
+        'iteration_count': optimizer.iteration_count,
+        'best_cost': optimizer.best_cost if optimizer.best_solution is not None else float('inf'),
+        'best_solution': optimizer.best_solution,
+        'best_cost_components': optimizer.best_cost_components,
+        'converged': optimizer.converged,
+        'cache_stats': optimizer.cache.stats() if optimizer.cache is not None else cache_stats,
+    }
 
 
 def main():
     # Start timing
     start_time = time.time()
 
-    print("Loading demand data...")
+    log.info("Loading demand data...")
     heat_demand = pd.read_json("heat_demand.json")
     light_demand = pd.read_json("light_demand.json")
     co2_demand = pd.read_json("co2_demand.json")
 
     # Time for data loading
     data_load_time = time.time()
-    print(f"Data loading time: {timedelta(seconds=data_load_time - start_time)}")
+    log.info(f"Data loading time: {timedelta(seconds=data_load_time - start_time)}")
 
     # Initialize optimizer
     optimizer = OptimizeEnergySources(heat_demand, light_demand, co2_demand)
+    # Memoising the objective is opt-in, it snaps every evaluation to a grid of this resolution (1e-3 is 1 kW)
+    cache_resolution = os.environ.get("GREENHOUSE_OBJECTIVE_CACHE")
+    if cache_resolution:
+        optimizer.cache = ObjectiveCache(resolution=float(cache_resolution))
 
     # Time for initialization
     init_time = time.time()
-    print(f"Initialization time: {timedelta(seconds=init_time - data_load_time)}")
+    log.info(f"Initialization time: {timedelta(seconds=init_time - data_load_time)}")
 
     # Run optimization
-    print("\nStarting optimization...")
+    log.info("Starting optimization...")
     opt_start_time = time.time()
     result = optimizer.optimize()
     opt_end_time = time.time()
 
     # Calculate optimization time
     opt_duration = opt_end_time - opt_start_time
-    print(f"\nOptimization time: {timedelta(seconds=opt_duration)}")
+    log.info(f"Optimization time: {timedelta(seconds=opt_duration)}")
 
     if result.success:
-        print("\nOptimization successful!")
-        print("\nOptimal capacities (MW):")
+        log.info("Optimization successful!")
+        log.info("Optimal capacities (MW):")
         technologies = ['CHP', 'Geothermal', 'GSHP', 'Solar PV', 'Waste Heat', 'Grid', 'Boiler', 'CO2 Import']
         for tech, capacity in zip(technologies, result.x):
-            print(f"{tech}: {capacity:.4f}")
+            log.info(f"{tech}: {capacity:.4f}")
 
-        print(f"\nMinimum annual cost: £{result.fun:,.2f}")
+        log.info(f"Minimum annual cost: £{result.fun:,.2f}")
 
         # Verify constraints are met
         heat_supply, light_supply, co2_supply = optimizer.calculate_supplies(result.x)
 
-        print("\nConstraint Verification:")
-        print(f"Heat Supply:")
-        print(f"Required: {optimizer.max_heat:.4f} MW")
-        print(f"Supplied: {heat_supply:.4f} MW")
+        log.info("Constraint Verification:")
+        log.info("Heat Supply:")
+        log.info(f"Required: {optimizer.max_heat:.4f} MW")
+        log.info(f"Supplied: {heat_supply:.4f} MW")
 
-        print(f"\nLight Supply:")
-        print(f"Required: {optimizer.max_light:.4f} MW")
-        print(f"Supplied: {light_supply:.4f} MW")
+        log.info("Light Supply:")
+        log.info(f"Required: {optimizer.max_light:.4f} MW")
+        log.info(f"Supplied: {light_supply:.4f} MW")
 
-        print(f"\nCO2 Supply:")
-        print(f"Required: {optimizer.max_co2:.4f} kg/h")
-        print(f"Supplied: {co2_supply:.4f} kg/h")
+        log.info("CO2 Supply:")
+        log.info(f"Required: {optimizer.max_co2:.4f} kg/h")
+        log.info(f"Supplied: {co2_supply:.4f} kg/h")
 
         # Print optimization statistics
-        print("\nOptimization Statistics:")
-        print(f"Number of iterations: {result.nit}")
-        print(f"Number of function evaluations: {result.nfev}")
-        print(f"Average time per iteration: {timedelta(seconds=opt_duration / result.nit)}")
+        log.info("Optimization Statistics:")
+        log.info(f"Number of iterations: {result.nit}")
+        log.info(f"Number of function evaluations: {result.nfev}")
+        log.info(f"Average time per iteration: {timedelta(seconds=opt_duration / result.nit)}")
 
-        # Get final cost breakdown
-        optimizer.objective(result.x)  # This will update the cost breakdown
+        # Get final cost breakdown, evaluated directly since a cached objective would not update it
+        optimizer._calculate_objective(result.x)
         cost_breakdown = optimizer.current_cost_breakdown
 
-        print("\nFinal Cost Breakdown:")
-        print(f"Base Cost: £{cost_breakdown['base_cost']:,.2f}")
-        print("\nUndersupply Penalties:")
-        print(f"  Heat: £{cost_breakdown['undersupply_breakdown']['heat']:,.2f}")
-        print(f"  Light: £{cost_breakdown['undersupply_breakdown']['light']:,.2f}")
-        print(f"  CO2: £{cost_breakdown['undersupply_breakdown']['co2']:,.2f}")
-        print(f"\nTotal Cost: £{cost_breakdown['total_cost']:,.2f}")
+        log.info("Final Cost Breakdown:")
+        log.info(f"Base Cost: £{cost_breakdown['base_cost']:,.2f}")
+        log.info("Undersupply Penalties:")
+        log.info(f"  Heat: £{cost_breakdown['undersupply_breakdown']['heat']:,.2f}")
+        log.info(f"  Light: £{cost_breakdown['undersupply_breakdown']['light']:,.2f}")
+        log.info(f"  CO2: £{cost_breakdown['undersupply_breakdown']['co2']:,.2f}")
+        log.info(f"Total Cost: £{cost_breakdown['total_cost']:,.2f}")
 
     else:
-        print("\nOptimization failed:", result.message)
+        log.error("Optimization failed: %s", result.message)
 
     # Total runtime
     end_time = time.time()
     total_duration = end_time - start_time
 
     # Detailed timing breakdown
-    print("\nTiming Breakdown:")
-    print(f"Total:          {timedelta(seconds=total_duration)}")
+    log.info("Timing Breakdown:")
+    log.info(f"Total:          {timedelta(seconds=total_duration)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds, OptimizeResult
+import time
+from datetime import timedelta
+
+from Optimise_dual_anealling import OptimizeEnergySources
+
+
+TECHNOLOGIES = ['CHP', 'Geothermal', 'GSHP', 'Solar', 'WasteHeat', 'Grid', 'Boiler', 'CO2']
+
+
+def solve_problem(problem, time_limit=None, emissions_cap=None, minimise="cost"):
+    """
+    Solve a piecewise-linear capacity planning problem built by OptimizeEnergySourcesMILP.build_problem.
+
+    Only plain NumPy/SciPy objects are used so the problem can be sent to other processes.
+    When the problem was built with emissions, minimise="emissions" minimises net emissions instead of
+    cost and emissions_cap adds an upper limit on net emissions (kg/year).
+    Returns the scipy MILP result and the capacities recovered from the breakpoint weights.
+    """
+    options = {"disp": False}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+
+    constraints = list(problem["constraints"])
+    if emissions_cap is not None:
+        constraints.append(LinearConstraint(problem["e"], -np.inf, emissions_cap))
+
+    result = milp(
+        c=problem["e"] if minimise == "emissions" else problem["c"],
+        integrality=problem["integrality"],
+        bounds=Bounds(0, problem["upper"]),
+        constraints=constraints,
+        options=options,
+    )
+
+    capacities = None
+    if result.x is not None:
+        capacities = problem["capacity_map"] @ result.x
+
+    return result, capacities
+
+
+class OptimizeEnergySourcesMILP(OptimizeEnergySources):
+    """
+    Exact backend for the capacity planning problem.
+
+    The annual cost of each technology is a function of its own capacity only: a concave CAPEX
+    curve (capital_cost = a * P ** b + c) plus OPEX, fuel and CO2 tax terms that scale linearly with
+    the supplied energy. Each cost curve is sampled at breakpoints and modelled with SOS2 weights and
+    segment binaries, while the peak heat, light and CO2 requirements become hard linear constraints
+    instead of the undersupply penalties used by dual annealing. The MILP is solved to optimality with
+    scipy.optimize.milp (HiGHS), so no external solver is needed.
+    """
+
+    def __init__(self, heat_demand, light_demand, co2_demand, n_segments=24, min_breakpoint=1e-3):
+        super().__init__(heat_demand, light_demand, co2_demand)
+        self.n_segments = n_segments  # Number of linear segments per cost curve
+        self.min_breakpoint = min_breakpoint  # Smallest non-zero breakpoint as a fraction of max power
+        self.nfev = 0
+
+    def technology_cost(self, index, capacity):
+        """Annual cost of a single technology at the given capacity, using the annealing cost model"""
+        x = np.zeros(len(TECHNOLOGIES))
+        x[index] = capacity
+        self.nfev += 1
+
+        cost_result = self.calculate_total_cost(x)
+        cost = cost_result[0] if isinstance(cost_result, tuple) else cost_result
+
+        # Failed evaluations are given the same high cost as in the annealing objective
+        if not np.isfinite(cost):
+            return 1e10
+        return float(cost)
+
+    def technology_emissions(self, index, capacity):
+        """Annual net CO2 emissions (kg) of a single technology at the given capacity"""
+        x = np.zeros(len(TECHNOLOGIES))
+        x[index] = capacity
+        return self.calculate_total_emissions(x)
+
+    def get_breakpoints(self, upper):
+        """Breakpoints for one cost curve, spaced geometrically as CAPEX is steepest near zero"""
+        if upper <= 0:
+            return np.zeros(1)
+        return np.concatenate(([0.0], upper * np.geomspace(self.min_breakpoint, 1, self.n_segments)))
+
+    def build_problem(self, with_emissions=False):
+        """
+        Build the MILP as sparse matrices.
+
+        For each technology k with breakpoints p_0..p_n the variables are the weights lambda_0..lambda_n
+        and the segment binaries z_1..z_n. Capacity is sum(lambda_j * p_j) and cost is
+        sum(lambda_j * cost(p_j)), where at most two adjacent weights may be non-zero. With emissions,
+        net CO2 emissions are sampled at the same breakpoints and stored as a second objective vector.
+        """
+        bounds = self.get_bounds()
+        costs, emissions, breakpoints, cap_rows, cap_cols, cap_vals = [], [], [], [], [], []
+        integrality, upper = [], []
+        eq_blocks, link_blocks = [], []
+        n_vars = 0
+
+        for k, (_, max_power) in enumerate(bounds):
+            points = self.get_breakpoints(max_power)
+            point_costs = np.array([0.0 if p == 0 else self.technology_cost(k, p) for p in points])
+            n_points = len(points)
+            n_segments = n_points - 1
+            lam = n_vars + np.arange(n_points)
+            seg = n_vars + n_points + np.arange(n_segments)
+            n_vars += n_points + n_segments
+
+            breakpoints.append(points)
+            costs.append(np.concatenate((point_costs, np.zeros(n_segments))))
+            if with_emissions:
+                point_emissions = np.array([0.0 if p == 0 else self.technology_emissions(k, p) for p in points])
+                emissions.append(np.concatenate((point_emissions, np.zeros(n_segments))))
+            integrality.append(np.concatenate((np.zeros(n_points), np.ones(n_segments))))
+            upper.append(np.ones(n_points + n_segments))
+
+            cap_rows.extend([k] * n_points)
+            cap_cols.extend(lam)
+            cap_vals.extend(points)
+
+            # sum(lambda) = 1 and, when there are segments, sum(z) = 1
+            eq_blocks.append((lam, np.ones(n_points)))
+            if n_segments:
+                eq_blocks.append((seg, np.ones(n_segments)))
+
+            # lambda_j <= z_j + z_(j+1): only the two ends of the chosen segment may be non-zero
+            for j in range(n_points if n_segments else 0):
+                cols = [lam[j]] + [seg[s] for s in (j - 1, j) if 0 <= s < n_segments]
+                vals = [1.0] + [-1.0] * (len(cols) - 1)
+                link_blocks.append((cols, vals))
+
+        capacity_map = sparse.csr_array((cap_vals, (cap_rows, cap_cols)), shape=(len(bounds), n_vars))
+
+        def stack(blocks):
+            rows = np.concatenate([np.full(len(cols), i) for i, (cols, _) in enumerate(blocks)])
+            cols = np.concatenate([np.asarray(cols) for cols, _ in blocks])
+            vals = np.concatenate([np.asarray(vals, dtype=float) for _, vals in blocks])
+            return sparse.csr_array((vals, (rows, cols)), shape=(len(blocks), n_vars))
+
+        # Peak supply per unit capacity of each technology, from the same relations as the penalty terms
+        supply_per_unit = np.column_stack([self.calculate_supplies(np.eye(len(bounds))[k]) for k in range(len(bounds))])
+        max_demand = np.array([self.max_heat, self.max_light, self.max_co2])
+
+        constraints = [
+            LinearConstraint(stack(eq_blocks), 1, 1),
+            LinearConstraint(stack(link_blocks), -np.inf, 0),
+            LinearConstraint(sparse.csr_array(supply_per_unit) @ capacity_map, max_demand, np.inf),
+        ]
+
+        return {
+            "c": np.concatenate(costs),
+            "e": np.concatenate(emissions) if with_emissions else None,
+            "integrality": np.concatenate(integrality),
+            "upper": np.concatenate(upper),
+            "constraints": constraints,
+            "capacity_map": capacity_map,
+            "breakpoints": breakpoints,
+            "supply_per_unit": supply_per_unit,
+            "max_demand": max_demand,
+        }
+
+    def optimize(self, time_limit=None):
+        """Run the MILP backend and return a result comparable with OptimizeEnergySources.optimize"""
+        print("\nStarting MILP optimization...")
+
+        self.best_solution = None
+        self.best_cost = float('inf')
+        self.local_minima = []
+        self.iteration_count = 0
+        self.nfev = 0
+
+        problem = self.build_problem()
+        print(f"MILP size: {len(problem['c'])} variables, "
+              f"{sum(c.A.shape[0] for c in problem['constraints'])} constraints, "
+              f"{self.nfev} cost curve evaluations")
+
+        milp_result, capacities = solve_problem(problem, time_limit=time_limit)
+
+        if capacities is None:
+            print("\nMILP failed:", milp_result.message)
+            return OptimizeResult(x=None, fun=np.inf, success=False, status=milp_result.status,
+                                  message=milp_result.message, nit=1, nfev=self.nfev)
+
+        # Clip rounding noise from the solver so capacities stay inside the annealing bounds
+        upper = np.array([b[1] for b in self.get_bounds()])
+        capacities = np.clip(capacities, 0, upper)
+
+        # Evaluate the exact (non-linearised) objective at the solution so it can be compared directly
+        cost = self.objective(capacities)
+
+        print(f"Linearised optimum: £{milp_result.fun:,.2f}")
+        print(f"Exact cost at optimum: £{cost:,.2f}")
+
+        return OptimizeResult(
+            x=capacities,
+            fun=cost,
+            success=milp_result.success,
+            status=milp_result.status,
+            message=milp_result.message,
+            nit=max(1, int(getattr(milp_result, "mip_node_count", 1) or 1)),
+            nfev=self.nfev + 1,
+            lower_bound=milp_result.fun,
+            mip_gap=getattr(milp_result, "mip_gap", None),
+        )
+
+
+def main():
+    """Solve the same demand data with both backends and compare the results"""
+    print("Loading demand data...")
+    heat_demand = pd.read_json("heat_demand.json")
+    light_demand = pd.read_json("light_demand.json")
+    co2_demand = pd.read_json("co2_demand.json")
+
+    milp_optimizer = OptimizeEnergySourcesMILP(heat_demand, light_demand, co2_demand)
+    start_time = time.time()
+    milp_result = milp_optimizer.optimize()
+    milp_duration = time.time() - start_time
+
+    annealing_optimizer = OptimizeEnergySources(heat_demand, light_demand, co2_demand)
+    start_time = time.time()
+    annealing_result = annealing_optimizer.optimize()
+    annealing_duration = time.time() - start_time
+
+    comparison = pd.DataFrame(
+        {"MILP": milp_result.x, "Dual annealing": annealing_result.x},
+        index=TECHNOLOGIES,
+    )
+    print("\nOptimal capacities (MW, CO2 in kg/h):")
+    print(comparison.round(4))
+
+    print(f"\nMILP:           £{milp_result.fun:,.2f} in {timedelta(seconds=milp_duration)}")
+    print(f"Dual annealing: £{annealing_result.fun:,.2f} in {timedelta(seconds=annealing_duration)}")
+
+
+if __name__ == "__main__":
+    main()
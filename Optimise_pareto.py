@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta, datetime
+from functools import partial
+
+from Optimise_milp import OptimizeEnergySourcesMILP, solve_problem, TECHNOLOGIES
+
+
+def _solve_capped(problem, emissions_cap, time_limit=None):
+    """Worker task for one point of the epsilon-constraint sweep"""
+    result, capacities = solve_problem(problem, time_limit=time_limit, emissions_cap=emissions_cap)
+    if capacities is None:
+        return emissions_cap, None, np.nan, np.nan
+    return emissions_cap, capacities, result.fun, float(problem["e"] @ result.x)
+
+
+def non_dominated(costs, emissions):
+    """Boolean mask of the points not dominated in (cost, emissions), both minimised"""
+    costs = np.asarray(costs, dtype=float)
+    emissions = np.asarray(emissions, dtype=float)
+    order = np.lexsort((emissions, costs))
+
+    # After sorting by cost a point is kept only if it strictly lowers the best emissions seen so far
+    sorted_emissions = emissions[order]
+    best_before = np.concatenate(([np.inf], np.minimum.accumulate(sorted_emissions)[:-1]))
+    mask = np.zeros(len(costs), dtype=bool)
+    mask[order] = sorted_emissions < best_before
+    return mask
+
+
+class ParetoFrontOptimizer(OptimizeEnergySourcesMILP):
+    """
+    Cost versus net CO2 emissions trade-off using epsilon-constraint sweeps of the MILP backend.
+
+    The problem is built once in the parent process (this is where the demand DataFrames are needed),
+    then only the small sparse MILP is sent to a process pool, one emissions cap per task.
+    """
+
+    def pareto_front(self, n_points=200, n_jobs=None, time_limit=None):
+        """Return the non-dominated cost/emissions front as a DataFrame, cheapest solution first"""
+        print("\nBuilding cost/emissions MILP...")
+        start_time = time.time()
+        self.nfev = 0
+        problem = self.build_problem(with_emissions=True)
+
+        # The two ends of the front: cheapest design and lowest-emission design
+        cheapest, _ = solve_problem(problem, time_limit=time_limit)
+        cleanest, _ = solve_problem(problem, time_limit=time_limit, minimise="emissions")
+        if not (cheapest.success and cleanest.success):
+            raise RuntimeError(f"Could not find the ends of the front: {cheapest.message} / {cleanest.message}")
+
+        max_emissions = float(problem["e"] @ cheapest.x)
+        min_emissions = float(problem["e"] @ cleanest.x)
+        caps = np.linspace(min_emissions, max_emissions, n_points)
+        print(f"Sweeping {n_points} emissions caps from {min_emissions:,.0f} to {max_emissions:,.0f} kg/year")
+
+        n_jobs = n_jobs or os.cpu_count() or 1
+        task = partial(_solve_capped, problem, time_limit=time_limit)
+        if n_jobs == 1:
+            solutions = list(map(task, caps))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                solutions = list(executor.map(task, caps, chunksize=max(1, n_points // (4 * n_jobs))))
+
+        rows = []
+        for cap, capacities, linear_cost, linear_emissions in solutions:
+            if capacities is None:
+                continue
+            capacities = np.clip(capacities, 0, [b[1] for b in self.get_bounds()])
+            row = dict(zip(TECHNOLOGIES, capacities))
+            row.update({
+                'emissions_cap': cap,
+                'linearised_cost': linear_cost,
+                'linearised_emissions': linear_emissions,
+            })
+            rows.append(row)
+
+        front = pd.DataFrame(rows).drop_duplicates(subset=TECHNOLOGIES)
+
+        # Re-evaluate every design with the exact cost and emissions models
+        exact = [self.calculate_total_cost(x) for x in front[TECHNOLOGIES].to_numpy()]
+        front['total_cost'] = [c[0] if isinstance(c, tuple) else c for c in exact]
+        front['net_emissions'] = [self.calculate_total_emissions(x) for x in front[TECHNOLOGIES].to_numpy()]
+
+        front = front[non_dominated(front['total_cost'], front['net_emissions'])]
+        front = front.sort_values('total_cost').reset_index(drop=True)
+
+        print(f"Found {len(front)} non-dominated designs in {timedelta(seconds=time.time() - start_time)}")
+        return front
+
+
+def main():
+    print("Loading demand data...")
+    heat_demand = pd.read_json("heat_demand.json")
+    light_demand = pd.read_json("light_demand.json")
+    co2_demand = pd.read_json("co2_demand.json")
+
+    optimizer = ParetoFrontOptimizer(heat_demand, light_demand, co2_demand)
+    front = optimizer.pareto_front()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"optimization_pareto_{timestamp}.csv"
+    front.to_csv(filename, index=False)
+    print(f"\nPareto front saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+SOLAR_CONSTANT = 1367.0  # W m-2
+
+# Perez et al. (1990) all-sites composite coefficients f11, f12, f13, f21, f22, f23, one row per sky clearness
+# bin. The bins are split at PEREZ_CLEARNESS_BINS
+PEREZ_COEFFICIENTS = np.array([
+    [-0.0083117, 0.5877285, -0.0620636, -0.0596012, 0.0721249, -0.0220216],
+    [0.1299457, 0.6825954, -0.1513752, -0.0189325, 0.0659650, -0.0288748],
+    [0.3296958, 0.4868735, -0.2210958, 0.0554140, -0.0639588, -0.0260542],
+    [0.5682053, 0.1874525, -0.2951290, 0.1088631, -0.1519229, -0.0139754],
+    [0.8730280, -0.3920403, -0.3616149, 0.2255647, -0.4620442, 0.0012448],
+    [1.1326077, -1.2367284, -0.4118494, 0.2877813, -0.8230357, 0.0558651],
+    [1.0601591, -1.5999137, -0.3589221, 0.2642124, -1.1272340, 0.1310694],
+    [0.6777470, -0.3272588, -0.2504286, 0.1561313, -1.3765031, 0.2506212],
+])
+PEREZ_CLEARNESS_BINS = np.array([1.065, 1.23, 1.5, 1.95, 2.8, 4.5, 6.2])
+
+
+def _utc(times):
+    times = pd.DatetimeIndex(times)
+    return times.tz_convert("UTC") if times.tz is not None else times
+
+
+def solar_position(times, latitude, longitude):
+    """
+    Solar zenith and azimuth in degrees at the given times (UTC unless timezone aware), azimuth clockwise
+    from north. Uses the NOAA Fourier series for declination and equation of time, good to about half a degree.
+    """
+    times = _utc(times)
+    hours = times.hour.to_numpy() + times.minute.to_numpy() / 60 + times.second.to_numpy() / 3600
+    day_angle = 2 * np.pi / 365 * (times.dayofyear.to_numpy() - 1 + (hours - 12) / 24)
+
+    equation_of_time = 229.18 * (0.000075 + 0.001868 * np.cos(day_angle) - 0.032077 * np.sin(day_angle)
+                                 - 0.014615 * np.cos(2 * day_angle) - 0.040849 * np.sin(2 * day_angle))
+    declination = (0.006918 - 0.399912 * np.cos(day_angle) + 0.070257 * np.sin(day_angle)
+                   - 0.006758 * np.cos(2 * day_angle) + 0.000907 * np.sin(2 * day_angle)
+                   - 0.002697 * np.cos(3 * day_angle) + 0.00148 * np.sin(3 * day_angle))
+
+    solar_minutes = hours * 60 + equation_of_time + 4 * longitude
+    hour_angle = np.radians(solar_minutes / 4 - 180)
+    lat = np.radians(latitude)
+
+    cos_zenith = np.sin(lat) * np.sin(declination) + np.cos(lat) * np.cos(declination) * np.cos(hour_angle)
+    zenith = np.degrees(np.arccos(np.clip(cos_zenith, -1, 1)))
+    azimuth = np.degrees(np.arctan2(np.sin(hour_angle),
+                                    np.cos(hour_angle) * np.sin(lat) - np.tan(declination) * np.cos(lat))) + 180
+    return zenith, azimuth % 360
+
+
+def extraterrestrial_irradiance(times):
+    """Normal irradiance at the top of the atmosphere in W m-2"""
+    day_angle = 2 * np.pi * _utc(times).dayofyear.to_numpy() / 365
+    return SOLAR_CONSTANT * (1 + 0.033 * np.cos(day_angle))
+
+
+def direct_normal(beam_horizontal, zenith, max_zenith=87.0):
+    """Direct normal irradiance from beam irradiance on a horizontal plane, zero with the sun near the horizon"""
+    cos_zenith = np.cos(np.radians(zenith))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(np.asarray(zenith) < max_zenith, beam_horizontal / cos_zenith, 0.0)
+
+
+def plane_of_array(ghi, dni, dhi, zenith, azimuth, surface_tilt, surface_azimuth, times=None, albedo=0.2,
+                   model="perez"):
+    """
+    Total irradiance in W m-2 on each surface, an array of shape (surfaces, hours).
+
+    ghi, dni, dhi, zenith and azimuth are hourly arrays, surface_tilt (0 horizontal, 90 vertical) and
+    surface_azimuth (degrees clockwise from north) one value or one array entry per surface, so every surface
+    is computed in the same array pass. Beam and ground-reflected irradiance follow from the geometry and sky
+    diffuse from the Perez et al. (1990) model, which needs the times, or an isotropic sky with
+    model="isotropic".
+    """
+    ghi, dni, dhi = (np.asarray(values, dtype=float) for values in (ghi, dni, dhi))
+    zenith = np.radians(np.asarray(zenith, dtype=float))
+    tilt = np.radians(np.atleast_1d(np.asarray(surface_tilt, dtype=float)))[:, None]
+    orientation = np.radians(np.atleast_1d(np.asarray(surface_azimuth, dtype=float)))[:, None]
+
+    cos_aoi = (np.cos(zenith) * np.cos(tilt)
+               + np.sin(zenith) * np.sin(tilt) * np.cos(np.radians(azimuth) - orientation))
+    cos_aoi = np.clip(cos_aoi, 0, None)
+    sun_up = zenith < np.pi / 2
+
+    beam = np.where(sun_up, dni * cos_aoi, 0.0)
+    ground = ghi * albedo * (1 - np.cos(tilt)) / 2
+
+    if model == "isotropic":
+        sky = dhi * (1 + np.cos(tilt)) / 2
+    elif model == "perez":
+        if times is None:
+            raise ValueError("The Perez model needs the times of the irradiance values")
+        f1, f2 = _perez_brightening(dni, dhi, zenith, extraterrestrial_irradiance(times))
+        horizon_cos_zenith = np.maximum(np.cos(np.radians(85)), np.cos(zenith))
+        sky = dhi * ((1 - f1) * (1 + np.cos(tilt)) / 2 + f1 * cos_aoi / horizon_cos_zenith + f2 * np.sin(tilt))
+        sky = np.maximum(sky, 0)
+    else:
+        raise ValueError(f"Unknown diffuse model {model!r}, use 'perez' or 'isotropic'")
+
+    return beam + sky + ground
+
+
+def _perez_brightening(dni, dhi, zenith, dni_extra):
+    # Circumsolar (F1) and horizon (F2) brightening of each hour, zero (an isotropic sky) without the sun or
+    # diffuse light
+    valid = (dhi > 0) & (zenith < np.pi / 2)
+    zenith_degrees = np.degrees(zenith)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        kz3 = 1.041 * zenith ** 3
+        clearness = ((dhi + dni) / dhi + kz3) / (1 + kz3)
+        air_mass = 1 / (np.cos(zenith) + 0.50572 * (96.07995 - zenith_degrees) ** -1.6364)
+        brightness = dhi * air_mass / dni_extra
+
+    coefficients = PEREZ_COEFFICIENTS[np.digitize(np.where(valid, clearness, 1), PEREZ_CLEARNESS_BINS)]
+    brightness = np.where(valid, brightness, 0)
+    f1 = np.maximum(0, coefficients[:, 0] + coefficients[:, 1] * brightness + coefficients[:, 2] * zenith)
+    f2 = coefficients[:, 3] + coefficients[:, 4] * brightness + coefficients[:, 5] * zenith
+    return np.where(valid, f1, 0), np.where(valid, f2, 0)
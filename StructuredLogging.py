@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Every logger of the model is a child of this one, so configure_logging sets the level and sinks of all of them
+ROOT_LOGGER = "greenhouse"
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most burst records with the same message template every interval seconds.
+
+    The first record after a suppressed stretch carries the number of records that were dropped, the console
+    shows it after the message and the JSON-lines sink as a "suppressed" field.
+    """
+
+    def __init__(self, burst=10, interval=10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.windows = {}  # (logger, template) -> [window start, records let through, records suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self.windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+
+        record.suppressed = suppressed
+        return True
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Plain messages, as the print statements used to show them"""
+
+    def format(self, record):
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            message = f"{record.levelname}: {message}"
+        if getattr(record, 'suppressed', 0):
+            message += f" ({record.suppressed:,} similar messages suppressed)"
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, with the values passed as extra={'fields': {...}} as top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.process,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=None, json_path=None, rate_limit=None):
+    """
+    Set up the console and JSON-lines sinks of the model loggers, replacing any earlier configuration.
+
+    Defaults come from the environment: GREENHOUSE_LOG_LEVEL (INFO), GREENHOUSE_LOG_JSON (path of a JSON-lines
+    file, none by default) and GREENHOUSE_LOG_RATE_LIMIT ("count/seconds", 10/10 by default, 0 to turn it off).
+    Several processes may append to the same JSON-lines file.
+    """
+    level = level or os.environ.get("GREENHOUSE_LOG_LEVEL", "INFO")
+    json_path = json_path or os.environ.get("GREENHOUSE_LOG_JSON")
+    if rate_limit is None:
+        rate_limit = os.environ.get("GREENHOUSE_LOG_RATE_LIMIT", "10/10")
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(ConsoleFormatter("%(message)s"))
+    handlers = [console]
+    if json_path:
+        sink = logging.FileHandler(json_path, mode="a", encoding="utf-8")
+        sink.setFormatter(JsonLinesFormatter())
+        handlers.append(sink)
+
+    for handler in handlers:
+        if rate_limit not in ("0", 0):
+            burst, interval = str(rate_limit).split("/")
+            handler.addFilter(RateLimitFilter(int(burst), float(interval)))
+        logger.addHandler(handler)
+
+    return logger
+
+
+def get_logger(name):
+    """Logger for a model module, configured from the environment the first time one is requested"""
+    if not logging.getLogger(ROOT_LOGGER).handlers:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.rsplit('.', 1)[-1]}")
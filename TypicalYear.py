@@ -0,0 +1,137 @@
+import hashlib
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import dump, load
+
+# Finkelstein-Schafer weights of the daily statistics, after the Sandia/TMY2 method. The Met Eireann file has no
+# solar radiation, so its weight goes to the daily mean cloud amount
+FS_WEIGHTS = {
+    ("temp", "max"): 1 / 20,
+    ("temp", "min"): 1 / 20,
+    ("temp", "mean"): 2 / 20,
+    ("dewpt", "max"): 1 / 20,
+    ("dewpt", "min"): 1 / 20,
+    ("dewpt", "mean"): 2 / 20,
+    ("wdsp", "max"): 1 / 20,
+    ("wdsp", "mean"): 1 / 20,
+    ("clamt", "mean"): 10 / 20,
+}
+
+# Columns of the typical year, the months are spliced from their source years
+COLUMNS = ("temp", "dewpt", "wdsp", "rhum", "clamt")
+
+# Columns smoothed over SMOOTHING_HOURS either side of each month join, cloud amount is in whole oktas
+SMOOTHED_COLUMNS = ("temp", "dewpt", "wdsp", "rhum")
+SMOOTHING_HOURS = 6
+
+# A month of a year is only a candidate with at most this many days missing a statistic
+MAX_MISSING_DAYS = 3
+
+
+def _daily_statistics(history, years):
+    # (years, 365 days, statistics) array, 29 February dropped and missing hours NaN
+    hours = pd.date_range(pd.Timestamp(year=years[0], month=1, day=1),
+                          pd.Timestamp(year=years[-1], month=12, day=31, hour=23), freq="h")
+    hours = hours[~((hours.month == 2) & (hours.day == 29))]
+    columns = sorted({column for column, _ in FS_WEIGHTS})
+    hourly = history[columns].apply(pd.to_numeric, errors="coerce").reindex(hours).to_numpy(dtype=float)
+    hourly = hourly.reshape(len(years), 365, 24, len(columns))
+
+    reducers = {"max": np.nanmax, "min": np.nanmin, "mean": np.nanmean}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # days without any valid hour are NaN
+        return np.stack([reducers[statistic](hourly[..., columns.index(column)], axis=2)
+                         for column, statistic in FS_WEIGHTS], axis=-1)
+
+
+def finkelstein_schafer(daily, month_of_day):
+    """
+    Weighted Finkelstein-Schafer statistic of every candidate month, an array of shape (years, 12).
+
+    daily holds the daily statistics as (years, days, statistics) and month_of_day the month (1-12) of each day.
+    For every month and statistic the CDF of each year and the long-term CDF of all years are compared in one
+    array operation across the years, candidates with too many missing days are inf.
+    """
+    weights = np.array(list(FS_WEIGHTS.values()))
+    scores = np.empty((daily.shape[0], 12))
+    for month in range(1, 13):
+        block = daily[:, month_of_day == month, :]  # (years, days, statistics)
+        valid = ~np.isnan(block)
+        counts = valid.sum(axis=1)  # (years, statistics)
+        ranked = np.sort(block, axis=1)  # NaNs sort last
+
+        statistic = np.zeros(counts.shape)
+        for k in range(block.shape[2]):
+            long_term = np.sort(block[..., k][valid[..., k]])
+            long_term_cdf = np.searchsorted(long_term, ranked[..., k], side="right") / max(len(long_term), 1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                year_cdf = np.arange(1, block.shape[1] + 1) / counts[:, k, None]
+            difference = np.where(counts[:, k, None] > np.arange(block.shape[1]), np.abs(year_cdf - long_term_cdf), 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                statistic[:, k] = difference.sum(axis=1) / counts[:, k]
+
+        complete = (block.shape[1] - counts <= MAX_MISSING_DAYS).all(axis=1)
+        scores[:, month - 1] = np.where(complete, statistic @ weights, np.inf)
+    return scores
+
+
+def typical_year(history, year=2023):
+    """
+    Typical Meteorological Year built from an hourly climate history, with the month -> source year chosen.
+
+    Each calendar month is taken from the year whose daily statistics (FS_WEIGHTS) are closest to the long-term
+    distribution of that month by the weighted Finkelstein-Schafer statistic. The hours are laid out on the
+    calendar of year, so the result lines up with radiation data of that year, and the continuous columns are
+    interpolated across SMOOTHING_HOURS either side of each month join.
+    """
+    if pd.Timestamp(year=year, month=1, day=1).is_leap_year:
+        raise ValueError(f"The typical year is laid out on 365 days, {year} is a leap year")
+
+    years = np.arange(history.index[0].year, history.index[-1].year + 1)
+    month_of_day = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D").month.to_numpy()
+    scores = finkelstein_schafer(_daily_statistics(history, years), month_of_day)
+    if np.isinf(scores.min(axis=0)).any():
+        missing = [month + 1 for month in np.flatnonzero(np.isinf(scores.min(axis=0)))]
+        raise ValueError(f"No complete year in the climate history for months {missing}")
+    months = {month + 1: int(years[best]) for month, best in enumerate(scores.argmin(axis=0))}
+
+    index = pd.date_range(f"{year}-01-01", f"{year}-12-31 23:00", freq="h")
+    numeric = history[list(COLUMNS)].apply(pd.to_numeric, errors="coerce")
+    parts = []
+    for month, source_year in months.items():
+        hours = index[index.month == month]
+        source = pd.to_datetime(pd.DataFrame({"year": source_year, "month": hours.month, "day": hours.day,
+                                              "hour": hours.hour}))
+        parts.append(numeric.reindex(source).to_numpy())
+    climate = pd.DataFrame(np.concatenate(parts), index=index, columns=list(COLUMNS))
+
+    joins = np.flatnonzero(np.diff(index.month)) + 1
+    window = (np.abs(np.arange(len(index))[:, None] - joins[None, :]) < SMOOTHING_HOURS).any(axis=1)
+    smoothed = climate[list(SMOOTHED_COLUMNS)].copy()
+    smoothed[window] = np.nan
+    climate.loc[window, list(SMOOTHED_COLUMNS)] = smoothed.interpolate(limit_area="inside")[window]
+    return climate, months
+
+
+def load_or_build(source, read_history, year=2023, cache_path="typical_year.joblib"):
+    """
+    Typical year of the climate file at source, read from cache_path while the file is unchanged.
+
+    read_history is only called, and the history only read, when the cache is missing or stale. The cache is
+    keyed by the file's path, size and modification time, the layout year and the weights.
+    """
+    stat = os.stat(source)
+    key = hashlib.sha256(repr((os.path.abspath(source), stat.st_size, stat.st_mtime_ns, year,
+                               sorted(FS_WEIGHTS.items()), SMOOTHING_HOURS, MAX_MISSING_DAYS)).encode()).hexdigest()
+
+    if os.path.exists(cache_path):
+        cached = load(cache_path)
+        if cached.get("key") == key:
+            return cached["climate"], cached["months"]
+
+    climate, months = typical_year(read_history(), year)
+    dump({"key": key, "climate": climate, "months": months}, cache_path)
+    return climate, months
@@ -5,17 +5,20 @@ from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import numpy as np
+from functools import lru_cache
 
 from . import ids
+from . import demand_data, settings
 import Lib.Cost
 import Lib.EnergyDemand
+from Lib.Instrumentation import instrument
 
 
 def load_optimization_data():
     """Load optimization results data"""
     try:
-        # Use the correct file path
-        file_path = r"C:\Users\phoen\OneDrive - National University of Ireland, Galway\Masters\Thesis\Python Framework\Lib\optimization_results.json"
+        # Configurable path, see settings.py
+        file_path = settings.OPTIMIZATION_RESULTS_PATH
         print(f"Attempting to load optimization data from: {file_path}")
 
         with open(file_path, 'r') as f:
@@ -35,31 +38,10 @@ def load_optimization_data():
 
 
 def get_demand_data():
-    """Generate demand data directly by running the calculation functions"""
+    """Demand data shared with the demand charts, memory-mapped rather than read from JSON on every callback"""
     try:
-        import sys
-        import os
-        # Add the Lib directory to the path so we can import modules
-        lib_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        if lib_dir not in sys.path:
-            sys.path.append(lib_dir)
-
-        # Import the demand calculation functions
-        from Lib.InputCalculations import calculate_inputs
-        from Lib.HTCoefficients import calculate_htc
-        from Lib.HeatDemand import calculate_heatdemand
-        from Lib.LightDemand import calculate_lightdemand
-        from Lib.CO2Demand import calculate_co2demand
-
-        # Calculate demand data directly
-        # inputs_data = calculate_inputs()
-        # htc = calculate_htc(inputs_data)
-        # heat_demand = calculate_heatdemand(inputs_data, htc)
-        # light_demand = calculate_lightdemand(inputs_data, htc, heat_demand)
-        # co2_demand = calculate_co2demand(inputs_data, htc, heat_demand, light_demand)
-        heat_demand = pd.read_json("heat_demand.json")
-        light_demand = pd.read_json("light_demand.json")
-        co2_demand = pd.read_json("co2_demand.json")
+        demand = demand_data.get_demand()
+        heat_demand, light_demand, co2_demand = demand["heat"], demand["light"], demand["co2"]
 
         return heat_demand, light_demand, co2_demand
     except Exception as e:
@@ -131,6 +113,69 @@ def get_max_powers():
         }
 
 
+# EnergyDemand model of each slider technology and whether its calculate_supply needs the max supply DataFrame
+SUPPLY_MODELS = {
+    'CHP': (Lib.EnergyDemand.CHP, True),
+    'Geothermal': (Lib.EnergyDemand.Geothermal, False),
+    'GSHP': (Lib.EnergyDemand.GSHP, False),
+    'Solar': (Lib.EnergyDemand.SolarPV, False),
+    'WasteHeat': (Lib.EnergyDemand.WasteHeat, False),
+    'Grid': (Lib.EnergyDemand.Grid, False),
+    'Boiler': (Lib.EnergyDemand.Boiler, True),
+    'CO2': (Lib.EnergyDemand.CO2Import, False),
+}
+
+
+@lru_cache(maxsize=None)
+def get_cost_coefficients():
+    """
+    Coefficients for calculating the total cost and net emissions in the browser.
+
+    For capacities above zero every yearly supply total used by the cost model is at most quadratic in the
+    capacity P (CO2 import's related emissions are quadratic, net emissions are offset by the CO2 absorbed),
+    so each total is stored as [q0, q1, q2] with q(P) = q0 + q1 * P + q2 * P ** 2, fitted from three capacities.
+    """
+    heat_demand, light_demand, co2_demand = get_demand_data()
+
+    technologies = []
+    for source, (model_class, needs_max_supply) in SUPPLY_MODELS.items():
+        costs = Lib.Cost.TECHNOLOGY_COSTS[source]
+        model = model_class(heat_demand, light_demand, co2_demand)
+        max_supply, max_power = model.calculate_max_supply()
+        max_power = float(max_power)
+
+        totals = {'output': [], 'fuel': [], 'direct_emissions': [], 'net_emissions': []}
+        powers = max_power * np.array([1 / 3, 2 / 3, 1])
+        for power in powers:
+            if needs_max_supply:
+                supply = model.calculate_supply(power, max_power, max_supply)
+            else:
+                supply = model.calculate_supply(power, max_power)
+            totals['output'].append(supply[costs['output']].sum())
+            totals['fuel'].append(supply[costs['fuel']].sum() if costs['fuel'] else 0)
+            totals['direct_emissions'].append(supply["Direct CO2 Emissions"].sum())
+            totals['net_emissions'].append(supply["Net CO2 Emissions"].sum())
+
+        if max_power > 0:
+            fitted = {name: np.linalg.solve(np.vander(powers, 3, increasing=True), values).tolist()
+                      for name, values in totals.items()}
+        else:
+            fitted = {name: [0, 0, 0] for name in totals}
+
+        technologies.append({
+            'name': source,
+            'capital': list(costs['capital']),
+            'crf': Lib.Cost.capital_recovery_factor(costs['lifetime']),
+            'opex_per_mw': costs['opex_per_mw'],
+            'opex_per_mwh': costs['opex_per_mwh'],
+            'fuel_cost': costs['fuel_cost'],
+            'co2_tax': Lib.Cost.CO2_TAX,
+            **fitted,
+        })
+
+    return {'technologies': technologies}
+
+
 def render(app: Dash) -> html.Div:
     """Create the capacity sliders component"""
     # Load optimization data
@@ -178,6 +223,7 @@ def render(app: Dash) -> html.Div:
                     max=max_value,
                     step=step,
                     value=current_value,
+                    drag_value=current_value,  # Updated while dragging, drives the clientside totals
                     marks={
                         0: {'label': '0'},
                         max_value / 2: {'label': f'{max_value / 2:.2f}'},
@@ -200,6 +246,9 @@ def render(app: Dash) -> html.Div:
         html.H3("Cost Breakdown", style={"marginTop": "20px"}),
         html.Div(id="total-cost-display",
                  style={"fontSize": "1.5rem", "fontWeight": "bold", "marginBottom": "10px"}),
+        html.Div(id=ids.TOTAL_EMISSIONS_DISPLAY, style={"fontSize": "1.1rem", "marginBottom": "10px"}),
+        # Cost coefficients for the clientside totals, sent once per page load
+        dcc.Store(id=ids.COST_COEFFICIENTS_STORE),
         html.Div(id="cost-breakdown-table"),
         dcc.Graph(id="updated-cost-chart"),
 
@@ -251,13 +300,62 @@ def register_callbacks(app: Dash):
     ]
 
     @app.callback(
+        Output(ids.COST_COEFFICIENTS_STORE, "data"),
+        Input(ids.PAGE_LOCATION, "pathname"),
+    )
+    @instrument()
+    def load_cost_coefficients(_):
+        # Calculated on the first page load rather than when the layout is built, then cached per process
+        return get_cost_coefficients()
+
+    # Total cost and net emissions are recalculated in the browser while a slider is dragged, the server only
+    # builds the full breakdown once the slider is released
+    app.clientside_callback(
+        """
+        function(coefficients, ...capacities) {
+            if (!coefficients) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            let totalCost = 0;
+            let totalEmissions = 0;
+            coefficients.technologies.forEach(function(tech, i) {
+                const power = capacities[i] || 0;
+                if (power <= 0.0001) {
+                    return;
+                }
+                const total = function(q) { return q[0] + q[1] * power + q[2] * power * power; };
+                const capitalCost = tech.capital[0] * Math.pow(power, tech.capital[1]) + tech.capital[2];
+                const capex = power * capitalCost * tech.crf;
+                const opex = tech.opex_per_mw * power + tech.opex_per_mwh * total(tech.output);
+                const fuel = tech.fuel_cost * total(tech.fuel);
+                const co2Tax = tech.co2_tax * total(tech.direct_emissions);
+                totalCost += capex + opex + fuel + co2Tax;
+                totalEmissions += total(tech.net_emissions);
+            });
+            const format = function(value, digits) {
+                return value.toLocaleString('en-GB', {minimumFractionDigits: digits, maximumFractionDigits: digits});
+            };
+            return [
+                "Total Annual Cost: €" + format(totalCost, 2),
+                "Net CO2 Emissions: " + format(totalEmissions, 0) + " kg/year"
+            ];
+        }
+        """,
         [Output("total-cost-display", "children"),
-         Output("cost-breakdown-table", "children"),
+         Output(ids.TOTAL_EMISSIONS_DISPLAY, "children")],
+        Input(ids.COST_COEFFICIENTS_STORE, "data"),
+        [Input(f"slider-{source.lower()}", "drag_value")
+         for source in ['chp', 'geothermal', 'gshp', 'solar', 'wasteheat', 'grid', 'boiler', 'co2']],
+    )
+
+    @app.callback(
+        [Output("cost-breakdown-table", "children"),
          Output("updated-cost-chart", "figure"),
          Output(ids.EMISSIONS_COMPARISON_CHART, "figure"),
          Output(ids.DEMAND_WARNINGS_CONTAINER, "children")],  # Added output for demand warnings
         slider_inputs
     )
+    @instrument()
     def update_cost_display(chp, geothermal, gshp, solar, wasteheat, grid, boiler, co2):
         """Calculate new costs and emissions based on slider values"""
         try:
@@ -279,273 +377,31 @@ def register_callbacks(app: Dash):
                 'net_emissions': []
             }
 
-            # Calculate CHP cost if capacity > 0
-            if chp > 0.0001:
-                chp_demand, chp_max_power = Lib.EnergyDemand.CHP(heat_demand, light_demand,
-                                                                 co2_demand).calculate_max_supply()
-                # Fixed code:
-                chp_instance = Lib.EnergyDemand.CHP(heat_demand, light_demand, co2_demand)
-                chp_supply = chp_instance.calculate_supply(chp, chp_max_power, chp_demand)
-                chp_obj = Lib.Cost.CHP(
-                    capital_cost=1.2e6 * chp ** -0.4,
-                    base_capex=0,
-                    operational_cost=9.3,
-                    fuel_cost=90.1,
-                    power=chp,
-                    energy_output=chp_supply["Yearly Electricity Output"].sum(),
-                    fuel_requirement=chp_supply["Fuel Requirement"].sum(),
-                    cc_power=0.16,
-                    lifetime=25,
-                    loan_term=20,
-                    co2_emissions=chp_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = chp_obj.constant_cost()
-                cost_components['CHP'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                          'fuel': cost_df.loc[0, 'Fuel'], 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                          'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add CHP emissions data
-                emissions_data['source'].append('CHP')
-                emissions_data['direct_emissions'].append(chp_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(chp_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(chp_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['CHP'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate Geothermal cost if capacity > 0
-            if geothermal > 0.0001:
-                geo_demand, geo_max_power = Lib.EnergyDemand.Geothermal(heat_demand, light_demand,
-                                                                        co2_demand).calculate_max_supply()
-                geo_instance = Lib.EnergyDemand.Geothermal(heat_demand, light_demand, co2_demand)
-                geo_supply = geo_instance.calculate_supply(geothermal, geo_max_power)
-                geo_obj = Lib.Cost.Geothermal(
-                    capital_cost=2890000 * geothermal ** -0.45 + 1.2e6,
-                    base_capex=0,
-                    operational_cost=11000 * geothermal /
-                                     geo_supply["Yearly Heat Output"].sum(),
-                    fuel_cost=228.1,
-                    power=geothermal,
-                    energy_output=geo_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=geo_supply["Electricity for Heat"].sum(),
-                    cc_power=0,
-                    lifetime=30,
-                    loan_term=20,
-                    co2_emissions=geo_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = geo_obj.constant_cost()
-                cost_components['Geothermal'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                                 'fuel': cost_df.loc[0, 'Fuel'],
-                                                 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                                 'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add Geothermal emissions data
-                emissions_data['source'].append('Geothermal')
-                emissions_data['direct_emissions'].append(geo_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(geo_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(geo_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['Geothermal'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate GSHP cost if capacity > 0
-            if gshp > 0.0001:
-                gshp_demand, gshp_max_power = Lib.EnergyDemand.GSHP(heat_demand, light_demand,
-                                                                    co2_demand).calculate_max_supply()
-                gshp_instance = Lib.EnergyDemand.GSHP(heat_demand, light_demand, co2_demand)
-                gshp_supply = gshp_instance.calculate_supply(gshp, gshp_max_power)
-                gshp_obj = Lib.Cost.GSHP(
-                    capital_cost=1297000 * gshp ** -0.21557,
-                    base_capex=0,
-                    operational_cost=8000 * gshp / gshp_supply["Yearly Heat Output"].sum(),
-                    fuel_cost=228.1,
-                    power=gshp,
-                    energy_output=gshp_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=gshp_supply["Electricity for Heat"].sum(),
-                    cc_power=0,
-                    lifetime=25,
-                    loan_term=20,
-                    co2_emissions=gshp_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = gshp_obj.constant_cost()
-                cost_components['GSHP'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                           'fuel': cost_df.loc[0, 'Fuel'], 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                           'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add GSHP emissions data
-                emissions_data['source'].append('GSHP')
-                emissions_data['direct_emissions'].append(gshp_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(gshp_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(gshp_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['GSHP'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate Solar cost if capacity > 0
-            if solar > 0.0001:
-                solar_demand, solar_max_power = Lib.EnergyDemand.SolarPV(heat_demand, light_demand,
-                                                                         co2_demand).calculate_max_supply()
-                solar_instance = Lib.EnergyDemand.SolarPV(heat_demand, light_demand, co2_demand)
-                solar_supply = solar_instance.calculate_supply(solar, solar_max_power)
-                solar_obj = Lib.Cost.SolarPV(
-                    capital_cost=1.572e6 * solar ** -0.15 - 1.5e5,
-                    base_capex=0,
-                    operational_cost=12000 * solar / solar_supply["Yearly Electricity Output"].sum(),
-                    fuel_cost=0,
-                    power=solar,
-                    energy_output=solar_supply["Yearly Electricity Output"].sum(),
-                    fuel_requirement=0,
-                    cc_power=0,
-                    lifetime=30,
-                    loan_term=20,
-                    co2_emissions=solar_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = solar_obj.constant_cost()
-                cost_components['Solar'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                            'fuel': cost_df.loc[0, 'Fuel'], 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                            'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add Solar emissions data
-                emissions_data['source'].append('Solar')
-                emissions_data['direct_emissions'].append(solar_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(solar_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(solar_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['Solar'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate WasteHeat cost if capacity > 0
-            if wasteheat > 0.0001:
-                waste_demand, waste_max_power = Lib.EnergyDemand.WasteHeat(heat_demand, light_demand,
-                                                                           co2_demand).calculate_max_supply()
-                wasteheat_instance = Lib.EnergyDemand.WasteHeat(heat_demand, light_demand, co2_demand)
-                wasteheat_supply = wasteheat_instance.calculate_supply(wasteheat, waste_max_power)
-                waste_obj = Lib.Cost.WasteHeat(
-                    capital_cost=0,
-                    base_capex=0,
-                    operational_cost=0,
-                    fuel_cost=90.1*0.9,
-                    power=wasteheat,
-                    energy_output=wasteheat_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=wasteheat_supply["Steam Required"].sum(),
-                    cc_power=0,
-                    lifetime=50,
-                    loan_term=20,
-                    co2_emissions=wasteheat_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = waste_obj.constant_cost()
-                cost_components['WasteHeat'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                                'fuel': cost_df.loc[0, 'Fuel'],
-                                                'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                                'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add WasteHeat emissions data
-                emissions_data['source'].append('WasteHeat')
-                emissions_data['direct_emissions'].append(wasteheat_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(wasteheat_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(wasteheat_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['WasteHeat'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate Grid cost if capacity > 0
-            if grid > 0.0001:
-                grid_demand, grid_max_power = Lib.EnergyDemand.Grid(heat_demand, light_demand,
-                                                                    co2_demand).calculate_max_supply()
-                grid_instance = Lib.EnergyDemand.Grid(heat_demand, light_demand, co2_demand)
-                grid_supply = grid_instance.calculate_supply(grid, grid_max_power)
-                grid_obj = Lib.Cost.Grid(
-                    capital_cost=0,
-                    base_capex=0,
-                    operational_cost=0,
-                    fuel_cost=228.1,
-                    power=grid,
-                    energy_output=grid_supply["Yearly Electricity Output"].sum(),
-                    fuel_requirement=grid_supply["Electricity for Light"].sum(),
-                    cc_power=0,
-                    lifetime=50,
-                    loan_term=20,
-                    co2_emissions=grid_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = grid_obj.constant_cost()
-                cost_components['Grid'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                           'fuel': cost_df.loc[0, 'Fuel'], 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                           'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add Grid emissions data
-                emissions_data['source'].append('Grid')
-                emissions_data['direct_emissions'].append(grid_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(grid_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(grid_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['Grid'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate Boiler cost if capacity > 0
-            if boiler > 0.0001:
-                boiler_demand, boiler_max_power = Lib.EnergyDemand.Boiler(heat_demand, light_demand,
-                                                                          co2_demand).calculate_max_supply()
-                boiler_instance = Lib.EnergyDemand.Boiler(heat_demand, light_demand, co2_demand)
-                boiler_supply = boiler_instance.calculate_supply(boiler, boiler_max_power, boiler_demand)
-                boiler_obj = Lib.Cost.Boiler(
-                    capital_cost=103000 * boiler ** -0.17,
-                    base_capex=0,
-                    operational_cost=3900 * boiler / boiler_supply["Yearly Heat Output"].sum(),
-                    fuel_cost=90.1,
-                    power=boiler,
-                    energy_output=boiler_supply["Yearly Heat Output"].sum(),
-                    fuel_requirement=boiler_supply["Fuel Requirement"].sum(),
-                    cc_power=0.16,
-                    lifetime=25,
-                    loan_term=20,
-                    co2_emissions=boiler_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = boiler_obj.constant_cost()
-                cost_components['Boiler'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                             'fuel': cost_df.loc[0, 'Fuel'], 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                             'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add Boiler emissions data
-                emissions_data['source'].append('Boiler')
-                emissions_data['direct_emissions'].append(boiler_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(boiler_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(boiler_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['Boiler'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
-
-            # Calculate CO2 Import cost if capacity > 0
-            if co2 > 0.0001:
-                co2_import_demand, co2_max_power = Lib.EnergyDemand.CO2Import(heat_demand, light_demand,
-                                                                              co2_demand).calculate_max_supply()
-                co2_instance = Lib.EnergyDemand.CO2Import(heat_demand, light_demand, co2_demand)
-                co2_supply = co2_instance.calculate_supply(co2, co2_max_power)
-                co2_obj = Lib.Cost.CO2Import(
-                    capital_cost=0,
-                    base_capex=0,
-                    operational_cost=0,
-                    fuel_cost=0.14678,
-                    power=co2,
-                    energy_output=co2_supply["CO2 Requirement"].sum(),
-                    fuel_requirement=co2_supply["CO2 Requirement"].sum(),
-                    cc_power=0,
-                    lifetime=50,
-                    loan_term=20,
-                    co2_emissions=co2_supply["Direct CO2 Emissions"].sum()
-                )
-                capex, opex, fuel, co2_tax, cost, cost_df, _ = co2_obj.constant_cost()
-                cost_components['CO2'] = {'capex': cost_df.loc[0, 'CAPEX'], 'opex': cost_df.loc[0, 'OPEX'],
-                                          'fuel': cost_df.loc[0, 'Fuel'], 'co2_tax': cost_df.loc[0, 'CO2 Tax'],
-                                          'total': cost_df.loc[0, 'Total Cost']}
-                total_cost += cost_df.loc[0, 'Total Cost']
-
-                # Add CO2 Import emissions data
-                emissions_data['source'].append('CO2')
-                emissions_data['direct_emissions'].append(co2_supply["Direct CO2 Emissions"].sum())
-                emissions_data['related_emissions'].append(co2_supply["Related CO2 Emissions"].sum())
-                emissions_data['net_emissions'].append(co2_supply["Net CO2 Emissions"].sum())
-            else:
-                cost_components['CO2'] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
+            # Cost and emissions of each technology, with the cost parameters of the optimiser
+            capacities = dict(zip(SUPPLY_MODELS, (chp, geothermal, gshp, solar, wasteheat, grid, boiler, co2)))
+            for source, (model_class, needs_max_supply) in SUPPLY_MODELS.items():
+                power = capacities[source]
+                if power <= 0.0001:
+                    cost_components[source] = {'capex': 0, 'opex': 0, 'fuel': 0, 'co2_tax': 0, 'total': 0}
+                    continue
+
+                model = model_class(heat_demand, light_demand, co2_demand)
+                max_supply, max_power = model.calculate_max_supply()
+                if needs_max_supply:
+                    supply = model.calculate_supply(power, max_power, max_supply)
+                else:
+                    supply = model.calculate_supply(power, max_power)
+
+                capex, opex, fuel, co2_tax, cost, _, _ = Lib.Cost.source_cost(source, power, supply).constant_cost()
+                cost_components[source] = {'capex': capex, 'opex': opex,
+                                           'fuel': fuel, 'co2_tax': co2_tax,
+                                           'total': cost}
+                total_cost += cost
+
+                emissions_data['source'].append(source)
+                emissions_data['direct_emissions'].append(supply["Direct CO2 Emissions"].sum())
+                emissions_data['related_emissions'].append(supply["Related CO2 Emissions"].sum())
+                emissions_data['net_emissions'].append(supply["Net CO2 Emissions"].sum())
 
             # Calculate supplies and demand shortfalls
             # Similar to the calculation in the optimize_dual_annealing.py file
@@ -664,9 +520,6 @@ def register_callbacks(app: Dash):
             }
             print("Demand Summary:", demand_summary)
 
-            # Create total cost display
-            total_cost_display = f"Total Annual Cost: €{total_cost:,.2f}"
-
             # Create cost breakdown table
             # Only show sources with non-zero costs
             active_sources = [s for s in cost_components if cost_components[s]['total'] > 0]
@@ -850,22 +703,25 @@ def register_callbacks(app: Dash):
                     height=500
                 )
 
-            return total_cost_display, table, cost_fig, emissions_fig, warnings
+            return table, cost_fig, emissions_fig, warnings
 
         except Exception as e:
             # Return error message if calculation fails
             error_message = f"Error calculating costs and emissions: {str(e)}"
-            return error_message, html.Div(), {}, {}
+            return html.Div(error_message), {}, {}, []
 
-    # Callback for reset button
+    # Callback for reset button and finished background optimisations,
+    # drag_value is reset too so the clientside totals follow
     @app.callback(
-        [Output(f"slider-{source.lower()}", "value") for source in
+        [Output(f"slider-{source.lower()}", prop) for prop in ["value", "drag_value"] for source in
          ['chp', 'geothermal', 'gshp', 'solar', 'wasteheat', 'grid', 'boiler', 'co2']],
         Input("reset-sliders-button", "n_clicks"),
+        Input(ids.OPTIMISATION_RESULTS_VERSION, "data"),
         prevent_initial_call=True
     )
-    def reset_sliders(n_clicks):
-        """Reset sliders to optimal values"""
+    @instrument()
+    def reset_sliders(n_clicks, results_version):
+        """Reset sliders to optimal values, read again from the results file"""
         opt_data = load_optimization_data()
         capacities = opt_data['capacities']
 
@@ -874,4 +730,4 @@ def register_callbacks(app: Dash):
         for source in ['CHP', 'Geothermal', 'GSHP', 'Solar', 'WasteHeat', 'Grid', 'Boiler', 'CO2']:
             values.append(capacities.get(source, 0))
 
-        return values
+        return values + values
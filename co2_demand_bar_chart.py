@@ -3,29 +3,20 @@ from dash import Dash, dcc, html
 from dash.dependencies import Input, Output
 import pandas as pd
 from . import ids
-
-# Import calculation functions
-import sys
-sys.path.append(r"C:\Users\phoen\OneDrive - National University of Ireland, Galway\Masters\Thesis\Python Framework")
-from Lib.InputCalculations import calculate_inputs
-from Lib.HTCoefficients import calculate_htc
-from Lib.HeatDemand import calculate_heatdemand
-from Lib.LightDemand import calculate_lightdemand
-from Lib.CO2Demand import calculate_co2demand
+from . import demand_data
+from Lib.DemandRollups import summarise_rollups
+from Lib.Instrumentation import instrument
 
 def render(app: Dash) -> html.Div:
     @app.callback(
         Output(ids.CO2_DEMAND_BAR_CHART, "children"),
         Input(ids.PAGE_LOCATION, "pathname"),
     )
+    @instrument()
     def update_co2_demand_chart(_) -> html.Div:
         try:
-            # Calculate all necessary data within the callback
-            inputs_data = calculate_inputs()
-            htc = calculate_htc(inputs_data)
-            heat_demand = calculate_heatdemand(inputs_data, htc)
-            light_demand = calculate_lightdemand(inputs_data, htc, heat_demand)
-            co2_demand = calculate_co2demand(inputs_data, htc, heat_demand, light_demand)
+            # Shared demand data, calculated once in the background when the server starts
+            co2_demand = demand_data.get_demand()["co2"]
 
             # Check if data exists
             if co2_demand.empty:
@@ -39,21 +30,13 @@ def render(app: Dash) -> html.Div:
             if co2_demand["Total CO2 Demand"].isna().any():
                 return html.Div("CO2 demand data contains NaN values.", id=ids.CO2_DEMAND_BAR_CHART)
 
-            # Make a clean copy with proper datetime index
-            co2_demand_processed = co2_demand.copy()
-            co2_demand_processed.index = pd.to_datetime(co2_demand_processed.index)
-
-            # Create month and sort columns with proper error checking
-            co2_demand_processed['Month'] = co2_demand_processed.index.strftime('%b %Y')
-            co2_demand_processed['SortKey'] = co2_demand_processed.index.map(lambda x: x.year * 100 + x.month)
-
-            # Group data safely
-            daily_avg_by_month = co2_demand_processed.groupby(['Month', 'SortKey'], as_index=False).agg(
-                AvgDailyCO2Demand=('Total CO2 Demand', lambda x: x.sum() / (len(x) / 24) if len(x) > 0 else 0)
-            )
-
-            # Sort chronologically
-            daily_avg_by_month = daily_avg_by_month.sort_values('SortKey')
+            # Monthly aggregates precomputed with the demand data
+            monthly = demand_data.get_demand()["rollups"]["co2"]["monthly"]["Total CO2 Demand"]
+            summary = summarise_rollups(monthly)
+            daily_avg_by_month = pd.DataFrame({
+                'Month': monthly.index.strftime('%b %Y'),
+                'AvgDailyCO2Demand': monthly['sum'] / (monthly['hours'] / 24),  # Average daily total in each month
+            })
 
             # Create figure using Graph Objects
             fig = go.Figure()
@@ -98,22 +81,22 @@ def render(app: Dash) -> html.Div:
                         html.Tbody([
                             html.Tr([
                                 html.Td("Average Daily Demand", style={"padding": "8px"}),
-                                html.Td(f"{co2_demand['Total CO2 Demand'].sum() / (len(co2_demand) / 24):.2f} kg/day",
+                                html.Td(f"{summary['daily_mean']:.2f} kg/day",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Maximum Hourly Demand", style={"padding": "8px"}),
-                                html.Td(f"{co2_demand['Total CO2 Demand'].max():.2f} kg",
+                                html.Td(f"{summary['peak']:.2f} kg",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Minimum Hourly Demand", style={"padding": "8px"}),
-                                html.Td(f"{co2_demand['Total CO2 Demand'].min():.2f} kg",
+                                html.Td(f"{summary['min']:.2f} kg",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Total Annual Demand", style={"padding": "8px"}),
-                                html.Td(f"{co2_demand['Total CO2 Demand'].sum():.2f} kg",
+                                html.Td(f"{summary['sum']:.2f} kg",
                                         style={"textAlign": "right", "padding": "8px"})
                             ])
                         ])
@@ -4,10 +4,12 @@ from dash.dependencies import Input, Output
 import json
 import pandas as pd
 from . import ids
+from . import settings
+from Lib.Instrumentation import instrument
 
 
 def load_optimization_data():
-    json_path = r"C:\Users\phoen\OneDrive - National University of Ireland, Galway\Masters\Thesis\Python Framework\Lib\optimization_results.json"
+    json_path = settings.OPTIMIZATION_RESULTS_PATH
     with open(json_path, "r") as f:
         return json.load(f)
 
@@ -20,6 +22,7 @@ def render(app: Dash) -> html.Div:
         Output(ids.COSTS_BAR_CHART, "children"),
         [Input(ids.ENERGY_DROPDOWN, "value")],
     )
+    @instrument()
     def update_bar_chart(selected_sources: list[str]) -> html.Div:
         if not selected_sources or len(selected_sources) == 0:
             return html.Div("Please select energy sources to display.", id=ids.COSTS_BAR_CHART)
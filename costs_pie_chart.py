@@ -4,11 +4,13 @@ from dash.dependencies import Input, Output
 import json
 import pandas as pd
 from . import ids
+from . import settings
+from Lib.Instrumentation import instrument
 
 
 # Load the optimization results data
 def load_optimization_data():
-    json_path = r"C:\Users\phoen\OneDrive - National University of Ireland, Galway\Masters\Thesis\Python Framework\Lib\optimization_results.json"
+    json_path = settings.OPTIMIZATION_RESULTS_PATH
     with open(json_path, "r") as f:
         return json.load(f)
 
@@ -24,6 +26,7 @@ def render(app: Dash) -> html.Div:
             Input(ids.ENERGY_DROPDOWN, "value"),
         ],
     )
+    @instrument()
     def update_pie_chart(selected_sources: list[str]) -> html.Div:
         if not selected_sources or len(selected_sources) == 0:
             return html.Div("Please select energy sources to display.", id=ids.COSTS_PIE_CHART)
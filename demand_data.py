@@ -0,0 +1,74 @@
+import os
+import threading
+
+from . import settings
+
+# Import calculation functions
+import sys
+sys.path.append(settings.PROJECT_DIR)
+# The model modules import each other without the Lib prefix
+sys.path.append(os.path.join(settings.PROJECT_DIR, "Lib"))
+from Lib.InputCalculations import calculate_inputs, inputs_fingerprint
+from Lib.HTCoefficients import calculate_htc
+from Lib.HeatDemand import calculate_heatdemand
+from Lib.LightDemand import calculate_lightdemand
+from Lib.CO2Demand import calculate_co2demand
+from Lib.DemandRollups import calculate_rollups
+from Lib.DemandStore import save_demand, load_demand, load_rollups, demand_is_saved, store_lock
+
+# Demand data shared by all the chart components, calculated once on first use
+_demand = None
+_lock = threading.Lock()
+
+
+def get_demand() -> dict:
+    """
+    Return the heat, light and CO2 demand, running the calculation pipeline the first time only.
+
+    The results and their rollups are saved to settings.DEMAND_STORE_DIR and memory-mapped from there, so
+    every server process (and every restart) after the first shares one read-only copy instead of
+    recalculating.
+    The store is rebuilt when the CSV inputs or the settings in DEMAND_SETTINGS change, by one process
+    at a time while the others wait for it.
+    """
+    global _demand
+    if _demand is None:
+        with _lock:
+            # Another thread may have finished the calculation while we were waiting
+            if _demand is None:
+                fingerprint = inputs_fingerprint()
+                if not demand_is_saved(settings.DEMAND_STORE_DIR, fingerprint):
+                    with store_lock(settings.DEMAND_STORE_DIR):
+                        # Another process may have saved the demand while we were waiting for the lock
+                        if not demand_is_saved(settings.DEMAND_STORE_DIR, fingerprint):
+                            print("Calculating demand data...")
+                            inputs_data = calculate_inputs()
+                            htc = calculate_htc(inputs_data)
+                            heat_demand = calculate_heatdemand(inputs_data, htc)
+                            light_demand = calculate_lightdemand(inputs_data, htc, heat_demand)
+                            co2_demand = calculate_co2demand(inputs_data, htc, heat_demand, light_demand)
+                            demand = {"heat": heat_demand, "light": light_demand, "co2": co2_demand}
+                            # Daily, weekly and monthly aggregates for the demand charts, saved with the demand
+                            rollups = {name: calculate_rollups(df) for name, df in demand.items()}
+                            save_demand(demand, settings.DEMAND_STORE_DIR, fingerprint, rollups)
+
+                demand = load_demand(settings.DEMAND_STORE_DIR)
+                _demand = {
+                    "heat": demand["heat"],
+                    "light": demand["light"],
+                    "co2": demand["co2"],
+                    "rollups": load_rollups(settings.DEMAND_STORE_DIR),
+                }
+                print("Demand data ready")
+    return _demand
+
+
+def is_ready() -> bool:
+    return _demand is not None
+
+
+def load_in_background() -> threading.Thread:
+    """Start calculating the demand data on a daemon thread so the server can start listening straight away"""
+    thread = threading.Thread(target=get_demand, name="demand-data", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,83 @@
+import pandas as pd
+import plotly.graph_objects as go
+from dash import Dash, dcc, html
+from dash.dependencies import Input, Output
+from . import ids
+from . import demand_data
+from Lib.Downsampling import downsample
+from Lib.Instrumentation import instrument
+
+# Demand series that can be explored: (demand key, column, axis title, colour)
+SERIES = {
+    "Heat": ("heat", "QnetMWh", "Heat Demand (MWh)", '#FF5733'),
+    "Light": ("light", "MWh", "Lighting Demand (MWh)", '#4169E1'),
+    "CO2": ("co2", "Total CO2 Demand", "CO2 Demand (kg)", '#2E8B57'),
+}
+
+# Roughly one point per horizontal pixel of the graph
+MAX_POINTS = 1500
+
+
+def get_visible_range(relayout_data):
+    """Start and end of the zoomed x axis from the graph's relayoutData, or None for the full series"""
+    if not relayout_data or relayout_data.get("xaxis.autorange"):
+        return None
+    if "xaxis.range[0]" in relayout_data:
+        return relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    if "xaxis.range" in relayout_data:
+        return tuple(relayout_data["xaxis.range"])
+    return None
+
+
+def render(app: Dash) -> html.Div:
+    @app.callback(
+        Output(ids.DEMAND_TIME_SERIES_GRAPH, "figure"),
+        Input(ids.DEMAND_TIME_SERIES_DROPDOWN, "value"),
+        Input(ids.DEMAND_TIME_SERIES_GRAPH, "relayoutData"),
+    )
+    @instrument()
+    def update_demand_time_series(series_name, relayout_data) -> go.Figure:
+        key, column, title, colour = SERIES[series_name]
+        series = demand_data.get_demand()[key][column]
+
+        # Only send the points that can be seen, refined every time the user zooms or pans
+        visible_range = get_visible_range(relayout_data)
+        if visible_range is not None:
+            series = series.loc[pd.Timestamp(visible_range[0]):pd.Timestamp(visible_range[1])]
+        shown = downsample(series, MAX_POINTS)
+
+        fig = go.Figure(
+            go.Scattergl(
+                x=shown.index,
+                y=shown.to_numpy(),
+                mode="lines",
+                line=dict(color=colour, width=1),
+                name=series_name,
+            )
+        )
+        fig.update_layout(
+            title=f"Hourly {title} ({len(shown):,} of {len(series):,} points shown)",
+            xaxis_title="Time",
+            yaxis_title=title,
+            plot_bgcolor='white',
+            yaxis_gridcolor='lightgray',
+            margin=dict(t=50, b=50),
+            uirevision=series_name,  # Keep the zoom while refining, reset it when the series changes
+        )
+        if visible_range is not None:
+            fig.update_xaxes(range=list(visible_range))
+
+        return fig
+
+    return html.Div(
+        [
+            dcc.Dropdown(
+                id=ids.DEMAND_TIME_SERIES_DROPDOWN,
+                options=[{"label": name, "value": name} for name in SERIES],
+                value="Heat",
+                clearable=False,
+                style={"width": "200px", "marginBottom": "10px"},
+            ),
+            dcc.Graph(id=ids.DEMAND_TIME_SERIES_GRAPH),
+        ]
+    )
@@ -2,11 +2,13 @@ from dash import Dash, dcc, html
 from dash.dependencies import Input, Output
 import json
 from . import ids
+from . import settings
+from Lib.Instrumentation import instrument
 
 
 # Load the optimization results data
 def load_optimization_data():
-    json_path = r"C:\Users\phoen\OneDrive - National University of Ireland, Galway\Masters\Thesis\Python Framework\Lib\optimization_results.json"
+    json_path = settings.OPTIMIZATION_RESULTS_PATH
     with open(json_path, "r") as f:
         return json.load(f)
 
@@ -20,6 +22,7 @@ def render(app: Dash) -> html.Div:
         Output(ids.ENERGY_DROPDOWN_CONTAINER, "children"),
         Input(ids.PAGE_LOCATION, "pathname"),
     )
+    @instrument()
     def render_energy_dropdown(_: str) -> html.Div:
         return html.Div(
             [
@@ -6,6 +6,7 @@ CO2_DEMAND_BAR_CHART = "co2-demand-bar-chart"
 LIGHT_DEMAND_BAR_CHART = "light-demand-bar-chart"
 HEAT_DEMAND_BAR_CHART = "heat-demand-bar-chart"
 EMISSIONS_COMPARISON_CHART = "emissions-comparison-chart"
+DEMAND_TIME_SERIES_GRAPH = "demand-time-series-graph"
 
 # Interactive capacity explorer IDs
 CAPACITY_SLIDERS = "capacity-sliders"
@@ -14,9 +15,26 @@ COST_BREAKDOWN_TABLE = "cost-breakdown-table"
 UPDATED_COST_CHART = "updated-cost-chart"
 RESET_SLIDERS_BUTTON = "reset-sliders-button"
 DEMAND_WARNINGS_CONTAINER = "demand-warnings-container"
+TOTAL_EMISSIONS_DISPLAY = "total-emissions-display"
+COST_COEFFICIENTS_STORE = "cost-coefficients-store"
+
+# Background optimisation IDs
+OPTIMISE_BUTTON = "optimise-button"
+OPTIMISATION_SOURCES_CHECKLIST = "optimisation-sources-checklist"
+OPTIMISATION_STATUS = "optimisation-status"
+OPTIMISATION_PROGRESS_CHART = "optimisation-progress-chart"
+OPTIMISATION_PROGRESS_INTERVAL = "optimisation-progress-interval"
+OPTIMISATION_JOB_STORE = "optimisation-job-store"
+OPTIMISATION_RESULTS_VERSION = "optimisation-results-version"
+
+# Instrumentation debug IDs
+INSTRUMENTATION_TABLE = "instrumentation-table"
+INSTRUMENTATION_REFRESH_BUTTON = "instrumentation-refresh-button"
+INSTRUMENTATION_RESET_BUTTON = "instrumentation-reset-button"
 
 # Button IDs
 ENERGY_DROPDOWN = "energy-dropdown"
 ENERGY_DROPDOWN_CONTAINER = "energy-dropdown-container"
 SELECT_ALL_ENERGY_BUTTON = "select-all-energy-button"
+DEMAND_TIME_SERIES_DROPDOWN = "demand-time-series-dropdown"
 PAGE_LOCATION = "page-location"
@@ -0,0 +1,76 @@
+import dash
+import dash_bootstrap_components as dbc
+from dash import Dash, html
+from dash.dependencies import Input, Output
+from flask import Response
+
+from . import ids
+from Lib.Instrumentation import REGISTRY
+
+# Exports of the registry for scraping, the dashboard panel shows the same numbers
+METRICS_URL = "/debug/metrics"
+METRICS_JSON_URL = "/debug/metrics.json"
+
+
+def register_routes(server) -> None:
+    """Serve the registry as Prometheus text and as JSON from the Flask server behind the dashboard"""
+    server.add_url_rule(METRICS_URL, "instrumentation_metrics",
+                        lambda: Response(REGISTRY.to_prometheus(), mimetype="text/plain; version=0.0.4"))
+    server.add_url_rule(METRICS_JSON_URL, "instrumentation_metrics_json",
+                        lambda: Response(REGISTRY.to_json(), mimetype="application/json"))
+
+
+def format_memory(n_bytes) -> str:
+    if n_bytes is None:
+        return "-"
+    return f"{n_bytes / 2 ** 20:,.1f} MiB"
+
+
+def render(app: Dash) -> html.Details:
+    # Not instrumented itself, so refreshing the panel does not change what it shows
+    @app.callback(
+        Output(ids.INSTRUMENTATION_TABLE, "children"),
+        Input(ids.INSTRUMENTATION_REFRESH_BUTTON, "n_clicks"),
+        Input(ids.INSTRUMENTATION_RESET_BUTTON, "n_clicks"),
+    )
+    def update_instrumentation_table(_, __):
+        """Table of the stages recorded by this server process, slowest in total first"""
+        if dash.callback_context.triggered_id == ids.INSTRUMENTATION_RESET_BUTTON:
+            REGISTRY.reset()
+
+        stats = REGISTRY.snapshot()
+        if not stats:
+            return html.P("Nothing has been recorded by this server process yet.")
+
+        header = html.Thead(html.Tr([html.Th(column) for column in
+                                     ["Stage", "Calls", "Total (s)", "Mean (ms)", "Max (ms)", "Peak memory"]]))
+        rows = [
+            html.Tr([
+                html.Td(name),
+                html.Td(f"{stat['calls']:,}"),
+                html.Td(f"{stat['total_seconds']:,.3f}"),
+                html.Td(f"{stat['mean_seconds'] * 1000:,.2f}"),
+                html.Td(f"{stat['max_seconds'] * 1000:,.2f}"),
+                html.Td(format_memory(stat['peak_memory_bytes'])),
+            ])
+            for name, stat in stats.items()
+        ]
+        return dbc.Table([header, html.Tbody(rows)], bordered=True, hover=True, responsive=True,
+                         striped=True, size="sm")
+
+    return html.Details([
+        html.Summary("Instrumentation"),
+        html.P([
+            "Wall time, call counts and peak memory of the model stages and dashboard callbacks in this server "
+            "process. Peak memory is only recorded when the server is started with GREENHOUSE_TRACEMALLOC=1. "
+            "Export: ",
+            html.A("Prometheus", href=METRICS_URL, target="_blank"),
+            ", ",
+            html.A("JSON", href=METRICS_JSON_URL, target="_blank"),
+        ], style={"marginTop": "10px"}),
+        html.Button("Refresh", id=ids.INSTRUMENTATION_REFRESH_BUTTON, className="btn btn-secondary",
+                    style={"marginRight": "10px", "marginBottom": "10px"}),
+        html.Button("Reset", id=ids.INSTRUMENTATION_RESET_BUTTON, className="btn btn-outline-secondary",
+                    style={"marginBottom": "10px"}),
+        html.Div(id=ids.INSTRUMENTATION_TABLE),
+    ])
@@ -2,13 +2,38 @@ from dash import Dash
 from dash_bootstrap_components.themes import BOOTSTRAP
 
 from components.layout import create_layout
+from components import demand_data, instrumentation_debug
 
 
-def main() -> None:
-    print("Loading Greenhouse Energy Dashboard...")
+def create_app() -> Dash:
+    """Build the dashboard, used by both the development server and WSGI servers"""
     app = Dash(external_stylesheets=[BOOTSTRAP])
     app.title = "Greenhouse Energy Dashboard"
     app.layout = create_layout(app)
+    instrumentation_debug.register_routes(app.server)
+    return app
+
+
+def create_server():
+    """
+    WSGI entry point for production serving with several worker processes, for example:
+
+        gunicorn --workers 4 --preload "interactive_capacity_explorer:create_server()"
+
+    The demand data is loaded before the server is returned. With --preload it is prepared once before the
+    workers fork, without it every worker memory-maps the same saved demand store. Data paths are set with
+    the environment variables in components/settings.py.
+    """
+    app = create_app()
+    demand_data.get_demand()
+    return app.server
+
+
+def main() -> None:
+    print("Loading Greenhouse Energy Dashboard...")
+    app = create_app()
+    # Demand charts wait for this instead of calculating the pipeline at import time
+    demand_data.load_in_background()
     app.run()
 
 
@@ -4,7 +4,10 @@ import dash_bootstrap_components as dbc
 from . import capacities_bar_chart, energy_dropdown, ids
 from . import costs_bar_chart, costs_pie_chart
 from . import co2_demand_bar_chart, heat_demand_bar_chart, light_demand_bar_chart
+from . import demand_time_series
 from . import capacity_sliders  # Import the capacity_sliders module
+from . import optimisation_jobs
+from . import instrumentation_debug
 
 
 def create_layout(app: Dash) -> html.Div:
@@ -32,6 +35,16 @@ def create_layout(app: Dash) -> html.Div:
                 ]
             ),
 
+            # Background optimisation
+            html.Div(
+                className="optimisation-section",
+                style={"marginBottom": "40px", "backgroundColor": "#f8f9fa",
+                       "padding": "20px", "borderRadius": "10px", "boxShadow": "0 4px 8px rgba(0,0,0,0.1)"},
+                children=[
+                    optimisation_jobs.render(app),
+                ]
+            ),
+
             # Cost analysis section
             #
             # Demand analysis section
@@ -71,6 +84,16 @@ def create_layout(app: Dash) -> html.Div:
                             html.H3("CO2 Demand", style={"marginBottom": "10px"}),
                             co2_demand_bar_chart.render(app)
                         ]
+                    ),
+
+                    # Hourly demand, downsampled to the visible range
+                    html.Div(
+                        className="demand-time-series-section",
+                        style={"marginTop": "20px"},
+                        children=[
+                            html.H3("Hourly Demand", style={"marginBottom": "10px"}),
+                            demand_time_series.render(app)
+                        ]
                     )
                 ]
             ),
@@ -85,6 +108,15 @@ def create_layout(app: Dash) -> html.Div:
                 ]
             ),
 
+            # Timing and memory of the model stages and callbacks, for debugging slow pages
+            html.Div(
+                className="instrumentation-section",
+                style={"marginTop": "20px", "color": "#666"},
+                children=[
+                    instrumentation_debug.render(app),
+                ]
+            ),
+
             # Hidden div for storing the current page location - needed for callbacks
             dcc.Location(id=ids.PAGE_LOCATION, refresh=False)
         ],
@@ -3,29 +3,20 @@ from dash import Dash, dcc, html
 from dash.dependencies import Input, Output
 import pandas as pd
 from . import ids
-
-# Import demand data directly using the same approach as CO2 demand
-import sys
-sys.path.append(r"C:\Users\phoen\OneDrive - National University of Ireland, Galway\Masters\Thesis\Python Framework")
-from Lib.InputCalculations import calculate_inputs
-from Lib.HTCoefficients import calculate_htc
-from Lib.HeatDemand import calculate_heatdemand
-from Lib.LightDemand import calculate_lightdemand
-
-# Get the data using the already defined imports
-inputs_data = calculate_inputs()
-htc = calculate_htc(inputs_data)
-heat_demand = calculate_heatdemand(inputs_data, htc)
-light_demand = calculate_lightdemand(inputs_data, htc, heat_demand)
+from . import demand_data
+from Lib.DemandRollups import summarise_rollups
+from Lib.Instrumentation import instrument
 
 def render_light_demand(app: Dash) -> html.Div:
     @app.callback(
         Output(ids.LIGHT_DEMAND_BAR_CHART, "children"),
         Input(ids.PAGE_LOCATION, "pathname"),
     )
+    @instrument()
     def update_light_demand_chart(_) -> html.Div:
         try:
-            # Use the light demand data already calculated
+            # Shared demand data, calculated once in the background when the server starts
+            light_demand = demand_data.get_demand()["light"]
             if light_demand.empty or "MWh" not in light_demand.columns:
                 return html.Div("No light demand data available or missing 'MWh' column.",
                                 id=ids.LIGHT_DEMAND_BAR_CHART)
@@ -35,19 +26,13 @@ def render_light_demand(app: Dash) -> html.Div:
                 return html.Div("Light demand data index is not in datetime format.",
                                 id=ids.LIGHT_DEMAND_BAR_CHART)
 
-            # Create month and year columns
-            light_demand_processed = light_demand.copy()
-            light_demand_processed['Month'] = light_demand_processed.index.strftime('%b %Y')
-            light_demand_processed['MonthNum'] = light_demand_processed.index.year * 100 + light_demand_processed.index.month
-
-            # Group by month and calculate daily averages
-            daily_avg_by_month = light_demand_processed.groupby(['Month', 'MonthNum']).agg(
-                AvgDailyLightDemand=('MWh', lambda x: x.sum() / (len(x) / 24))
-                # Sum hourly values and divide by days
-            ).reset_index()
-
-            # Sort chronologically
-            daily_avg_by_month = daily_avg_by_month.sort_values('MonthNum')
+            # Monthly aggregates precomputed with the demand data
+            monthly = demand_data.get_demand()["rollups"]["light"]["monthly"]["MWh"]
+            summary = summarise_rollups(monthly)
+            daily_avg_by_month = pd.DataFrame({
+                'Month': monthly.index.strftime('%b %Y'),
+                'AvgDailyLightDemand': monthly['sum'] / (monthly['hours'] / 24),  # Average daily total in each month
+            })
 
             # Create the bar chart
             fig = px.bar(
@@ -92,27 +77,27 @@ def render_light_demand(app: Dash) -> html.Div:
                         html.Tbody([
                             html.Tr([
                                 html.Td("Average Daily Demand", style={"padding": "8px"}),
-                                html.Td(f"{light_demand['MWh'].sum() / (len(light_demand) / 24):.2f} MWh/day",
+                                html.Td(f"{summary['daily_mean']:.2f} MWh/day",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Maximum Hourly Demand", style={"padding": "8px"}),
-                                html.Td(f"{light_demand['MWh'].max():.2f} MWh",
+                                html.Td(f"{summary['peak']:.2f} MWh",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Minimum Hourly Demand", style={"padding": "8px"}),
-                                html.Td(f"{light_demand['MWh'].min():.2f} MWh",
+                                html.Td(f"{summary['min']:.2f} MWh",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Total Annual Demand", style={"padding": "8px"}),
-                                html.Td(f"{light_demand['MWh'].sum():.2f} MWh",
+                                html.Td(f"{summary['sum']:.2f} MWh",
                                         style={"textAlign": "right", "padding": "8px"})
                             ]),
                             html.Tr([
                                 html.Td("Total Annual Demand", style={"padding": "8px"}),
-                                html.Td(f"{light_demand['MWh'].sum():.2f} MWh",
+                                html.Td(f"{summary['sum']:.2f} MWh",
                                         style={"textAlign": "right", "padding": "8px"})
                             ])
                         ])
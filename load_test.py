@@ -0,0 +1,97 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Slider technologies in the order of the capacity_sliders callback inputs
+SLIDERS = ['chp', 'geothermal', 'gshp', 'solar', 'wasteheat', 'grid', 'boiler', 'co2']
+
+# Outputs of capacity_sliders.update_cost_display, the most expensive server callback
+OUTPUTS = [
+    ("cost-breakdown-table", "children"),
+    ("updated-cost-chart", "figure"),
+    ("emissions-comparison-chart", "figure"),
+    ("demand-warnings-container", "children"),
+]
+
+
+def cost_update_payload(capacities):
+    """Request body Dash sends when a capacity slider is released"""
+    return {
+        "output": ".." + "...".join(f"{id}.{prop}" for id, prop in OUTPUTS) + "..",
+        "outputs": [{"id": id, "property": prop} for id, prop in OUTPUTS],
+        "inputs": [{"id": f"slider-{source}", "property": "value", "value": value}
+                   for source, value in zip(SLIDERS, capacities)],
+        "changedPropIds": [f"slider-{random.choice(SLIDERS)}.value"],
+        "state": [],
+    }
+
+
+def simulate_user(url, max_capacities, n_requests, think_time, latencies, errors, lock):
+    """One user moving random sliders, recording the latency of every callback request"""
+    for _ in range(n_requests):
+        capacities = [random.uniform(0, c) for c in max_capacities]
+        request = urllib.request.Request(
+            url + "/_dash-update-component",
+            data=json.dumps(cost_update_payload(capacities)).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+        time.sleep(random.uniform(0, 2 * think_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Callback latency of the dashboard under concurrent users")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Address of the running dashboard")
+    parser.add_argument("--users", type=int, default=50, help="Number of concurrent users")
+    parser.add_argument("--requests", type=int, default=20, help="Slider changes per user")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between changes (s)")
+    parser.add_argument("--max-capacities", default="20,30,30,110,30,14,30,5000",
+                        help="Comma separated slider maxima (MW, kg/h for CO2)")
+    parser.add_argument("--p95-target", type=float, default=None,
+                        help="Exit with an error if the p95 latency (s) is above this")
+    args = parser.parse_args()
+
+    max_capacities = [float(c) for c in args.max_capacities.split(",")]
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    print(f"Simulating {args.users} users, {args.requests} slider changes each, against {args.url}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        for _ in range(args.users):
+            executor.submit(simulate_user, args.url, max_capacities, args.requests, args.think_time,
+                            latencies, errors, lock)
+    duration = time.perf_counter() - start
+
+    if not latencies:
+        print(f"All {len(errors)} requests failed, first error: {errors[0] if errors else 'none'}")
+        raise SystemExit(1)
+
+    latencies = np.array(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"\nRequests: {len(latencies)} succeeded, {len(errors)} failed in {duration:.1f} s "
+          f"({len(latencies) / duration:.1f} requests/s)")
+    print(f"Latency p50: {p50 * 1000:.0f} ms, p95: {p95 * 1000:.0f} ms, p99: {p99 * 1000:.0f} ms, "
+          f"max: {latencies.max() * 1000:.0f} ms")
+
+    if args.p95_target is not None and p95 > args.p95_target:
+        print(f"p95 latency is above the target of {args.p95_target * 1000:.0f} ms")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
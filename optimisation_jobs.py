@@ -0,0 +1,129 @@
+import os
+import sys
+import threading
+import plotly.graph_objects as go
+from dash import Dash, dcc, html, no_update
+from dash.dependencies import Input, Output, State
+
+from . import ids
+from . import demand_data, settings
+
+# The optimiser modules import each other without the Lib prefix
+sys.path.append(os.path.join(settings.PROJECT_DIR, "Lib"))
+from Lib.JobQueue import JobQueue, start_workers
+from Lib.Instrumentation import instrument
+
+SOURCES = ['CHP', 'Geothermal', 'GSHP', 'Solar', 'WasteHeat', 'Grid', 'Boiler', 'CO2']
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+def ensure_workers():
+    """
+    Start this server process's optimisation workers the first time a job is submitted. Every gunicorn worker
+    starts its own, so up to gunicorn workers x settings.OPTIMISATION_WORKERS jobs run at once.
+    """
+    global _workers
+    with _workers_lock:
+        if _workers is None:
+            _workers = start_workers(settings.JOB_QUEUE_PATH, settings.OPTIMISATION_WORKERS)
+
+
+def render(app: Dash) -> html.Div:
+    @app.callback(
+        Output(ids.OPTIMISATION_JOB_STORE, "data"),
+        Output(ids.OPTIMISATION_PROGRESS_INTERVAL, "disabled"),
+        Input(ids.OPTIMISE_BUTTON, "n_clicks"),
+        State(ids.OPTIMISATION_SOURCES_CHECKLIST, "value"),
+        prevent_initial_call=True
+    )
+    @instrument()
+    def submit_optimisation(_, enabled_sources):
+        """Queue an optimisation with the selected sources and start polling its progress"""
+        # The worker reads the demand from the memory-mapped store, make sure it has been written
+        demand_data.get_demand()
+        ensure_workers()
+
+        job_id = JobQueue(settings.JOB_QUEUE_PATH).submit("optimise", {
+            "source_config": {source: source in enabled_sources for source in SOURCES},
+            "demand_store": settings.DEMAND_STORE_DIR,
+            "results_path": settings.OPTIMIZATION_RESULTS_PATH,
+        })
+        return job_id, False
+
+    @app.callback(
+        Output(ids.OPTIMISATION_STATUS, "children"),
+        Output(ids.OPTIMISATION_PROGRESS_CHART, "figure"),
+        Output(ids.OPTIMISATION_PROGRESS_INTERVAL, "disabled", allow_duplicate=True),
+        Output(ids.OPTIMISATION_RESULTS_VERSION, "data"),
+        Input(ids.OPTIMISATION_PROGRESS_INTERVAL, "n_intervals"),
+        State(ids.OPTIMISATION_JOB_STORE, "data"),
+        prevent_initial_call=True
+    )
+    @instrument()
+    def update_optimisation_progress(_, job_id):
+        """Show the best cost found so far and, when the job is done, tell the sliders to reload the results"""
+        queue = JobQueue(settings.JOB_QUEUE_PATH)
+        try:
+            # A job whose worker died stays running, no other server process may have noticed yet
+            queue.fail_orphaned()
+            job = queue.get(job_id)
+            minima = queue.minima(job_id)
+        finally:
+            queue.close()
+        if job is None:
+            # The queue file was recreated or the job removed, there is nothing left to poll
+            return f"Job {job_id} is no longer in the queue", go.Figure(), True, no_update
+
+        fig = go.Figure()
+        if minima:
+            iterations, costs = zip(*minima)
+            fig.add_trace(go.Scatter(x=iterations, y=costs, mode="lines+markers", line_shape="hv",
+                                     marker_color='#4285F4'))
+        fig.update_layout(
+            title='Best Annual Cost Found',
+            xaxis_title='Objective Evaluations',
+            yaxis_title='Annual Cost (€)',
+            plot_bgcolor='white',
+            yaxis_gridcolor='lightgray',
+            margin=dict(t=50, b=50),
+            height=350
+        )
+
+        if job["status"] == "queued":
+            return f"Job {job_id} is waiting for a worker...", fig, False, no_update
+        if job["status"] == "running":
+            best = f", best so far €{minima[-1][1]:,.2f}" if minima else ""
+            return f"Job {job_id} running: {len(minima)} improvements found{best}", fig, False, no_update
+        if job["status"] == "failed":
+            print(f"Optimisation job {job_id} failed:\n{job['error']}")
+            return f"Job {job_id} failed, see the server log for details", fig, True, no_update
+
+        # Finished: changing the version makes the sliders reload the new optimal capacities
+        return (f"Job {job_id} finished: optimal annual cost €{job['result']['total_cost']:,.2f}",
+                fig, True, job_id)
+
+    return html.Div([
+        html.H3("Run Optimisation"),
+        html.P("Choose the available energy sources and run the optimiser in the background. "
+               "The sliders are set to the new optimal capacities when it finishes."),
+        dcc.Checklist(
+            id=ids.OPTIMISATION_SOURCES_CHECKLIST,
+            options=[{"label": f" {source}", "value": source} for source in SOURCES],
+            value=SOURCES,
+            inline=True,
+            inputStyle={"marginLeft": "12px"},
+        ),
+        html.Button(
+            "Optimise",
+            id=ids.OPTIMISE_BUTTON,
+            className="btn btn-primary",
+            style={"marginTop": "10px", "marginBottom": "10px"}
+        ),
+        html.Div(id=ids.OPTIMISATION_STATUS, style={"marginBottom": "10px"}),
+        dcc.Graph(id=ids.OPTIMISATION_PROGRESS_CHART),
+        dcc.Store(id=ids.OPTIMISATION_JOB_STORE),
+        dcc.Store(id=ids.OPTIMISATION_RESULTS_VERSION),
+        dcc.Interval(id=ids.OPTIMISATION_PROGRESS_INTERVAL, interval=2000, disabled=True),
+    ])
@@ -0,0 +1,24 @@
+import os
+
+# Data paths of the dashboard, each can be overridden with an environment variable so the same code runs on a
+# workstation and on a server
+
+# Root of the Python framework, the directory containing the Lib and components packages
+PROJECT_DIR = os.environ.get(
+    "GREENHOUSE_PROJECT_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Optimisation results shown by the charts and used to initialise the capacity sliders. Every job writes
+# this file, so it holds the results of the job that finished last
+OPTIMIZATION_RESULTS_PATH = os.environ.get(
+    "GREENHOUSE_OPTIMIZATION_RESULTS", os.path.join(PROJECT_DIR, "Lib", "optimization_results.json"))
+
+# Queue of optimisation jobs submitted from the dashboard, and the worker processes each server process starts.
+# Every gunicorn worker starts its own, up to workers x OPTIMISATION_WORKERS jobs run at once
+JOB_QUEUE_PATH = os.environ.get(
+    "GREENHOUSE_JOB_QUEUE", os.path.join(PROJECT_DIR, "Lib", "optimisation_jobs.sqlite"))
+OPTIMISATION_WORKERS = int(os.environ.get("GREENHOUSE_OPTIMISATION_WORKERS", "1"))
+
+# Memory-mapped demand arrays, written once and shared read-only by every server process.
+# Recalculated automatically when the CSV inputs or the climate year and precision settings change
+DEMAND_STORE_DIR = os.environ.get(
+    "GREENHOUSE_DEMAND_STORE", os.path.join(PROJECT_DIR, "Lib", "demand_store"))